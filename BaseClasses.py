@@ -2,15 +2,17 @@ from __future__ import annotations
 
 import collections
 import functools
+import itertools
 import logging
 import random
 import secrets
 from argparse import Namespace
 from collections import Counter, deque
 from collections.abc import Collection, MutableSequence
+from contextlib import contextmanager
 from enum import IntEnum, IntFlag
 from typing import (AbstractSet, Any, Callable, ClassVar, Dict, Iterable, Iterator, List, Mapping, NamedTuple,
-                    Optional, Protocol, Set, Tuple, Union, TYPE_CHECKING)
+                    Optional, Protocol, Set, Tuple, TypeVar, Union, TYPE_CHECKING)
 
 from typing_extensions import NotRequired, TypedDict
 
@@ -76,6 +78,10 @@ class MultiWorld():
     progression_balancing: Dict[int, Options.ProgressionBalancing]
     completion_condition: Dict[int, Callable[[CollectionState], bool]]
     indirect_connections: Dict[Region, Set[Entrance]]
+    world_gates: Dict[int, List[Tuple[str, int]]]
+    """gated player -> (item name, item player) of every item it needs before any of its regions can be reached"""
+    world_gate_unlocks: Dict[Tuple[int, int], List[int]]
+    """(item player, item id) -> players gated behind that item"""
     exclude_locations: Dict[int, Options.ExcludeLocations]
     priority_locations: Dict[int, Options.PriorityLocations]
     start_inventory: Dict[int, Options.StartInventory]
@@ -100,11 +106,18 @@ class MultiWorld():
         region_cache: Dict[int, Dict[str, Region]]
         entrance_cache: Dict[int, Dict[str, Entrance]]
         location_cache: Dict[int, Dict[str, Location]]
+        item_location_cache: Dict[Tuple[str, int], Set[Location]]
+        """registered locations by the (name, player) of the item they hold"""
+        location_order: Dict[Location, int]
+        """registration order of the locations, to return lookups in the same order as get_locations"""
 
         def __init__(self, players: int):
             self.region_cache = {player: {} for player in range(1, players+1)}
             self.entrance_cache = {player: {} for player in range(1, players+1)}
             self.location_cache = {player: {} for player in range(1, players+1)}
+            self.item_location_cache = {}
+            self.location_order = {}
+            self._location_counter = itertools.count()
 
         def __iadd__(self, other: Iterable[Region]):
             self.extend(other)
@@ -126,6 +139,35 @@ class MultiWorld():
             self.entrance_cache[new_id] = {}
             self.location_cache[new_id] = {}
 
+        def register_location(self, location: Location) -> None:
+            self.location_cache[location.player][location.name] = location
+            self.location_order[location] = next(self._location_counter)
+            if location.item:
+                self.item_location_cache.setdefault((location.item.name, location.item.player), set()).add(location)
+
+        def unregister_location(self, location: Location) -> None:
+            del self.location_cache[location.player][location.name]
+            del self.location_order[location]
+            if location.item:
+                self.item_location_cache.get((location.item.name, location.item.player), set()).discard(location)
+
+        def update_item_location(self, location: Location, old_item: Optional[Item], new_item: Optional[Item]) -> None:
+            """Moves a registered location in the item index, called whenever a location's item is assigned."""
+            if location not in self.location_order:
+                return
+            if old_item:
+                self.item_location_cache.get((old_item.name, old_item.player), set()).discard(location)
+            if new_item:
+                self.item_location_cache.setdefault((new_item.name, new_item.player), set()).add(location)
+
+        def find_item_locations(self, items: Iterable[str], players: Iterable[int]) -> List[Location]:
+            """Returns the locations holding any of the items of any of the players, in get_locations order."""
+            found = [location for player in players for item in items
+                     for location in self.item_location_cache.get((item, player), ())
+                     # an item renamed after placement is still indexed under its old name
+                     if location.item and location.item.name == item and location.item.player == player]
+            return sorted(found, key=lambda location: (location.player, self.location_order[location]))
+
         def __iter__(self) -> Iterator[Region]:
             for regions in self.region_cache.values():
                 yield from regions.values()
@@ -159,6 +201,8 @@ class MultiWorld():
         self.early_items = {player: {} for player in self.player_ids}
         self.local_early_items = {player: {} for player in self.player_ids}
         self.indirect_connections = {}
+        self.world_gates = {}
+        self.world_gate_unlocks = {}
         self.start_inventory_from_pool: Dict[int, Options.StartInventoryPool] = {}
 
         for player in range(1, players + 1):
@@ -450,26 +494,17 @@ class MultiWorld():
         return [loc.item for loc in self.get_filled_locations()] + self.itempool
 
     def find_item_locations(self, item: str, player: int, resolve_group_locations: bool = False) -> List[Location]:
-        if resolve_group_locations:
-            player_groups = self.get_player_groups(player)
-            return [location for location in self.get_locations() if
-                    location.item and location.item.name == item and location.player not in player_groups and
-                    (location.item.player == player or location.item.player in player_groups)]
-        return [location for location in self.get_locations() if
-                location.item and location.item.name == item and location.item.player == player]
+        return self.find_items_in_locations({item}, player, resolve_group_locations)
 
     def find_item(self, item: str, player: int) -> Location:
-        return next(location for location in self.get_locations() if
-                    location.item and location.item.name == item and location.item.player == player)
+        return next(iter(self.regions.find_item_locations((item,), (player,))))
 
     def find_items_in_locations(self, items: Set[str], player: int, resolve_group_locations: bool = False) -> List[Location]:
         if resolve_group_locations:
             player_groups = self.get_player_groups(player)
-            return [location for location in self.get_locations() if
-                    location.item and location.item.name in items and location.player not in player_groups and
-                    (location.item.player == player or location.item.player in player_groups)]
-        return [location for location in self.get_locations() if
-                location.item and location.item.name in items and location.item.player == player]
+            return [location for location in self.regions.find_item_locations(items, {player, *player_groups})
+                    if location.player not in player_groups]
+        return self.regions.find_item_locations(items, (player,))
 
     def create_item(self, item_name: str, player: int) -> Item:
         return self.worlds[player].create_item(item_name)
@@ -497,6 +532,13 @@ class MultiWorld():
         state.can_reach(Region) in the Entrance's traversal condition, as opposed to pure transition logic."""
         self.indirect_connections.setdefault(region, set()).add(entrance)
 
+    def add_world_gate(self, player: int, item_name: str, item_player: int) -> None:
+        """Lock all of player's regions, including its origin region, until item_player has item_name.
+        While locked, region search for player stops before it starts, unlike a rule on every entrance."""
+        item_id = self.worlds[item_player].item_name_to_id[item_name]
+        self.world_gates.setdefault(player, []).append((item_name, item_player))
+        self.world_gate_unlocks.setdefault((item_player, item_id), []).append(player)
+
     def get_locations(self, player: Optional[int] = None) -> Iterable[Location]:
         if player is not None:
             return self.regions.location_cache[player].values()
@@ -612,41 +654,7 @@ class MultiWorld():
         If there are unreachable locations, the last sphere of reachable locations is followed by an empty set,
         and then a set of all of the unreachable locations.
         """
-        state = CollectionState(self)
-        locations: Set[Location] = set()
-        events: Set[Location] = set()
-        for location in self.get_filled_locations():
-            if type(location.item.code) is int:
-                locations.add(location)
-            else:
-                events.add(location)
-
-        while locations:
-            sphere: Set[Location] = set()
-
-            # cull events out
-            done_events: Set[Union[Location, None]] = {None}
-            while done_events:
-                done_events = set()
-                for event in events:
-                    if event.can_reach(state):
-                        state.collect(event.item, True, event)
-                        done_events.add(event)
-                events -= done_events
-
-            for location in locations:
-                if location.can_reach(state):
-                    sphere.add(location)
-
-            yield sphere
-            if not sphere:
-                if locations:
-                    yield locations  # unreachable locations
-                break
-
-            for location in sphere:
-                state.collect(location.item, True, location)
-            locations -= sphere
+        yield from SphereSweep(self).sendable_spheres
 
     def fulfills_accessibility(self, state: Optional[CollectionState] = None):
         """Check if accessibility rules are fulfilled with current or supplied state."""
@@ -708,6 +716,99 @@ class MultiWorld():
 
 PathValue = Tuple[str, Optional["PathValue"]]
 
+_Container = TypeVar("_Container", Counter, set)
+
+
+class CopyOnWriteDict(Dict[int, _Container]):
+    """
+    Per-player containers of a CollectionState, shared with the states it was copied from or to.
+
+    Shared containers are kept in snapshots that are never mutated. Looking up a player returns its container without
+    copying it, so reading is free. A container has to be fetched through mutable_container before changing it in place,
+    which copies it first if it is shared, so a copy only costs as much as the players that get changed afterward.
+    """
+    __slots__ = ("_owned", "_shared")
+
+    _owned: Set[int]
+    _shared: List[Dict[int, _Container]]
+    """snapshots of shared containers, newest first"""
+
+    def __init__(self, owned: Mapping[int, _Container] = {}, shared: Iterable[Dict[int, _Container]] = ()) -> None:
+        super().__init__(owned)
+        self._owned = set(owned)
+        self._shared = list(shared)
+
+    def __missing__(self, player: int) -> _Container:
+        for snapshot in self._shared:
+            if player in snapshot:
+                container = snapshot[player]
+                # kept without owning it, so the next lookup is a plain dict lookup
+                dict.__setitem__(self, player, container)
+                return container
+        raise KeyError(player)
+
+    def __setitem__(self, player: int, container: _Container) -> None:
+        dict.__setitem__(self, player, container)
+        self._owned.add(player)
+
+    def mutable(self, player: int) -> _Container:
+        """Returns the container of player to be changed in place, copying it first if it is shared."""
+        if player in self._owned:
+            return dict.__getitem__(self, player)
+        container = self[player].copy()
+        self[player] = container
+        return container
+
+    def copy(self) -> CopyOnWriteDict[_Container]:
+        """Returns a copy sharing all containers. Containers owned so far become shared, so both sides copy them before
+        changing them."""
+        if self._owned:
+            shared = [{player: dict.__getitem__(self, player) for player in self._owned}, *self._shared]
+            # merge snapshots of similar size, so there are only logarithmically many to look through and
+            # every container is merged only logarithmically often
+            while len(shared) > 1 and 2 * len(shared[0]) >= len(shared[1]):
+                shared[:2] = [{**shared[1], **shared[0]}]
+            self._shared = shared
+            self._owned = set()
+        return CopyOnWriteDict(shared=self._shared)
+
+    def __contains__(self, player: object) -> bool:
+        return dict.__contains__(self, player) or any(player in snapshot for snapshot in self._shared)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(dict.fromkeys(itertools.chain(dict.__iter__(self), *self._shared)))
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Mapping) and dict(self.items()) == dict(other.items())
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def keys(self):
+        return dict.fromkeys(self).keys()
+
+    def items(self):
+        return {player: self[player] for player in self}.items()
+
+    def values(self):
+        return {player: self[player] for player in self}.values()
+
+    def get(self, player: int, default: Any = None) -> Any:
+        return self[player] if player in self else default
+
+
+def mutable_container(containers: Dict[int, _Container], player: int) -> _Container:
+    """
+    Returns the container of player from a per-player dict of a CollectionState, such as prog_items, to be changed in
+    place. Containers may be shared with copies of the state, so changing one that was only looked up changes those too.
+    CollectionState.collect and remove already do this for the player of the item, before calling World.collect.
+    """
+    if isinstance(containers, CopyOnWriteDict):
+        return containers.mutable(player)
+    return containers[player]
+
 
 class CollectionState():
     prog_items: Dict[int, Counter[str]]
@@ -723,10 +824,10 @@ class CollectionState():
     additional_copy_functions: List[Callable[[CollectionState, CollectionState], CollectionState]] = []
 
     def __init__(self, parent: MultiWorld, allow_partial_entrances: bool = False):
-        self.prog_items = {player: Counter() for player in parent.get_all_ids()}
+        self.prog_items = CopyOnWriteDict({player: Counter() for player in parent.get_all_ids()})
         self.multiworld = parent
-        self.reachable_regions = {player: set() for player in parent.get_all_ids()}
-        self.blocked_connections = {player: set() for player in parent.get_all_ids()}
+        self.reachable_regions = CopyOnWriteDict({player: set() for player in parent.get_all_ids()})
+        self.blocked_connections = CopyOnWriteDict({player: set() for player in parent.get_all_ids()})
         self.advancements = set()
         self.path = {}
         self.locations_checked = set()
@@ -738,17 +839,25 @@ class CollectionState():
             for item in items:
                 self.collect(item, True)
 
+    def world_gate_closed(self, player: int) -> bool:
+        """Returns True if player is gated behind an item that is not in state yet."""
+        gates = self.multiworld.world_gates.get(player)
+        return bool(gates) and not all(self.prog_items[item_player][item_name] for item_name, item_player in gates)
+
     def update_reachable_regions(self, player: int):
         self.stale[player] = False
+        if self.world_gate_closed(player):
+            # nothing of a locked world is reachable, collecting its unlock marks it stale again
+            return
         world: AutoWorld.World = self.multiworld.worlds[player]
-        reachable_regions = self.reachable_regions[player]
         queue = deque(self.blocked_connections[player])
         start: Region = world.get_region(world.origin_region_name)
 
         # init on first call - this can't be done on construction since the regions don't exist yet
-        if start not in reachable_regions:
+        if start not in self.reachable_regions[player]:
+            reachable_regions, blocked_connections = self._mutable_regions(player)
             reachable_regions.add(start)
-            self.blocked_connections[player].update(start.exits)
+            blocked_connections.update(start.exits)
             queue.extend(start.exits)
 
         if world.explicit_indirect_conditions:
@@ -756,19 +865,29 @@ class CollectionState():
         else:
             self._update_reachable_regions_auto_indirect_conditions(player, queue)
 
+    def _mutable_regions(self, player: int) -> Tuple[Set[Region], Set[Entrance]]:
+        return mutable_container(self.reachable_regions, player), mutable_container(self.blocked_connections, player)
+
     def _update_reachable_regions_explicit_indirect_conditions(self, player: int, queue: deque):
+        # the containers are only copied once a region is found, blocked connections into reachable regions are
+        # cleaned up only then as well
         reachable_regions = self.reachable_regions[player]
         blocked_connections = self.blocked_connections[player]
+        changed = False
         # run BFS on all connections, and keep track of those blocked by missing items
         while queue:
             connection = queue.popleft()
             new_region = connection.connected_region
             if new_region in reachable_regions:
-                blocked_connections.remove(connection)
+                if changed:
+                    blocked_connections.remove(connection)
             elif connection.can_reach(self):
                 if self.allow_partial_entrances and not new_region:
                     continue
                 assert new_region, f"tried to search through an Entrance \"{connection}\" with no connected Region"
+                if not changed:
+                    reachable_regions, blocked_connections = self._mutable_regions(player)
+                    changed = True
                 reachable_regions.add(new_region)
                 blocked_connections.remove(connection)
                 blocked_connections.update(new_region.exits)
@@ -781,8 +900,10 @@ class CollectionState():
                         queue.append(new_entrance)
 
     def _update_reachable_regions_auto_indirect_conditions(self, player: int, queue: deque):
+        # the containers are only copied once a region is found, like in the explicit indirect conditions variant
         reachable_regions = self.reachable_regions[player]
         blocked_connections = self.blocked_connections[player]
+        changed = False
         new_connection: bool = True
         # run BFS on all connections, and keep track of those blocked by missing items
         while new_connection:
@@ -791,11 +912,15 @@ class CollectionState():
                 connection = queue.popleft()
                 new_region = connection.connected_region
                 if new_region in reachable_regions:
-                    blocked_connections.remove(connection)
+                    if changed:
+                        blocked_connections.remove(connection)
                 elif connection.can_reach(self):
                     if self.allow_partial_entrances and not new_region:
                         continue
                     assert new_region, f"tried to search through an Entrance \"{connection}\" with no connected Region"
+                    if not changed:
+                        reachable_regions, blocked_connections = self._mutable_regions(player)
+                        changed = True
                     reachable_regions.add(new_region)
                     blocked_connections.remove(connection)
                     blocked_connections.update(new_region.exits)
@@ -806,20 +931,66 @@ class CollectionState():
             queue.extend(blocked_connections)
 
     def copy(self) -> CollectionState:
-        ret = CollectionState(self.multiworld)
-        ret.prog_items = {player: counter.copy() for player, counter in self.prog_items.items()}
-        ret.reachable_regions = {player: region_set.copy() for player, region_set in
-                                 self.reachable_regions.items()}
-        ret.blocked_connections = {player: entrance_set.copy() for player, entrance_set in
-                                   self.blocked_connections.items()}
+        # skip __init__, collecting precollected items is wasted work when everything gets overwritten anyway
+        ret = CollectionState.__new__(CollectionState)
+        ret.multiworld = self.multiworld
+        # per-player containers are shared copy-on-write, so only players changed afterward get copied
+        ret.prog_items = self._share_per_player("prog_items")
+        ret.reachable_regions = self._share_per_player("reachable_regions")
+        ret.blocked_connections = self._share_per_player("blocked_connections")
         ret.advancements = self.advancements.copy()
         ret.path = self.path.copy()
         ret.locations_checked = self.locations_checked.copy()
+        ret.stale = dict.fromkeys(self.stale, True)
         ret.allow_partial_entrances = self.allow_partial_entrances
+        for function in self.additional_init_functions:
+            function(ret, self.multiworld)
         for function in self.additional_copy_functions:
             ret = function(self, ret)
         return ret
 
+    def _share_per_player(self, attribute: str) -> CopyOnWriteDict:
+        containers = getattr(self, attribute)
+        if not isinstance(containers, CopyOnWriteDict):
+            # replaced by a plain dict, which has to stop owning its containers as well
+            containers = CopyOnWriteDict(containers)
+            setattr(self, attribute, containers)
+        return containers.copy()
+
+    @contextmanager
+    def rollback(self, locations: Iterable[Location] = ()) -> Iterator[CollectionState]:
+        """
+        Undoes all changes made to this state within the context, to try something out without copying the state.
+        Per-player containers are shared copy-on-write like in copy, so only the players changed meanwhile get copied.
+
+        :param locations: The locations which may get collected within the context. Collecting any other location
+                          would not get undone.
+        """
+        uncollected = [location for location in locations if location not in self.advancements]
+        unchecked = [location for location in locations if location not in self.locations_checked]
+        prog_items = self._share_per_player("prog_items")
+        reachable_regions = self._share_per_player("reachable_regions")
+        blocked_connections = self._share_per_player("blocked_connections")
+        # nothing gets removed from the path while reachability only grows, so it's enough to drop what was added
+        path_length = len(self.path)
+        stale = self.stale.copy()
+        mixins = CollectionState.__new__(CollectionState)
+        for function in self.additional_copy_functions:
+            mixins = function(self, mixins)
+        try:
+            yield self
+        finally:
+            self.prog_items = prog_items
+            self.reachable_regions = reachable_regions
+            self.blocked_connections = blocked_connections
+            while len(self.path) > path_length:
+                self.path.popitem()
+            self.stale = stale
+            self.advancements.difference_update(uncollected)
+            self.locations_checked.difference_update(unchecked)
+            for function in self.additional_copy_functions:
+                function(mixins, self)
+
     def can_reach(self,
                   spot: Union[Location, Entrance, Region, str],
                   resolution_hint: Optional[str] = None,
@@ -852,18 +1023,57 @@ class CollectionState():
 
     def sweep_for_advancements(self, locations: Optional[Iterable[Location]] = None) -> None:
         if locations is None:
-            locations = self.multiworld.get_filled_locations()
-        reachable_advancements = True
-        # since the loop has a good chance to run more than once, only filter the advancements once
-        locations = {location for location in locations if location.advancement and location not in self.advancements}
-
-        while reachable_advancements:
-            reachable_advancements = {location for location in locations if location.can_reach(self)}
-            locations -= reachable_advancements
-            for advancement in reachable_advancements:
-                self.advancements.add(advancement)
-                assert isinstance(advancement.item, Item), "tried to collect Event with no Item"
-                self.collect(advancement.item, True, advancement)
+            locations = self.multiworld.get_locations()
+        # since the loop has a good chance to run more than once, only filter the advancements once,
+        # and index them by player and region, so a pass only has to look at the players that changed
+        pending: Dict[int, Dict[Region, List[Location]]] = {}
+        for location in {location for location in locations
+                         if location.advancement and location not in self.advancements}:
+            assert location.parent_region, f"called can_reach on a Location \"{location}\" with no parent_region"
+            pending.setdefault(location.player, {}).setdefault(location.parent_region, []).append(location)
+
+        # After a collection only the players it made stale are checked again. Rules that depend on other players
+        # without marking them stale are caught by a pass over all remaining players before finishing.
+        unchecked_players: Set[int] = set(pending)
+        players_to_check: Set[int] = unchecked_players.copy()
+        while players_to_check:
+            unchecked_players -= players_to_check
+            reachable_advancements = self._pop_reachable_advancements(pending, players_to_check)
+            if reachable_advancements:
+                fresh_players = [player for player in pending if not self.stale[player]]
+                for advancement in reachable_advancements:
+                    self.advancements.add(advancement)
+                    assert isinstance(advancement.item, Item), "tried to collect Event with no Item"
+                    self.collect(advancement.item, True, advancement)
+                unchecked_players = set(pending)
+                players_to_check = {advancement.item.player for advancement in reachable_advancements}
+                players_to_check.update(player for player in fresh_players if self.stale[player])
+                players_to_check &= unchecked_players
+            else:
+                players_to_check = set()
+            if not players_to_check:
+                players_to_check = unchecked_players.copy()
+
+    def _pop_reachable_advancements(self, pending: Dict[int, Dict[Region, List[Location]]],
+                                    players: Iterable[int]) -> List[Location]:
+        """Removes and returns the reachable advancement locations of the given players from the sweep index."""
+        reachable_advancements: List[Location] = []
+        for player in players:
+            regions = pending[player]
+            for region in [region for region in regions if region.can_reach(self)]:
+                remaining: List[Location] = []
+                for location in regions[region]:
+                    if location.can_reach(self):
+                        reachable_advancements.append(location)
+                    else:
+                        remaining.append(location)
+                if remaining:
+                    regions[region] = remaining
+                else:
+                    del regions[region]
+            if not regions:
+                del pending[player]
+        return reachable_advancements
 
     # item name related
     def has(self, item: str, player: int, count: int = 1) -> bool:
@@ -962,9 +1172,13 @@ class CollectionState():
         if location:
             self.locations_checked.add(location)
 
+        mutable_container(self.prog_items, item.player)
         changed = self.multiworld.worlds[item.player].collect(self, item)
 
         self.stale[item.player] = True
+        if changed and self.multiworld.world_gate_unlocks:
+            for player in self.multiworld.world_gate_unlocks.get((item.player, item.code), ()):
+                self.stale[player] = True
 
         if changed and not prevent_sweep:
             self.sweep_for_advancements()
@@ -972,12 +1186,17 @@ class CollectionState():
         return changed
 
     def remove(self, item: Item):
+        mutable_container(self.prog_items, item.player)
         changed = self.multiworld.worlds[item.player].remove(self, item)
         if changed:
             # invalidate caches, nothing can be trusted anymore now
             self.reachable_regions[item.player] = set()
             self.blocked_connections[item.player] = set()
             self.stale[item.player] = True
+            for player in self.multiworld.world_gate_unlocks.get((item.player, item.code), ()):
+                self.reachable_regions[player] = set()
+                self.blocked_connections[player] = set()
+                self.stale[player] = True
 
 
 class EntranceType(IntEnum):
@@ -1089,13 +1308,13 @@ class Region:
         def __delitem__(self, index: int) -> None:
             location: Location = self._list.__getitem__(index)
             self._list.__delitem__(index)
-            del(self.region_manager.location_cache[location.player][location.name])
+            self.region_manager.unregister_location(location)
 
         def insert(self, index: int, value: Location) -> None:
             assert value.name not in self.region_manager.location_cache[value.player], \
                 f"{value.name} already exists in the location cache."
             self._list.insert(index, value)
-            self.region_manager.location_cache[value.player][value.name] = value
+            self.region_manager.register_location(value)
 
     class EntranceRegister(Register):
         def __delitem__(self, index: int) -> None:
@@ -1248,7 +1467,7 @@ class Location:
     always_allow: Callable[[CollectionState, Item], bool] = staticmethod(lambda state, item: False)
     access_rule: Callable[[CollectionState], bool] = staticmethod(lambda state: True)
     item_rule: Callable[[Item], bool] = staticmethod(lambda item: True)
-    item: Optional[Item] = None
+    _item: Optional[Item] = None
 
     def __init__(self, player: int, name: str = '', address: Optional[int] = None, parent: Optional[Region] = None):
         self.player = player
@@ -1256,6 +1475,17 @@ class Location:
         self.address = address
         self.parent_region = parent
 
+    @property
+    def item(self) -> Optional[Item]:
+        return self._item
+
+    @item.setter
+    def item(self, item: Optional[Item]) -> None:
+        # keep the multiworld's index of where items are placed up to date
+        if self.parent_region and self.parent_region.multiworld:
+            self.parent_region.multiworld.regions.update_item_location(self, self._item, item)
+        self._item = item
+
     def can_fill(self, state: CollectionState, item: Item, check_access: bool = True) -> bool:
         return ((
             self.always_allow(state, item)
@@ -1416,6 +1646,89 @@ class EntranceInfo(TypedDict, total=False):
     direction: str
 
 
+class SphereSweep:
+    """
+    Sweeps the logical spheres of a finished multiworld once, for everything that needs them after generation.
+
+    Spheres are built like get_sendable_spheres does: events are collected as soon as they are reachable, then all
+    reachable sendable locations form the next sphere. Once no further sendable location is reachable, the reachable
+    events left are collected as well, so the final state is that of a complete sweep.
+    """
+    multiworld: MultiWorld
+    state: CollectionState
+    """state after collecting everything reachable"""
+    sendable_spheres: List[Set[Location]]
+    """as get_sendable_spheres yields them"""
+    collection_order: List[Location]
+    """all collected locations, in the order they were collected"""
+    unreachable: Set[Location]
+
+    def __init__(self, multiworld: MultiWorld):
+        self.multiworld = multiworld
+        self.state = CollectionState(multiworld)
+        self.sendable_spheres = []
+        self.collection_order = []
+
+        locations: Set[Location] = set()
+        events: Set[Location] = set()
+        for location in multiworld.get_filled_locations():
+            if type(location.item.code) is int:
+                locations.add(location)
+            else:
+                events.add(location)
+
+        while locations:
+            self._collect_events(events)
+            sphere: Set[Location] = {location for location in locations if location.can_reach(self.state)}
+            self.sendable_spheres.append(sphere)
+            if not sphere:
+                self.sendable_spheres.append(locations)  # unreachable locations
+                break
+
+            for location in sphere:
+                self._collect(location)
+            locations -= sphere
+
+        self._collect_events(events)
+        self.unreachable = locations | events
+
+    def _collect(self, location: Location) -> None:
+        self.state.collect(location.item, True, location)
+        self.collection_order.append(location)
+
+    def _collect_events(self, events: Set[Location]) -> None:
+        done_events: Set[Union[Location, None]] = {None}
+        while done_events:
+            done_events = set()
+            for event in events:
+                if event.can_reach(self.state):
+                    self._collect(event)
+                    done_events.add(event)
+            events -= done_events
+
+    def can_beat_game(self) -> bool:
+        """Same as MultiWorld.can_beat_game without a starting state."""
+        return self.multiworld.has_beaten_game(self.state)
+
+    def fulfills_accessibility(self) -> bool:
+        """Same as MultiWorld.fulfills_accessibility without a state."""
+        multiworld = self.multiworld
+        full_players = {player for player, world in multiworld.worlds.items()
+                        if world.options.accessibility.current_key == "full"}
+        minimal_players = {player for player, world in multiworld.worlds.items()
+                           if world.options.accessibility.current_key == "minimal"}
+        missing = [location for location in self.unreachable
+                   if location.player in full_players or location.advancement]
+        missing += [location for location in multiworld.get_unfilled_locations()
+                    if location.player in full_players and not location.can_reach(self.state)]
+        if self.can_beat_game() and not any(location.player in full_players or location.item.player not in
+                                            minimal_players for location in missing):
+            return True
+        if missing:
+            logging.warning(f"Could not access required locations for accessibility check. Missing: {missing}")
+        return False
+
+
 class Spoiler:
     multiworld: MultiWorld
     hashes: Dict[int, str]
@@ -1423,6 +1736,8 @@ class Spoiler:
     playthrough: Dict[str, Union[List[str], Dict[str, str]]]  # sphere "0" is list, others are dict
     unreachables: Set[Location]
     paths: Dict[str, List[Union[Tuple[str, str], Tuple[str, None]]]]  # last step takes no further exits
+    max_state_checkpoints: ClassVar[int] = 16
+    """how many copies of the state create_playthrough keeps at most, instead of one for every sphere"""
 
     def __init__(self, multiworld: MultiWorld) -> None:
         self.multiworld = multiworld
@@ -1446,7 +1761,9 @@ class Spoiler:
         # get locations containing progress items
         multiworld = self.multiworld
         prog_locations = {location for location in multiworld.get_filled_locations() if location.item.advancement}
-        state_cache: List[Optional[CollectionState]] = [None]
+        # state before each checkpointed sphere, the states in between get rebuilt from a checkpoint when needed
+        state_checkpoints: Dict[int, CollectionState] = {}
+        checkpoint_interval = 1
         collection_spheres: List[Set[Location]] = []
         state = CollectionState(multiworld)
         sphere_candidates = set(prog_locations)
@@ -1463,7 +1780,12 @@ class Spoiler:
 
             sphere_candidates -= sphere
             collection_spheres.append(sphere)
-            state_cache.append(state.copy())
+            if len(collection_spheres) % checkpoint_interval == 0:
+                state_checkpoints[len(collection_spheres)] = state.copy()
+                if len(state_checkpoints) > self.max_state_checkpoints:
+                    checkpoint_interval *= 2
+                    state_checkpoints = {num: checkpoint for num, checkpoint in state_checkpoints.items()
+                                         if num % checkpoint_interval == 0}
 
             logging.debug('Calculated sphere %i, containing %i of %i progress items.', len(collection_spheres),
                           len(sphere),
@@ -1482,7 +1804,20 @@ class Spoiler:
         # in the second phase, we cull each sphere such that the game is still beatable,
         # reducing each range of influence to the bare minimum required inside it
         restore_later: Dict[Location, Item] = {}
+        location_spheres = {location: num for num, sphere in enumerate(collection_spheres) for location in sphere}
         for num, sphere in reversed(tuple(enumerate(collection_spheres))):
+            # lower spheres are not culled yet, so they rebuild the state this sphere was reached with
+            checkpoint = max((checkpoint for checkpoint in state_checkpoints if checkpoint <= num), default=0)
+            sphere_state = state_checkpoints[checkpoint].copy() if checkpoint else CollectionState(multiworld)
+            for lower_sphere in collection_spheres[checkpoint:num]:
+                for location in lower_sphere:
+                    sphere_state.collect(location.item, True, location)
+            state_checkpoints.pop(num, None)
+            sweep_locations = prog_locations - sphere_state.locations_checked
+            # the spheres built above are a sweep from sphere_state with every item still in place
+            sweep_bound = {location: location_num - num + 1 for location, location_num in location_spheres.items()
+                           if location_num >= num}
+
             to_delete: Set[Location] = set()
             for location in sphere:
                 # we remove the item at location and check if game is still beatable
@@ -1490,9 +1825,12 @@ class Spoiler:
                               location.item.player)
                 old_item = location.item
                 location.item = None
-                if multiworld.can_beat_game(state_cache[num]):
+                beatable, sweep_spheres = self._sweep_to_goal(sphere_state, sweep_locations, sweep_bound)
+                if beatable:
                     to_delete.add(location)
                     restore_later[location] = old_item
+                    # later checks have even fewer items, so this sweep bounds them more closely
+                    sweep_bound = sweep_spheres
                 else:
                     # still required, got to keep it around
                     location.item = old_item
@@ -1502,6 +1840,7 @@ class Spoiler:
 
         # second phase, sphere 0
         removed_precollected: List[Item] = []
+        sweep_bound = {location: location_num + 1 for location, location_num in location_spheres.items()}
 
         for precollected_items in multiworld.precollected_items.values():
             # The list of items is mutated by removing one item at a time to determine if each item is required to beat
@@ -1512,11 +1851,13 @@ class Spoiler:
                 logging.debug('Checking if %s (Player %d) is required to beat the game.', item.name, item.player)
                 precollected_items.remove(item)
                 multiworld.state.remove(item)
-                if not multiworld.can_beat_game():
+                beatable, sweep_spheres = self._sweep_to_goal(CollectionState(multiworld), prog_locations, sweep_bound)
+                if not beatable:
                     # Add the item back into `precollected_items` and collect it into `multiworld.state`.
                     multiworld.push_precollected(item)
                 else:
                     removed_precollected.append(item)
+                    sweep_bound = sweep_spheres
 
         # we are now down to just the required progress items in collection_spheres. Unfortunately
         # the previous pruning stage could potentially have made certain items dependant on others
@@ -1560,6 +1901,47 @@ class Spoiler:
         for item in removed_precollected:
             multiworld.push_precollected(item)
 
+    def _sweep_to_goal(self, state: CollectionState, locations: Iterable[Location],
+                       sweep_bound: Dict[Location, int]) -> Tuple[bool, Dict[Location, int]]:
+        """
+        Sweeps spheres from state like MultiWorld.can_beat_game, returning its result and the sphere each location was
+        collected in, counting from 1.
+
+        sweep_bound is the result of such a sweep from the same state with the same or more items. As logic is monotone,
+        a location can't be reachable any earlier than in that sweep, so its rule is not checked before then. Locations
+        it did not collect are only checked after its last sphere.
+        """
+        multiworld = self.multiworld
+        state = state.copy()
+        spheres: Dict[Location, int] = {}
+        if multiworld.has_beaten_game(state):
+            return True, spheres
+        unbound = max(sweep_bound.values(), default=0) + 1
+        pending: Dict[int, List[Location]] = {}
+        for location in locations:
+            if location.item and location not in state.locations_checked:
+                pending.setdefault(sweep_bound.get(location, unbound), []).append(location)
+
+        candidates: Set[Location] = set()
+        num = 0
+        while candidates or pending:
+            num += 1
+            candidates.update(pending.pop(num, ()))
+            sphere = {location for location in candidates if location.can_reach(state)}
+            if not sphere:
+                # pending locations can't become reachable either, the bounding sweep's larger state didn't reach them
+                return False, spheres
+
+            for location in sphere:
+                state.collect(location.item, True, location)
+                spheres[location] = num
+            candidates -= sphere
+
+            if multiworld.has_beaten_game(state):
+                return True, spheres
+
+        return False, spheres
+
     def create_paths(self, state: CollectionState, collection_spheres: List[Set[Location]]) -> None:
         from itertools import zip_longest
         multiworld = self.multiworld
@@ -59,6 +59,17 @@ def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locati
     for item in item_pool:
         reachable_items.setdefault(item.player, deque()).append(item)
 
+    # base_state with everything still to be placed (item_pool + unplaced_items) collected, but not swept.
+    # Kept up to date by removing/collecting only the items that leave/re-enter the pool,
+    # so each step only has to sweep a copy of it instead of re-collecting the whole pool.
+    pool_state = base_state.copy()
+    for item in item_pool:
+        pool_state.collect(item, True)
+
+    def return_to_pool(returned_items: typing.Iterable[Item]) -> None:
+        for returned_item in returned_items:
+            pool_state.collect(returned_item, True)
+
     # for progress logging
     total = min(len(item_pool), len(locations))
     placed = 0
@@ -79,10 +90,11 @@ def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locati
                 if pool_item is item:
                     item_pool.pop(p)
                     break
+            pool_state.remove(item)
 
-        maximum_exploration_state = sweep_from_pool(
-            base_state, item_pool + unplaced_items, multiworld.get_filled_locations(item.player)
-            if single_player_placement else None)
+        maximum_exploration_state = pool_state.copy()
+        maximum_exploration_state.sweep_for_advancements(
+            multiworld.get_filled_locations(item.player) if single_player_placement else None)
 
         has_beaten_game = multiworld.has_beaten_game(maximum_exploration_state)
 
@@ -90,6 +102,7 @@ def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locati
             # if we have run out of locations to fill,break out of this loop
             if not locations:
                 unplaced_items += items_to_place
+                return_to_pool(items_to_place)
                 break
             item_to_place = items_to_place.pop(0)
 
@@ -157,6 +170,7 @@ def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locati
                                 reachable_items[placed_item.player].appendleft(
                                     placed_item)
                                 item_pool.append(placed_item)
+                                return_to_pool((placed_item,))
 
                                 # cleanup at the end to hopefully get better errors
                                 cleanup_required = True
@@ -170,9 +184,11 @@ def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locati
                     if spot_to_fill is None:
                         # Can't place this item, move on to the next
                         unplaced_items.append(item_to_place)
+                        return_to_pool((item_to_place,))
                         continue
                 else:
                     unplaced_items.append(item_to_place)
+                    return_to_pool((item_to_place,))
                     continue
             multiworld.push_item(spot_to_fill, item_to_place, False)
             spot_to_fill.locked = lock
@@ -691,11 +707,47 @@ def balance_multiworld_progression(multiworld: MultiWorld) -> None:
         }
         sphere_num: int = 1
         moved_item_count: int = 0
+        # the locations found reachable in later spheres while testing for balancing,
+        # these stay the same until items get moved
+        sphere_cache: typing.Dict[int, typing.Set[Location]] = {}
 
         def get_sphere_locations(sphere_state: CollectionState,
                                  locations: typing.Set[Location]) -> typing.Set[Location]:
             return {loc for loc in locations if sphere_state.can_reach(loc)}
 
+        def sweep_spheres(sweep_state: CollectionState, locations: typing.Iterable[Location],
+                          sweep_bound: typing.Optional[typing.Dict[Location, int]] = None) -> typing.Dict[Location, int]:
+            """
+            Collects the advancements at locations like sweep_state.sweep_for_advancements(locations) does,
+            returning the sphere each of them was collected in.
+
+            sweep_bound is the result of such a sweep from a state with the same or more items. As logic is monotone,
+            a location can't be reachable any earlier than in that sweep, or at all if that sweep didn't collect it.
+            """
+            pending: typing.Dict[int, typing.List[Location]] = collections.defaultdict(list)
+            for location in locations:
+                if location.advancement and location not in sweep_state.advancements:
+                    if sweep_bound is None:
+                        pending[1].append(location)
+                    elif location in sweep_bound:
+                        pending[sweep_bound[location]].append(location)
+            spheres: typing.Dict[Location, int] = {}
+            candidates: typing.Set[Location] = set()
+            sphere = 0
+            while candidates or pending:
+                sphere += 1
+                candidates.update(pending.pop(sphere, ()))
+                reachable = get_sphere_locations(sweep_state, candidates)
+                if not reachable:
+                    # what is still pending wasn't reachable with the more items of the bounding sweep either
+                    break
+                for location in reachable:
+                    sweep_state.advancements.add(location)
+                    sweep_state.collect(location.item, True, location)
+                    spheres[location] = sphere
+                candidates -= reachable
+            return spheres
+
         def item_percentage(player: int, num: int) -> float:
             return num / total_locations_count[player]
 
@@ -707,7 +759,10 @@ def balance_multiworld_progression(multiworld: MultiWorld) -> None:
             # Gather non-locked locations.
             # This ensures that only shuffled locations get counted for progression balancing,
             #   i.e. the items the players will be checking.
-            sphere_locations = get_sphere_locations(state, unchecked_locations)
+            if sphere_num in sphere_cache:
+                sphere_locations = sphere_cache.pop(sphere_num)
+            else:
+                sphere_locations = get_sphere_locations(state, unchecked_locations)
             for location in sphere_locations:
                 unchecked_locations.remove(location)
                 if not location.locked:
@@ -741,6 +796,7 @@ def balance_multiworld_progression(multiworld: MultiWorld) -> None:
                     balancing_unchecked_locations = unchecked_locations.copy()
                     balancing_reachables = reachable_locations_count.copy()
                     balancing_sphere = sphere_locations.copy()
+                    balancing_sphere_num = sphere_num
                     candidate_items: typing.Dict[int, typing.Set[Location]] = collections.defaultdict(set)
                     while True:
                         # Check locations in the current sphere and gather progression items to swap earlier
@@ -755,7 +811,12 @@ def balance_multiworld_progression(multiworld: MultiWorld) -> None:
                                         location.progress_type != LocationProgressType.PRIORITY):
                                     candidate_items[player].add(location)
                                     logging.debug(f"Candidate item: {location.name}, {location.item.name}")
-                        balancing_sphere = get_sphere_locations(balancing_state, balancing_unchecked_locations)
+                        if balancing_sphere_num in sphere_cache:
+                            balancing_sphere = sphere_cache[balancing_sphere_num]
+                        else:
+                            balancing_sphere = get_sphere_locations(balancing_state, balancing_unchecked_locations)
+                            sphere_cache[balancing_sphere_num] = balancing_sphere
+                        balancing_sphere_num += 1
                         for location in balancing_sphere:
                             balancing_unchecked_locations.remove(location)
                             if not location.locked:
@@ -778,6 +839,13 @@ def balance_multiworld_progression(multiworld: MultiWorld) -> None:
                         items_to_test = list(candidate_items[player])
                         items_to_test.sort()
                         multiworld.random.shuffle(items_to_test)
+                        # every test collects some of the candidate items, so one sweep with all of them bounds its
+                        # sweep and its reachable locations
+                        bounding_state = state.copy()
+                        for location in items_to_test:
+                            bounding_state.collect(location.item, True, location)
+                        sweep_bound = sweep_spheres(bounding_state, locations_to_test)
+                        reachable_bound = get_sphere_locations(bounding_state, locations_to_test)
                         while items_to_test:
                             testing = items_to_test.pop()
                             reducing_state = state.copy()
@@ -787,13 +855,13 @@ def balance_multiworld_progression(multiworld: MultiWorld) -> None:
                             ), items_to_test):
                                 reducing_state.collect(location.item, True, location)
 
-                            reducing_state.sweep_for_advancements(locations=locations_to_test)
+                            sweep_spheres(reducing_state, locations_to_test, sweep_bound)
 
                             if multiworld.has_beaten_game(balancing_state):
                                 if not multiworld.has_beaten_game(reducing_state):
                                     items_to_replace.append(testing)
                             else:
-                                reduced_sphere = get_sphere_locations(reducing_state, locations_to_test)
+                                reduced_sphere = get_sphere_locations(reducing_state, reachable_bound)
                                 p = item_percentage(player, reachable_locations_count[player] + len(reduced_sphere))
                                 if p < threshold_percentages[player]:
                                     items_to_replace.append(testing)
@@ -825,6 +893,7 @@ def balance_multiworld_progression(multiworld: MultiWorld) -> None:
 
                     if old_moved_item_count < moved_item_count:
                         logging.debug(f"Moved {moved_item_count} items so far\n")
+                        sphere_cache.clear()
                         unlocked = {fresh for player in balancing_players for fresh in unlocked_locations[player]}
                         for location in get_sphere_locations(state, unlocked):
                             unchecked_locations.remove(location)
@@ -54,6 +54,12 @@ def mystery_argparse():
     parser.add_argument("--skip_output", action="store_true",
                         help="Skips generation assertion and output stages and skips multidata and spoiler output. "
                              "Intended for debugging and testing purposes.")
+    parser.add_argument("--stage_processes", type=int, default=0,
+                        help="Number of processes for the generation stages of worlds that can be generated in a "
+                             "separate process. 0 runs all stages in the main process.")
+    parser.add_argument("--output_processes", type=int, default=0,
+                        help="Number of processes for the output of worlds that can be generated in a separate process. "
+                             "0 generates all output in threads of the main process.")
     args = parser.parse_args()
     if not os.path.isabs(args.weights_file_path):
         args.weights_file_path = os.path.join(args.player_files_path, args.weights_file_path)
@@ -164,6 +170,8 @@ def main(args=None) -> Tuple[argparse.Namespace, int]:
     erargs.outputpath = args.outputpath
     erargs.skip_prog_balancing = args.skip_prog_balancing
     erargs.skip_output = args.skip_output
+    erargs.stage_processes = args.stage_processes
+    erargs.output_processes = args.output_processes
     erargs.name = {}
     erargs.csv_output = args.csv_output
 
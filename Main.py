@@ -1,16 +1,16 @@
 import collections
 import concurrent.futures
+import contextlib
 import logging
+import multiprocessing
 import os
-import pickle
 import tempfile
 import time
 import zipfile
-import zlib
 from typing import Dict, List, Optional, Set, Tuple, Union
 
 import worlds
-from BaseClasses import CollectionState, Item, Location, LocationProgressType, MultiWorld, Region
+from BaseClasses import CollectionState, Item, Location, LocationProgressType, MultiWorld, Region, SphereSweep
 from Fill import FillError, balance_multiworld_progression, distribute_items_restrictive, distribute_planned, \
     flood_items
 from Options import StartInventoryPool
@@ -61,6 +61,7 @@ def main(args, seed=None, baked_server_options: Optional[Dict[str, object]] = No
     for cls in AutoWorld.AutoWorldRegister.world_types.values():
         if cls.item_id_to_name:
             max_item = max(max_item, max(cls.item_id_to_name))
+        if cls.location_id_to_name:
             max_location = max(max_location, max(cls.location_id_to_name))
 
     item_digits = len(str(max_item))
@@ -75,8 +76,8 @@ def main(args, seed=None, baked_server_options: Optional[Dict[str, object]] = No
                         f"Items (IDs: {min(cls.item_id_to_name):{item_digits}} - "
                         f"{max(cls.item_id_to_name):{item_digits}}) | "
                         f"{len(cls.location_names):{location_count}} "
-                        f"Locations (IDs: {min(cls.location_id_to_name):{location_digits}} - "
-                        f"{max(cls.location_id_to_name):{location_digits}})")
+                        f"Locations (IDs: {min(cls.location_id_to_name, default=0):{location_digits}} - "
+                        f"{max(cls.location_id_to_name, default=0):{location_digits}})")
 
     del item_digits, location_digits, item_count, location_count
 
@@ -84,7 +85,7 @@ def main(args, seed=None, baked_server_options: Optional[Dict[str, object]] = No
     if not args.skip_output:
         AutoWorld.call_stage(multiworld, "assert_generate")
 
-    AutoWorld.call_all(multiworld, "generate_early")
+    AutoWorld.call_all(multiworld, "generate_early", processes=args.stage_processes)
 
     logger.info('')
 
@@ -111,10 +112,10 @@ def main(args, seed=None, baked_server_options: Optional[Dict[str, object]] = No
             del early
 
     logger.info('Creating MultiWorld.')
-    AutoWorld.call_all(multiworld, "create_regions")
+    AutoWorld.call_all(multiworld, "create_regions", processes=args.stage_processes)
 
     logger.info('Creating Items.')
-    AutoWorld.call_all(multiworld, "create_items")
+    AutoWorld.call_all(multiworld, "create_items", processes=args.stage_processes)
 
     logger.info('Calculating Access Rules.')
 
@@ -123,7 +124,7 @@ def main(args, seed=None, baked_server_options: Optional[Dict[str, object]] = No
         multiworld.worlds[player].options.non_local_items.value -= multiworld.worlds[player].options.local_items.value
         multiworld.worlds[player].options.non_local_items.value -= set(multiworld.local_early_items[player])
 
-    AutoWorld.call_all(multiworld, "set_rules")
+    AutoWorld.call_all(multiworld, "set_rules", processes=args.stage_processes)
 
     for player in multiworld.player_ids:
         exclusion_rules(multiworld, player, multiworld.worlds[player].options.exclude_locations.value)
@@ -150,7 +151,7 @@ def main(args, seed=None, baked_server_options: Optional[Dict[str, object]] = No
         multiworld.worlds[1].options.local_items.value = set()
 
     AutoWorld.call_all(multiworld, "connect_entrances")
-    AutoWorld.call_all(multiworld, "generate_basic")
+    AutoWorld.call_all(multiworld, "generate_basic", processes=args.stage_processes)
 
     # remove starting inventory from pool items.
     # Because some worlds don't actually create items during create_items this has to be as late as possible.
@@ -228,11 +229,27 @@ def main(args, seed=None, baked_server_options: Optional[Dict[str, object]] = No
     with output as temp_dir:
         output_players = [player for player in multiworld.player_ids if AutoWorld.World.generate_output.__code__
                           is not multiworld.worlds[player].generate_output.__code__]
-        with concurrent.futures.ThreadPoolExecutor(len(output_players) + 2) as pool:
-            check_accessibility_task = pool.submit(multiworld.fulfills_accessibility)
-
-            output_file_futures = [pool.submit(AutoWorld.call_stage, multiworld, "generate_output", temp_dir)]
+        process_players: List[int] = []
+        process_pool: Optional[concurrent.futures.ProcessPoolExecutor] = None
+        if args.output_processes and "fork" in multiprocessing.get_all_start_methods():
+            process_players = [player for player in output_players
+                               if multiworld.worlds[player].generate_output_in_process]
+            if process_players:
+                process_pool = concurrent.futures.ProcessPoolExecutor(
+                    min(args.output_processes, len(process_players)), multiprocessing.get_context("fork"),
+                    _set_forked_multiworld, (multiworld,))
+        with process_pool or contextlib.nullcontext(), \
+                concurrent.futures.ThreadPoolExecutor(len(output_players) - len(process_players) + 2) as pool:
+            # the processes fork on the first submit, which has to happen before any output thread is started
+            output_file_futures = [process_pool.submit(_generate_forked_output, player, temp_dir)
+                                   for player in process_players]
+            # one sweep of the spheres serves both the accessibility check and the multidata spheres
+            sphere_sweep_task = pool.submit(SphereSweep, multiworld)
+
+            output_file_futures.append(pool.submit(AutoWorld.call_stage, multiworld, "generate_output", temp_dir))
             for player in output_players:
+                if player in process_players:
+                    continue
                 # skip starting a thread for methods that say "pass".
                 output_file_futures.append(
                     pool.submit(AutoWorld.call_single, multiworld, "generate_output", player, temp_dir))
@@ -311,7 +328,7 @@ def main(args, seed=None, baked_server_options: Optional[Dict[str, object]] = No
 
                 # get spheres -> filter address==None -> skip empty
                 spheres: List[Dict[int, Set[int]]] = []
-                for sphere in multiworld.get_sendable_spheres():
+                for sphere in sphere_sweep_task.result().sendable_spheres:
                     current_sphere: Dict[int, Set[int]] = collections.defaultdict(set)
                     for sphere_location in sphere:
                         current_sphere[sphere_location.player].add(sphere_location.address)
@@ -339,15 +356,15 @@ def main(args, seed=None, baked_server_options: Optional[Dict[str, object]] = No
                 }
                 AutoWorld.call_all(multiworld, "modify_multidata", multidata)
 
-                multidata = zlib.compress(pickle.dumps(multidata), 9)
+                multidata = NetUtils.encode_multidata(multidata)
 
                 with open(os.path.join(temp_dir, f'{outfilebase}.archipelago'), 'wb') as f:
-                    f.write(bytes([3]))  # version of format
                     f.write(multidata)
 
             output_file_futures.append(pool.submit(write_multidata))
-            if not check_accessibility_task.result():
-                if not multiworld.can_beat_game():
+            sphere_sweep = sphere_sweep_task.result()
+            if not sphere_sweep.fulfills_accessibility():
+                if not sphere_sweep.can_beat_game():
                     raise FillError("Game appears as unbeatable. Aborting.", multiworld=multiworld)
                 else:
                     logger.warning("Location Accessibility requirements not fulfilled.")
@@ -374,3 +391,17 @@ def main(args, seed=None, baked_server_options: Optional[Dict[str, object]] = No
 
     logger.info('Done. Enjoy. Total Time: %s', time.perf_counter() - start)
     return multiworld
+
+
+_forked_multiworld: Optional[MultiWorld] = None
+
+
+def _set_forked_multiworld(multiworld: MultiWorld) -> None:
+    # with fork, the multiworld is inherited by the output process instead of being pickled
+    global _forked_multiworld
+    _forked_multiworld = multiworld
+
+
+def _generate_forked_output(player: int, output_directory: str) -> None:
+    assert _forked_multiworld is not None, "output process was not forked from the generating process"
+    AutoWorld.call_single(_forked_multiworld, "generate_output", player, output_directory)
@@ -12,7 +12,9 @@ import inspect
 import itertools
 import logging
 import math
+import mmap
 import operator
+import os
 import pickle
 import random
 import shlex
@@ -117,6 +119,48 @@ def get_saving_second(seed_name: str, interval: int = 60) -> int:
     return int(hashlib.sha256(seed_name.encode()).hexdigest(), 16) % interval
 
 
+def apply_save_journal(save: dict, journal: typing.Iterable[dict]) -> int:
+    """Replays journal records, as written by Context._save, onto a save as returned by Context.get_save.
+    Records of another journal generation predate the save and are skipped. Returns the amount of replayed records."""
+    replayed = 0
+    slot_states: typing.Dict[typing.Tuple[int, int], typing.Dict[str, typing.Any]] = {}
+    for record in journal:
+        if record["journal_generation"] != save.get("journal_generation", 0):
+            continue
+        for team_slot, locations in record["location_checks"].items():
+            save["location_checks"].setdefault(team_slot, set()).update(locations)
+        for key, (start, items) in record["received_items"].items():
+            # assigning the slice instead of extending makes replaying a record twice harmless
+            save["received_items"].setdefault(key, [])[start:] = items
+        save["hints"].update(record["hints"])
+        save.setdefault("stored_data", {}).update(record["stored_data"])
+        # slot states are journaled in full, so only the last one of each slot is applied
+        slot_states.update(record["slot_states"])
+        save.setdefault("group_collected", {}).update(record["group_collected"])
+        if "random_state" in record:
+            save["random_state"] = record["random_state"]
+        if "game_options" in record:
+            save["game_options"] = record["game_options"]
+        replayed += 1
+    if slot_states:
+        activity_timers = {tuple(key): value for key, value in save["client_activity_timers"]}
+        connection_timers = {tuple(key): value for key, value in save["client_connection_timers"]}
+        for team_slot, state in slot_states.items():
+            # None marks a slot that has no entry
+            for values, value in ((save["hints_used"], state["hints_used"]),
+                                  (save["client_game_state"], state["client_game_state"]),
+                                  (save["name_aliases"], state["name_alias"]),
+                                  (activity_timers, state["client_activity_timer"]),
+                                  (connection_timers, state["client_connection_timer"])):
+                if value is None:
+                    values.pop(team_slot, None)
+                else:
+                    values[team_slot] = value
+        save["client_activity_timers"] = tuple(activity_timers.items())
+        save["client_connection_timers"] = tuple(connection_timers.items())
+    return replayed
+
+
 class Client(Endpoint):
     version = Version(0, 0, 0)
     tags: typing.List[str] = []
@@ -128,8 +172,8 @@ class Client(Endpoint):
     def __init__(self, socket: websockets.WebSocketServerProtocol, ctx: Context):
         super().__init__(socket)
         self.auth = False
-        self.team = None
-        self.slot = None
+        self.team: typing.Optional[int] = None
+        self.slot: typing.Optional[int] = None
         self.send_index = 0
         self.tags = []
         self.messageprocessor = client_message_processor(ctx, self)
@@ -175,6 +219,10 @@ class Context:
                       "compatibility": int}
     # team -> slot id -> list of clients authenticated to slot.
     clients: typing.Dict[int, typing.Dict[int, typing.List[Client]]]
+    # (team, tag) -> clients authenticated with that tag.
+    tagged_clients: typing.Dict[typing.Tuple[int, str], typing.Set[Client]]
+    # game -> slot ids playing it, to find the clients of a game through clients.
+    game_slots: typing.Dict[str, typing.Set[int]]
     locations: LocationStore  # typing.Dict[int, typing.Dict[int, typing.Tuple[int, int, int]]]
     location_checks: typing.Dict[typing.Tuple[int, int], typing.Set[int]]
     hints_used: typing.Dict[typing.Tuple[int, int], int]
@@ -207,6 +255,8 @@ class Context:
         self.log_network = log_network
         self.endpoints = []
         self.clients = {}
+        self.tagged_clients = collections.defaultdict(set)
+        self.game_slots = {}
         self.compatibility: int = compatibility
         self.shutdown_task = None
         self.data_filename = None
@@ -230,6 +280,8 @@ class Context:
         self.location_check_points = location_check_points
         self.hints_used = collections.defaultdict(int)
         self.hints: typing.Dict[team_slot, typing.Set[Hint]] = collections.defaultdict(set)
+        # (team, slot, location) -> hints[team, slot] of that location, kept in sync by the hint methods below
+        self.location_hints: typing.Dict[typing.Tuple[int, int, int], typing.Set[Hint]] = {}
         self.release_mode: str = release_mode
         self.remaining_mode: str = remaining_mode
         self.collect_mode: str = collect_mode
@@ -248,6 +300,22 @@ class Context:
         self.auto_save_interval = 60  # in seconds
         self.auto_saver_thread: typing.Optional[threading.Thread] = None
         self.save_dirty = False
+        # saves append what changed since the previous save to a journal, which is compacted into a new snapshot
+        # after save_journal_limit records
+        self.save_journal_limit = 100
+        self.save_journal_records = 0
+        self.save_journal_generation = 0
+        self.save_snapshot_due = True
+        self.unsaved_location_checks: typing.Dict[team_slot, typing.Set[int]] = collections.defaultdict(set)
+        self.unsaved_hints: typing.Set[team_slot] = set()
+        self.unsaved_stored_data: typing.Set[str] = set()
+        self.unsaved_received_items: typing.Set[typing.Tuple[int, int, bool]] = set()
+        self.saved_received_items: typing.Dict[typing.Tuple[int, int, bool], int] = {}
+        # slots whose hints_used, name_aliases, client_game_state or timers changed
+        self.unsaved_slot_states: typing.Set[team_slot] = set()
+        self.unsaved_group_collected: typing.Set[int] = set()
+        self.unsaved_random_state = False
+        self.unsaved_game_options = False
         self.tags = ['AP']
         self.games: typing.Dict[int, str] = {}
         self.minimum_client_versions: typing.Dict[int, Version] = {}
@@ -385,9 +453,39 @@ class Context:
         if endpoint in self.endpoints:
             self.endpoints.remove(endpoint)
         if endpoint.slot and endpoint in self.clients[endpoint.team][endpoint.slot]:
-            self.clients[endpoint.team][endpoint.slot].remove(endpoint)
+            self.remove_client(endpoint)
         await on_client_disconnected(self, endpoint)
 
+    def add_client(self, client: Client):
+        """Adds an authenticated client to the client indexes."""
+        self.clients[client.team][client.slot].append(client)
+        for tag in client.tags:
+            self.tagged_clients[client.team, tag].add(client)
+
+    def remove_client(self, client: Client):
+        self.clients[client.team][client.slot].remove(client)
+        for tag in client.tags:
+            self.tagged_clients[client.team, tag].discard(client)
+
+    def set_client_tags(self, client: Client, tags: typing.List[str]):
+        for tag in client.tags:
+            self.tagged_clients[client.team, tag].discard(client)
+        client.tags = tags
+        for tag in tags:
+            self.tagged_clients[client.team, tag].add(client)
+
+    def get_bounce_targets(self, team: int, games: typing.Set[str], tags: typing.Set[str],
+                           slots: typing.Set[int]) -> typing.Set[Client]:
+        """Clients of the team that play any of the games, have any of the tags or are connected to any of the slots."""
+        targets: typing.Set[Client] = set()
+        for game in games:
+            slots = slots | self.game_slots.get(game, set())
+        for slot in slots:
+            targets.update(self.clients[team].get(slot, ()))
+        for tag in tags:
+            targets.update(self.tagged_clients.get((team, tag), ()))
+        return targets
+
     def notify_client(self, client: Client, text: str, additional_arguments: dict = {}):
         if not client.auth:
             return
@@ -412,19 +510,17 @@ class Context:
                         break
                 else:
                     raise Exception("No .archipelago found in archive.")
+            decoded_obj = self.decompress(data)
         else:
-            with open(multidatapath, 'rb') as f:
-                data = f.read()
+            with open(multidatapath, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                decoded_obj = self.decompress(data)
 
-        self._load(self.decompress(data), {}, use_embedded_server_options)
+        self._load(decoded_obj, {}, use_embedded_server_options)
         self.data_filename = multidatapath
 
     @staticmethod
-    def decompress(data: bytes) -> dict:
-        format_version = data[0]
-        if format_version > 3:
-            raise Utils.VersionException("Incompatible multidata.")
-        return restricted_loads(zlib.decompress(data[1:]))
+    def decompress(data: typing.Union[bytes, mmap.mmap]) -> dict:
+        return NetUtils.decode_multidata(data)
 
     def _load(self, decoded_obj: dict, game_data_packages: typing.Dict[str, typing.Any],
               use_embedded_server_options: bool):
@@ -444,6 +540,9 @@ class Context:
 
         self.slot_info = decoded_obj["slot_info"]
         self.games = {slot: slot_info.game for slot, slot_info in self.slot_info.items()}
+        self.game_slots = {}
+        for slot, game in self.games.items():
+            self.game_slots.setdefault(game, set()).add(slot)
         self.groups = {slot: set(slot_info.group_members) for slot, slot_info in self.slot_info.items()
                        if slot_info.type == SlotType.group}
 
@@ -476,7 +575,8 @@ class Context:
             self.start_inventory[slot] = [NetworkItem(item_code, -2, 0) for item_code in item_codes]
 
         for slot, hints in decoded_obj["precollected_hints"].items():
-            self.hints[0, slot].update(hints)
+            for hint in hints:
+                self.add_hint(0, slot, hint)
 
         # declare slots that aren't players as done
         for slot, slot_info in self.slot_info.items():
@@ -523,15 +623,68 @@ class Context:
 
     def _save(self, exit_save: bool = False) -> bool:
         try:
-            encoded_save = pickle.dumps(self.get_save())
-            with open(self.save_filename, "wb") as f:
-                f.write(zlib.compress(encoded_save))
+            self._write_save(exit_save)
         except Exception as e:
             self.logger.exception(e)
             return False
         else:
             return True
 
+    def _write_save(self, exit_save: bool = False):
+        if self.save_snapshot_due or exit_save or self.save_journal_records >= self.save_journal_limit:
+            self._compact_save()
+        else:
+            record = self.get_save_journal_record()
+            if record:
+                self._append_save_journal(record)
+                self.save_journal_records += 1
+
+    def _compact_save(self):
+        """Writes a full snapshot, which makes the current journal obsolete."""
+        self.save_journal_generation += 1
+        # reset before taking the snapshot, anything changing in between is contained in both and replays harmlessly
+        self.reset_save_journal()
+        self._write_save_snapshot(self.get_save())
+        self.save_journal_records = 0
+        self.save_snapshot_due = False
+
+    def _write_save_snapshot(self, save: dict):
+        temp_filename = self.save_filename + ".tmp"
+        with open(temp_filename, "wb") as f:
+            f.write(zlib.compress(pickle.dumps(save)))
+        os.replace(temp_filename, self.save_filename)
+        # records of the previous generation are skipped when loading, so a crash before this point loses nothing
+        open(self.save_journal_filename, "wb").close()
+
+    def _append_save_journal(self, record: dict):
+        data = zlib.compress(pickle.dumps(record))
+        with open(self.save_journal_filename, "ab") as f:
+            f.write(len(data).to_bytes(4, "little") + data)
+
+    @property
+    def save_journal_filename(self) -> str:
+        return self.save_filename + ".journal"
+
+    def read_save_journal(self) -> typing.List[typing.Dict[str, typing.Any]]:
+        try:
+            with open(self.save_journal_filename, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return []
+        records: typing.List[typing.Dict[str, typing.Any]] = []
+        position = 0
+        while position + 4 <= len(data):
+            size = int.from_bytes(data[position:position + 4], "little")
+            if position + 4 + size > len(data):
+                break
+            records.append(restricted_loads(zlib.decompress(data[position + 4:position + 4 + size])))
+            position += 4 + size
+        if position != len(data):
+            self.logger.warning("Save journal ends in an incomplete record, likely from a crash while saving. "
+                                "Ignoring it.")
+            self.save_snapshot_due = True  # rewrites the journal, instead of appending after the broken record
+        return records
+
     def init_save(self, enabled: bool = True):
         self.saving = enabled
         if self.saving:
@@ -543,7 +696,8 @@ class Context:
             try:
                 with open(self.save_filename, 'rb') as f:
                     save_data = restricted_loads(zlib.decompress(f.read()))
-                    self.set_save(save_data)
+                self.save_snapshot_due = False
+                self.set_save(save_data, self.read_save_journal())
             except FileNotFoundError:
                 self.logger.error('No save data found, starting a new game')
             except Exception as e:
@@ -585,6 +739,7 @@ class Context:
         self.recheck_hints()
         d = {
             "version": self.save_version,
+            "journal_generation": self.save_journal_generation,
             "connect_names": self.connect_names,
             "received_items": self.received_items,
             "hints_used": dict(self.hints_used),
@@ -599,24 +754,91 @@ class Context:
             "random_state": self.random.getstate(),
             "group_collected": dict(self.group_collected),
             "stored_data": self.stored_data,
-            "game_options": {"hint_cost": self.hint_cost, "location_check_points": self.location_check_points,
-                             "server_password": self.server_password, "password": self.password,
-                             "release_mode": self.release_mode,
-                             "remaining_mode": self.remaining_mode, "collect_mode": self.collect_mode,
-                             "item_cheat": self.item_cheat, "compatibility": self.compatibility}
-
+            "game_options": self.get_save_game_options()
         }
 
         return d
 
-    def set_save(self, savedata: dict):
+    def get_save_game_options(self) -> typing.Dict[str, typing.Any]:
+        return {"hint_cost": self.hint_cost, "location_check_points": self.location_check_points,
+                "server_password": self.server_password, "password": self.password,
+                "release_mode": self.release_mode,
+                "remaining_mode": self.remaining_mode, "collect_mode": self.collect_mode,
+                "item_cheat": self.item_cheat, "compatibility": self.compatibility}
+
+    def get_save_slot_state(self, team_slot: team_slot) -> typing.Dict[str, typing.Any]:
+        activity_timer = self.client_activity_timers.get(team_slot, None)
+        connection_timer = self.client_connection_timers.get(team_slot, None)
+        return {
+            "hints_used": self.hints_used.get(team_slot, None),
+            "name_alias": self.name_aliases.get(team_slot, None),
+            "client_game_state": self.client_game_state.get(team_slot, None),
+            "client_activity_timer": activity_timer.timestamp() if activity_timer else None,
+            "client_connection_timer": connection_timer.timestamp() if connection_timer else None,
+        }
+
+    def get_save_journal_record(self) -> typing.Optional[typing.Dict[str, typing.Any]]:
+        """Changes since the previous save, to be replayed onto the last snapshot by apply_save_journal.
+        Returns None if nothing changed."""
+        location_checks, self.unsaved_location_checks = self.unsaved_location_checks, collections.defaultdict(set)
+        hints, self.unsaved_hints = self.unsaved_hints, set()
+        stored_data, self.unsaved_stored_data = self.unsaved_stored_data, set()
+        received_item_keys, self.unsaved_received_items = self.unsaved_received_items, set()
+        slot_states, self.unsaved_slot_states = self.unsaved_slot_states, set()
+        group_collected, self.unsaved_group_collected = self.unsaved_group_collected, set()
+        received_items = {}
+        for key in received_item_keys:
+            items = self.received_items[key]
+            start = self.saved_received_items.get(key, 0)
+            if len(items) > start:
+                received_items[key] = start, items[start:]
+                self.saved_received_items[key] = len(items)
+        record: typing.Dict[str, typing.Any] = {
+            "location_checks": dict(location_checks),
+            "received_items": received_items,
+            "hints": {team_slot: self.hints[team_slot] for team_slot in hints},
+            "stored_data": {key: self.stored_data[key] for key in stored_data if key in self.stored_data},
+            "slot_states": {team_slot: self.get_save_slot_state(team_slot) for team_slot in slot_states},
+            "group_collected": {group: set(self.group_collected[group]) for group in group_collected},
+        }
+        if self.unsaved_random_state:
+            record["random_state"] = self.random.getstate()
+            self.unsaved_random_state = False
+        if self.unsaved_game_options:
+            record["game_options"] = self.get_save_game_options()
+            self.unsaved_game_options = False
+        if not any(record.values()):
+            return None
+        record["journal_generation"] = self.save_journal_generation
+        return record
+
+    def reset_save_journal(self):
+        """Marks the current state as saved."""
+        self.unsaved_location_checks = collections.defaultdict(set)
+        self.unsaved_hints = set()
+        self.unsaved_stored_data = set()
+        self.unsaved_received_items = set()
+        self.saved_received_items = {key: len(items) for key, items in self.received_items.items()}
+        self.unsaved_slot_states = set()
+        self.unsaved_group_collected = set()
+        self.unsaved_random_state = False
+        self.unsaved_game_options = False
+
+    def set_save(self, savedata: typing.Dict[str, typing.Any],
+                 journal: typing.Iterable[typing.Dict[str, typing.Any]] = ()):
         if self.connect_names != savedata["connect_names"]:
             raise Exception("This savegame does not appear to match the loaded multiworld.")
         if savedata["version"] > self.save_version:
             raise Exception("This savegame is newer than the server.")
+        self.save_journal_records = apply_save_journal(savedata, journal)
+        self.save_journal_generation = savedata.get("journal_generation", 0)
         self.received_items = savedata["received_items"]
         self.hints_used.update(savedata["hints_used"])
         self.hints.update(savedata["hints"])
+        self.location_hints = {}
+        for (team, slot), hints in self.hints.items():
+            for hint in hints:
+                self.location_hints.setdefault((team, slot, hint.location), set()).add(hint)
 
         self.name_aliases.update(savedata["name_aliases"])
         self.client_game_state.update(savedata["client_game_state"])
@@ -645,6 +867,7 @@ class Context:
 
         if "stored_data" in savedata:
             self.stored_data = savedata["stored_data"]
+        self.reset_save_journal()
         # count items and slots from lists for items_handling = remote
         self.logger.info(
             f'Loaded save file with {sum([len(v) for k, v in self.received_items.items() if k[2]])} received items '
@@ -674,6 +897,10 @@ class Context:
                 new_hints.add(new_hint)
                 if hint == new_hint:
                     continue
+                self.unsaved_hints.add((hint_team, hint_slot))
+                location_hints = self.location_hints[hint_team, hint_slot, hint.location]
+                location_hints.discard(hint)
+                location_hints.add(new_hint)
                 for player in self.slot_set(hint.receiving_player) | {hint.finding_player}:
                     if changed is not None:
                         changed.add((hint_team,player))
@@ -681,6 +908,22 @@ class Context:
                         self.replace_hint(hint_team, player, hint, new_hint)
             self.hints[hint_team, hint_slot] = new_hints
 
+    def recheck_location_hints(self, team: int, slot: int, locations: typing.Iterable[int],
+                               changed: typing.Optional[typing.Set[team_slot]] = None) -> None:
+        """Like recheck_hints, but only refreshes the hints for the given locations of the slot,
+        which are looked up in the hint index instead of going through every hint."""
+        for location in locations:
+            for hint in tuple(self.location_hints.get((team, slot, location), ())):
+                if hint.finding_player != slot:
+                    continue
+                new_hint = hint.re_check(self, team)
+                if hint == new_hint:
+                    continue
+                for player in self.slot_set(hint.receiving_player) | {hint.finding_player}:
+                    if changed is not None:
+                        changed.add((team, player))
+                    self.replace_hint(team, player, hint, new_hint)
+
     def get_rechecked_hints(self, team: int, slot: int):
         self.recheck_hints(team, slot)
         return self.hints[team, slot]
@@ -749,14 +992,15 @@ class Context:
                 # since hints are bidirectional, finding player and receiving player,
                 # we can check once if hint already exists
                 if hint not in self.hints[team, hint.finding_player]:
-                    self.hints[team, hint.finding_player].add(hint)
+                    self.add_hint(team, hint.finding_player, hint)
                     new_hint_events.add(hint.finding_player)
                     for player in self.slot_set(hint.receiving_player):
-                        self.hints[team, player].add(hint)
+                        self.add_hint(team, player, hint)
                         new_hint_events.add(player)
 
             self.logger.info("Notice (Team #%d): %s" % (team + 1, format_hint(self, team, hint)))
         for slot in new_hint_events:
+            self.unsaved_hints.add((team, slot))
             self.on_new_hint(team, slot)
         for slot, hint_data in concerns.items():
             if recipients is None or slot in recipients:
@@ -768,15 +1012,20 @@ class Context:
                     async_start(self.send_msgs(client, client_hints))
 
     def get_hint(self, team: int, finding_player: int, seeked_location: int) -> typing.Optional[Hint]:
-        for hint in self.hints[team, finding_player]:
-            if hint.location == seeked_location:
-                return hint
-        return None
-    
+        return next(iter(self.location_hints.get((team, finding_player, seeked_location), ())), None)
+
+    def add_hint(self, team: int, slot: int, hint: Hint) -> None:
+        self.hints[team, slot].add(hint)
+        self.location_hints.setdefault((team, slot, hint.location), set()).add(hint)
+
     def replace_hint(self, team: int, slot: int, old_hint: Hint, new_hint: Hint) -> None:
         if old_hint in self.hints[team, slot]:
             self.hints[team, slot].remove(old_hint)
             self.hints[team, slot].add(new_hint)
+            location_hints = self.location_hints[team, slot, old_hint.location]
+            location_hints.discard(old_hint)
+            location_hints.add(new_hint)
+            self.unsaved_hints.add((team, slot))
     
     # "events"
 
@@ -911,12 +1160,14 @@ async def on_client_joined(ctx: Context, client: Client):
                               "you may have additional local commands you can list with /help.",
                       {"type": "Tutorial"})
     ctx.client_connection_timers[client.team, client.slot] = datetime.datetime.now(datetime.timezone.utc)
+    ctx.unsaved_slot_states.add((client.team, client.slot))
 
 
 async def on_client_left(ctx: Context, client: Client):
     if len(ctx.clients[client.team][client.slot]) < 1:
         update_client_status(ctx, client, ClientStatus.CLIENT_UNKNOWN)
         ctx.client_connection_timers[client.team, client.slot] = datetime.datetime.now(datetime.timezone.utc)
+        ctx.unsaved_slot_states.add((client.team, client.slot))
 
     version_str = '.'.join(str(x) for x in client.version)
 
@@ -994,10 +1245,15 @@ def get_start_inventory(ctx: Context, player: int, remote_start_inventory: bool)
     return ctx.start_inventory.setdefault(player, []) if remote_start_inventory else []
 
 
-def send_new_items(ctx: Context):
-    for team, clients in ctx.clients.items():
-        for slot, clients in clients.items():
-            for client in clients:
+def send_new_items(ctx: Context, team: typing.Optional[int] = None,
+                   slots: typing.Optional[typing.Iterable[int]] = None):
+    """Sends clients the received items they don't have yet.
+    If only some slots of a team received items, pass those to skip checking every other client."""
+    teams = ctx.clients.items() if team is None else ((team, ctx.clients[team]),)
+    for team, team_clients in teams:
+        team_slots = team_clients.keys() if slots is None else slots
+        for slot in team_slots:
+            for client in team_clients.get(slot, ()):
                 if client.no_items:
                     continue
                 start_inventory = get_start_inventory(ctx, slot, client.remote_start_inventory)
@@ -1042,6 +1298,7 @@ def collect_player(ctx: Context, team: int, slot: int, is_group: bool = False):
             if slot in group_players:
                 group_collected_players = ctx.group_collected.setdefault(group, set())
                 group_collected_players.add(slot)
+                ctx.unsaved_group_collected.add(group)
                 if set(group_players) == group_collected_players:
                     collect_player(ctx, team, group, True)
 
@@ -1050,12 +1307,17 @@ def get_remaining(ctx: Context, team: int, slot: int) -> typing.List[typing.Tupl
     return ctx.locations.get_remaining(ctx.location_checks, team, slot)
 
 
-def send_items_to(ctx: Context, team: int, target_slot: int, *items: NetworkItem):
-    for target in ctx.slot_set(target_slot):
+def send_items_to(ctx: Context, team: int, target_slot: int, *items: NetworkItem) -> typing.Set[int]:
+    """Adds items to the received items of the target slot, returns the slots that received them."""
+    targets = ctx.slot_set(target_slot)
+    for target in targets:
         for item in items:
             if item.player != target_slot:
                 get_received_items(ctx, team, target, False).append(item)
+                ctx.unsaved_received_items.add((team, target, False))
             get_received_items(ctx, team, target, True).append(item)
+            ctx.unsaved_received_items.add((team, target, True))
+    return targets
 
 
 def register_location_checks(ctx: Context, team: int, slot: int, locations: typing.Iterable[int],
@@ -1065,10 +1327,12 @@ def register_location_checks(ctx: Context, team: int, slot: int, locations: typi
     if new_locations:
         if count_activity:
             ctx.client_activity_timers[team, slot] = datetime.datetime.now(datetime.timezone.utc)
+            ctx.unsaved_slot_states.add((team, slot))
+        receiving_slots: typing.Set[int] = set()
         for location in new_locations:
             item_id, target_player, flags = ctx.locations[slot][location]
             new_item = NetworkItem(item_id, location, slot, flags)
-            send_items_to(ctx, team, target_player, new_item)
+            receiving_slots |= send_items_to(ctx, team, target_player, new_item)
 
             ctx.logger.info('(Team #%d) %s sent %s to %s (%s)' % (
                 team + 1, ctx.player_names[(team, slot)], ctx.item_names[ctx.slot_info[target_player].game][item_id],
@@ -1077,14 +1341,15 @@ def register_location_checks(ctx: Context, team: int, slot: int, locations: typi
             ctx.broadcast_team(team, [info_text])
 
         ctx.location_checks[team, slot] |= new_locations
-        send_new_items(ctx)
+        ctx.unsaved_location_checks[team, slot] |= new_locations
+        send_new_items(ctx, team, receiving_slots)
         ctx.broadcast(ctx.clients[team][slot], [{
             "cmd": "RoomUpdate",
             "hint_points": get_slot_points(ctx, team, slot),
             "checked_locations": new_locations,  # send back new checks only
         }])
         updated_slots: typing.Set[tuple[int, int]] = set()
-        ctx.recheck_hints(team, slot, updated_slots)
+        ctx.recheck_location_hints(team, slot, new_locations, updated_slots)
         for hint_team, hint_slot in updated_slots:
             ctx.on_changed_hints(hint_team, hint_slot)
         ctx.save()
@@ -1524,12 +1789,14 @@ class ClientMessageProcessor(CommonCommandProcessor):
         if alias_name:
             alias_name = alias_name[:16].strip()
             self.ctx.name_aliases[self.client.team, self.client.slot] = alias_name
+            self.ctx.unsaved_slot_states.add((self.client.team, self.client.slot))
             self.output(f"Hello, {alias_name}")
             update_aliases(self.ctx, self.client.team)
             self.ctx.save()
             return True
         elif (self.client.team, self.client.slot) in self.ctx.name_aliases:
             del (self.ctx.name_aliases[self.client.team, self.client.slot])
+            self.ctx.unsaved_slot_states.add((self.client.team, self.client.slot))
             self.output("Removed Alias")
             update_aliases(self.ctx, self.client.team)
             self.ctx.save()
@@ -1549,11 +1816,13 @@ class ClientMessageProcessor(CommonCommandProcessor):
                 new_item = NetworkItem(names[item_name], -1, self.client.slot)
                 get_received_items(self.ctx, self.client.team, self.client.slot, False).append(new_item)
                 get_received_items(self.ctx, self.client.team, self.client.slot, True).append(new_item)
+                self.ctx.unsaved_received_items.add((self.client.team, self.client.slot, False))
+                self.ctx.unsaved_received_items.add((self.client.team, self.client.slot, True))
                 self.ctx.broadcast_text_all(
                     'Cheat console: sending "' + item_name + '" to ' + self.ctx.get_aliased_name(self.client.team,
                                                                                                  self.client.slot),
                     {"type": "ItemCheat", "team": self.client.team, "receiving": self.client.slot, "item": new_item})
-                send_new_items(self.ctx)
+                send_new_items(self.ctx, self.client.team, (self.client.slot,))
                 return True
             else:
                 self.output(response)
@@ -1567,9 +1836,7 @@ class ClientMessageProcessor(CommonCommandProcessor):
         cost = self.ctx.get_hint_cost(self.client.slot)
         auto_status = HintStatus.HINT_UNSPECIFIED if for_location else HintStatus.HINT_PRIORITY
         if not input_text:
-            hints = {hint.re_check(self.ctx, self.client.team) for hint in
-                     self.ctx.hints[self.client.team, self.client.slot]}
-            self.ctx.hints[self.client.team, self.client.slot] = hints
+            hints = self.ctx.get_rechecked_hints(self.client.team, self.client.slot)
             self.ctx.notify_hints(self.client.team, list(hints), recipients=(self.client.slot,))
             self.output(f"A hint costs {self.ctx.get_hint_cost(self.client.slot)} points. "
                         f"You have {points_available} points.")
@@ -1645,6 +1912,7 @@ class ClientMessageProcessor(CommonCommandProcessor):
                     can_pay = 1000
 
                 self.ctx.random.shuffle(not_found_hints)
+                self.ctx.unsaved_random_state = True
                 # By popular vote, make hints prefer non-local placements
                 not_found_hints.sort(key=lambda hint: int(hint.receiving_player != hint.finding_player))
                 # By another popular vote, prefer early sphere
@@ -1659,6 +1927,7 @@ class ClientMessageProcessor(CommonCommandProcessor):
                     hints.append(hint)
                     can_pay -= 1
                     self.ctx.hints_used[self.client.team, self.client.slot] += 1
+                    self.ctx.unsaved_slot_states.add((self.client.team, self.client.slot))
 
                 self.ctx.notify_hints(self.client.team, hints)
                 if not_found_hints:
@@ -1777,16 +2046,16 @@ async def process_client_cmd(ctx: Context, client: Client, args: dict):
         else:
             team, slot = ctx.connect_names[args['name']]
             if client.auth and client.team is not None and client.slot in ctx.clients[client.team]:
-                ctx.clients[team][slot].remove(client)  # re-auth, remove old entry
+                ctx.remove_client(client)  # re-auth, remove old entry
                 if client.team != team or client.slot != slot:
                     client.auth = False  # swapping Team/Slot
             client.team = team
             client.slot = slot
 
             ctx.client_ids[client.team, client.slot] = args["uuid"]
-            ctx.clients[team][slot].append(client)
             client.version = args['version']
             client.tags = args['tags']
+            ctx.add_client(client)
             client.no_locations = 'TextOnly' in client.tags or 'Tracker' in client.tags
             connected_packet = {
                 "cmd": "Connected",
@@ -1857,7 +2126,7 @@ async def process_client_cmd(ctx: Context, client: Client, args: dict):
 
             if "tags" in args:
                 old_tags = client.tags
-                client.tags = args["tags"]
+                ctx.set_client_tags(client, args["tags"])
                 if set(old_tags) != set(client.tags):
                     client.no_locations = 'TextOnly' in client.tags or 'Tracker' in client.tags
                     ctx.broadcast_text_all(
@@ -1963,11 +2232,7 @@ async def process_client_cmd(ctx: Context, client: Client, args: dict):
             args["cmd"] = "Bounced"
             msg = ctx.dumper([args])
 
-            for bounceclient in ctx.endpoints:
-                if client.team == bounceclient.team and (ctx.games[bounceclient.slot] in games or
-                                                         set(bounceclient.tags) & tags or
-                                                         bounceclient.slot in slots):
-                    await ctx.send_encoded_msgs(bounceclient, msg)
+            await ctx.broadcast_send_encoded_msgs(ctx.get_bounce_targets(client.team, games, tags, slots), msg)
 
         elif cmd == "Get":
             if "keys" not in args or type(args["keys"]) != list:
@@ -1997,6 +2262,7 @@ async def process_client_cmd(ctx: Context, client: Client, args: dict):
                 func = modify_functions[operation["operation"]]
                 value = func(value, operation["value"])
             ctx.stored_data[args["key"]] = args["value"] = value
+            ctx.unsaved_stored_data.add(args["key"])
             targets = set(ctx.stored_data_notification_clients[args["key"]])
             if args.get("want_reply", True):
                 targets.add(client)
@@ -2025,6 +2291,7 @@ def update_client_status(ctx: Context, client: Client, new_status: ClientStatus)
                 ctx.broadcast_text_all(f"Team #{client.team + 1} has completed all of their games! Congratulations!")
 
         ctx.client_game_state[client.team, client.slot] = new_status
+        ctx.unsaved_slot_states.add((client.team, client.slot))
         ctx.on_client_status_change(client.team, client.slot)
         ctx.save()
 
@@ -2084,12 +2351,14 @@ class ServerCommandProcessor(CommonCommandProcessor):
                     if alias_name:
                         alias_name = alias_name.strip()[:15]
                         self.ctx.name_aliases[team, slot] = alias_name
+                        self.ctx.unsaved_slot_states.add((team, slot))
                         self.output(f"Named {player_name} as {alias_name}")
                         update_aliases(self.ctx, team)
                         self.ctx.save()
                         return True
                     else:
                         del (self.ctx.name_aliases[team, slot])
+                        self.ctx.unsaved_slot_states.add((team, slot))
                         self.output(f"Removed Alias for {player_name}")
                         update_aliases(self.ctx, team)
                         self.ctx.save()
@@ -2180,9 +2449,9 @@ class ServerCommandProcessor(CommonCommandProcessor):
                 if amount > 100:
                     raise ValueError(f"{amount} is invalid. Maximum is 100.")
                 new_items = [NetworkItem(names[item_name], -1, 0) for _ in range(int(amount))]
-                send_items_to(self.ctx, team, slot, *new_items)
+                receiving_slots = send_items_to(self.ctx, team, slot, *new_items)
 
-                send_new_items(self.ctx)
+                send_new_items(self.ctx, team, receiving_slots)
                 self.ctx.broadcast_text_all(
                     'Cheat console: sending ' + ('' if amount == 1 else f'{amount} of ') +
                     f'"{item_name}" to {self.ctx.get_aliased_name(team, slot)}')
@@ -2332,6 +2601,7 @@ class ServerCommandProcessor(CommonCommandProcessor):
                 return False
 
         setattr(self.ctx, option_name, value_type(option_value))
+        self.ctx.unsaved_game_options = True
         self.output(f"Set option {option_name} to {getattr(self.ctx, option_name)}")
         if option_name in {"release_mode", "remaining_mode", "collect_mode"}:
             self.ctx.broadcast_all([{"cmd": "RoomUpdate", 'permissions': get_permissions(self.ctx)}])
@@ -2,12 +2,16 @@ from __future__ import annotations
 
 import typing
 import enum
+import json
+import mmap
+import pickle
 import warnings
+import zlib
 from json import JSONEncoder, JSONDecoder
 
 import websockets
 
-from Utils import ByValue, Version
+from Utils import ByValue, Version, VersionException, restricted_loads
 
 
 class HintStatus(ByValue, enum.IntEnum):
@@ -105,10 +109,19 @@ def _scan_for_TypedTuples(obj: typing.Any) -> typing.Any:
     return obj
 
 
+def _encode_mapping(obj: typing.Any) -> typing.Any:
+    # only called for objects json can't encode, so read-only mappings, like the WebHost's shared data package,
+    # don't slow down the scan of every message
+    if isinstance(obj, typing.Mapping):
+        return dict(obj)
+    raise TypeError(f"Object of type {obj.__class__.__name__} is not JSON serializable")
+
+
 _encode = JSONEncoder(
     ensure_ascii=False,
     check_circular=False,
     separators=(',', ':'),
+    default=_encode_mapping,
 ).encode
 
 
@@ -389,6 +402,93 @@ class Hint(typing.NamedTuple):
         return self.receiving_player == self.finding_player
 
 
+multidata_format_version = 4
+multidata_sections: typing.Dict[str, typing.Tuple[str, ...]] = {
+    "locations": ("locations", "checks_in_area"),
+    "slot_data": ("slot_data",),
+    "hints": ("precollected_hints", "er_hint_data"),
+    "spheres": ("spheres",),
+    "datapackage": ("datapackage",),
+}
+"""multidata keys stored in their own section, any other key is stored in the "main" section"""
+
+
+def encode_multidata(multidata: typing.Dict[str, typing.Any]) -> bytes:
+    """
+    Encodes multidata in the current format: the format version byte, the size of the index as 4 bytes little endian,
+    the index as JSON of section name -> [offset, size] counted from the end of the index, then the sections,
+    each a separately zlib compressed pickle of its part of the multidata.
+    """
+    section_of_key = {key: section for section, keys in multidata_sections.items() for key in keys}
+    parts: typing.Dict[str, typing.Dict[str, typing.Any]] = {"main": {}}
+    for key, value in multidata.items():
+        parts.setdefault(section_of_key.get(key, "main"), {})[key] = value
+
+    return _join_multidata_sections({name: zlib.compress(pickle.dumps(part), 9) for name, part in parts.items()})
+
+
+def _join_multidata_sections(sections: typing.Dict[str, typing.Union[bytes, memoryview]]) -> bytes:
+    index: typing.Dict[str, typing.Tuple[int, int]] = {}
+    offset = 0
+    for name, section in sections.items():
+        index[name] = offset, len(section)
+        offset += len(section)
+    index_data = json.dumps(index).encode()
+    return b"".join((bytes([multidata_format_version]), len(index_data).to_bytes(4, "little"), index_data,
+                     *sections.values()))
+
+
+def replace_multidata_sections(data: typing.Union[bytes, bytearray, memoryview, mmap.mmap],
+                               parts: typing.Dict[str, typing.Dict[str, typing.Any]]) -> bytes:
+    """
+    Replaces sections of multidata in the current format version. The other sections are copied without decoding them.
+
+    :param parts: section name -> its part of the multidata, like decode_multidata returns it for that section alone.
+    """
+    if data[0] != multidata_format_version:
+        raise VersionException(f"Can only replace sections of multidata format version {multidata_format_version}.")
+    with memoryview(data) as view:
+        sections_start = 5 + int.from_bytes(view[1:5], "little")
+        index: typing.Dict[str, typing.List[int]] = json.loads(bytes(view[5:sections_start]))
+        sections: typing.Dict[str, typing.Union[bytes, memoryview]] = {
+            name: view[sections_start + offset:sections_start + offset + size] for name, (offset, size) in index.items()
+        }
+        for name, part in parts.items():
+            sections[name] = zlib.compress(pickle.dumps(part), 9)
+        joined = _join_multidata_sections(sections)
+        for section in sections.values():
+            if isinstance(section, memoryview):
+                section.release()
+    return joined
+
+
+def decode_multidata(data: typing.Union[bytes, bytearray, memoryview, mmap.mmap],
+                     sections: typing.Optional[typing.Collection[str]] = None) -> typing.Dict[str, typing.Any]:
+    """
+    Decodes multidata of any supported format version.
+
+    :param data: the encoded multidata, any buffer works. Only the requested sections are read from it,
+    so mapping the file instead of reading it is cheaper if only some sections are needed.
+    :param sections: names of the sections to decode, including "main" if wanted. None decodes everything.
+    Format versions before 4 are a single compressed pickle, which always decodes everything.
+    """
+    format_version = data[0]
+    if format_version > multidata_format_version:
+        raise VersionException("Incompatible multidata.")
+    if format_version < 4:
+        return restricted_loads(zlib.decompress(data[1:]))
+
+    multidata: typing.Dict[str, typing.Any] = {}
+    with memoryview(data) as view:
+        sections_start = 5 + int.from_bytes(view[1:5], "little")
+        index: typing.Dict[str, typing.List[int]] = json.loads(bytes(view[5:sections_start]))
+        for name, (offset, size) in index.items():
+            if sections is None or name in sections:
+                start = sections_start + offset
+                multidata.update(restricted_loads(zlib.decompress(view[start:start + size])))
+    return multidata
+
+
 class _LocationStore(dict, typing.MutableMapping[int, typing.Dict[int, typing.Tuple[int, int, int]]]):
     def __init__(self, values: typing.MutableMapping[int, typing.Dict[int, typing.Tuple[int, int, int]]]):
         super().__init__(values)
@@ -402,20 +502,26 @@ class _LocationStore(dict, typing.MutableMapping[int, typing.Dict[int, typing.Tu
         if len(self.get(0, {})):
             raise ValueError("Invalid player id 0 for location")
 
+        # receiving player -> item id -> (finding player, location id, flags), so hints don't scan every location
+        self._receiver_index: typing.Dict[int, typing.Dict[int, typing.List[typing.Tuple[int, int, int]]]] = {}
+        for finding_player, check_data in sorted(self.items()):
+            for location_id, (item_id, receiving_player, item_flags) in sorted(check_data.items()):
+                self._receiver_index.setdefault(receiving_player, {}).setdefault(item_id, []).append(
+                    (finding_player, location_id, item_flags))
+
     def find_item(self, slots: typing.Set[int], seeked_item_id: int
                   ) -> typing.Generator[typing.Tuple[int, int, int, int, int], None, None]:
-        for finding_player, check_data in self.items():
-            for location_id, (item_id, receiving_player, item_flags) in check_data.items():
-                if receiving_player in slots and item_id == seeked_item_id:
-                    yield finding_player, location_id, item_id, receiving_player, item_flags
+        for receiving_player in slots:
+            for finding_player, location_id, item_flags in \
+                    self._receiver_index.get(receiving_player, {}).get(seeked_item_id, ()):
+                yield finding_player, location_id, seeked_item_id, receiving_player, item_flags
 
     def get_for_player(self, slot: int) -> typing.Dict[int, typing.Set[int]]:
         import collections
         all_locations: typing.Dict[int, typing.Set[int]] = collections.defaultdict(set)
-        for source_slot, location_data in self.items():
-            for location_id, values in location_data.items():
-                if values[1] == slot:
-                    all_locations[source_slot].add(location_id)
+        for item_locations in self._receiver_index.get(slot, {}).values():
+            for source_slot, location_id, _ in item_locations:
+                all_locations[source_slot].add(location_id)
         return all_locations
 
     def get_checked(self, state: typing.Dict[typing.Tuple[int, int], typing.Set[int]], team: int, slot: int
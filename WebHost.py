@@ -27,6 +27,7 @@ if not os.path.exists(configpath):  # fall back to config.yaml in home
 def get_app() -> "Flask":
     from WebHostLib import register, cache, app as raw_app
     from WebHostLib.models import db
+    from WebHostLib.stats import backfill_games_played
 
     app = raw_app
     if os.path.exists(configpath) and not app.config["TESTING"]:
@@ -51,6 +52,7 @@ def get_app() -> "Flask":
     cache.init_app(app)
     db.bind(**app.config["PONY"])
     db.generate_mapping(create_tables=True)
+    backfill_games_played()
     return app
 
 
@@ -39,6 +39,10 @@ app.config["SECRET_KEY"] = bytes(socket.gethostname(), encoding="utf-8")
 app.config["JOB_THRESHOLD"] = 1
 # after what time in seconds should generation be aborted, freeing the queue slot. Can be set to None to disable.
 app.config["JOB_TIME"] = 600
+# estimated cost (players + distinct games) from which a generation is queued as a large job
+app.config["LARGE_JOB_COST"] = 25
+# how many generators may run large jobs at once, the others are kept free for small jobs
+app.config["LARGE_JOB_GENERATORS"] = 2
 # memory limit for generator processes in bytes
 app.config["GENERATOR_MEMORY_LIMIT"] = 4294967296
 app.config['SESSION_PERMANENT'] = True
@@ -83,3 +83,11 @@ def wait_seed_api(seed: UUID):
     elif generation.state == STATE_ERROR:
         return {"text": "Generation failed"}, 500
     return {"text": "Generation running"}, 202
+
+
+@api_endpoints.route('/generation_queue')
+def generation_queue_api():
+    from WebHostLib.autolauncher import generation_scheduler
+    if not generation_scheduler:
+        return {"text": "Generations are not scheduled by this process"}, 404
+    return generation_scheduler.get_status()
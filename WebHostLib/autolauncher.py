@@ -1,11 +1,15 @@
 from __future__ import annotations
 
+import collections
 import json
 import logging
 import multiprocessing
+import multiprocessing.connection
+import time
 import typing
+from dataclasses import dataclass, field
 from datetime import timedelta, datetime
-from threading import Event, Thread
+from threading import Event, Lock, Thread
 from typing import Any
 from uuid import UUID
 
@@ -13,6 +17,10 @@ from pony.orm import db_session, select, commit
 
 from Utils import restricted_loads
 from .locker import Locker, AlreadyRunningException
+from .notify import NotificationListener, ROOM_COMMAND
+
+FALLBACK_POLL_INTERVAL = 10
+"""Seconds between database scans for rooms to start, in case a change was not notified about."""
 
 _stop_event = Event()
 
@@ -36,22 +44,206 @@ def handle_generation_failure(result: BaseException):
         logging.exception(e)
 
 
-def launch_generator(pool: multiprocessing.pool.Pool, generation: Generation):
-    try:
-        meta = json.loads(generation.meta)
-        options = restricted_loads(generation.options)
-        logging.info(f"Generating {generation.id} for {len(options)} players")
-        pool.apply_async(gen_game, (options,),
-                         {"meta": meta,
-                          "sid": generation.id,
-                          "owner": generation.owner},
-                         handle_generation_success, handle_generation_failure)
-    except Exception as e:
-        generation.state = STATE_ERROR
-        commit()
-        logging.exception(e)
-    else:
-        generation.state = STATE_STARTED
+def estimate_generation_cost(options: typing.Dict[str, typing.Dict[str, Any]]) -> int:
+    """Estimates the cost of a generation from its players, where each distinct game adds the cost of setting it up."""
+    return len(options) + len({player_options.get("game") for player_options in options.values()})
+
+
+@dataclass
+class GenerationJob:
+    id: UUID
+    owner: UUID
+    options: typing.Dict[str, typing.Dict[str, Any]]
+    meta: typing.Dict[str, Any]
+    cost: int
+    queued_at: float = field(default_factory=time.monotonic)
+    started_at: typing.Optional[float] = None
+
+
+def _generation_worker(config: typing.Dict[str, Any], connection: multiprocessing.connection.Connection) -> None:
+    init_generator(config)
+    while True:
+        job: typing.Optional[GenerationJob] = connection.recv()
+        if job is None:
+            return
+        try:
+            seed_id = run_generation(job.options, job.meta, job.owner, job.id)
+        except BaseException as e:
+            logging.exception(e)
+            set_generation_error(job.id, e.__class__.__name__ + ": " + str(e))
+            connection.send(False)
+        else:
+            handle_generation_success(seed_id)
+            connection.send(True)
+
+
+class GenerationWorker:
+    """A generator process, which runs one job at a time and can be terminated if the job takes too long."""
+    max_jobs = 10
+    """jobs after which the process is replaced, to free memory that generation leaked"""
+
+    process: typing.Optional[multiprocessing.Process]
+    connection: typing.Optional[multiprocessing.connection.Connection]
+    job: typing.Optional[GenerationJob]
+
+    def __init__(self, config: typing.Dict[str, Any], name: str):
+        self.config = config
+        self.name = name
+        self.process = None
+        self.connection = None
+        self.job = None
+        self.jobs_done = 0
+
+    def start(self) -> None:
+        self.connection, worker_connection = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=_generation_worker, args=(self.config, worker_connection),
+                                               name=self.name, daemon=True)
+        self.process.start()
+        worker_connection.close()
+        self.jobs_done = 0
+
+    def run(self, job: GenerationJob) -> None:
+        if not self.process or self.jobs_done >= self.max_jobs:
+            self.stop()
+            self.start()
+        job.started_at = time.monotonic()
+        self.job = job
+        self.connection.send(job)
+
+    def poll(self) -> typing.Optional[bool]:
+        """Returns whether the running job succeeded, once it finished."""
+        try:
+            if self.connection.poll():
+                result = self.connection.recv()
+            elif self.process.is_alive():
+                return None
+            else:
+                raise EOFError()
+        except (EOFError, OSError):  # process died, for example by running out of memory
+            set_generation_error(self.job.id,
+                                 f"Generator process ended unexpectedly with code {self.process.exitcode}.")
+            self._discard_process()
+            result = False
+        self.job = None
+        self.jobs_done += 1
+        return result
+
+    def terminate(self) -> None:
+        """Ends the running job."""
+        self.process.terminate()
+        self.process.join()
+        self._discard_process()
+        self.job = None
+
+    def stop(self) -> None:
+        if self.process:
+            self.connection.send(None)
+            self.process.join(5)
+            if self.process.is_alive():
+                self.process.terminate()
+            self._discard_process()
+
+    def _discard_process(self) -> None:
+        """Forgets the ended process, closing its pipe so the file descriptor isn't leaked."""
+        self.connection.close()
+        self.connection = None
+        self.process = None
+
+
+class GenerationScheduler:
+    """
+    Runs Generations in generator processes. Jobs are queued by their estimated cost, so small jobs don't wait behind
+    large ones: large jobs only use some of the generators at once and small jobs can use all of them.
+    """
+    small_jobs: typing.Deque[GenerationJob]
+    large_jobs: typing.Deque[GenerationJob]
+    timings: typing.Deque[typing.Dict[str, Any]]
+    """wait and run times of the most recently finished jobs"""
+
+    def __init__(self, config: typing.Dict[str, Any]):
+        self.workers = [GenerationWorker(config, f"Generator{x}") for x in range(config["GENERATORS"])]
+        self.large_job_cost: int = config["LARGE_JOB_COST"]
+        self.large_job_generators: int = max(1, min(config["LARGE_JOB_GENERATORS"], len(self.workers)))
+        self.job_time: typing.Optional[float] = config["JOB_TIME"]
+        self.small_jobs = collections.deque()
+        self.large_jobs = collections.deque()
+        self.timings = collections.deque(maxlen=100)
+        self.lock = Lock()  # status may be read from other threads
+
+    def submit(self, generation: Generation) -> None:
+        try:
+            options = restricted_loads(generation.options)
+            job = GenerationJob(generation.id, generation.owner, options, json.loads(generation.meta),
+                                estimate_generation_cost(options))
+        except Exception as e:
+            generation.state = STATE_ERROR
+            commit()
+            logging.exception(e)
+        else:
+            generation.state = STATE_STARTED
+            with self.lock:
+                (self.large_jobs if job.cost >= self.large_job_cost else self.small_jobs).append(job)
+
+    def update(self) -> None:
+        """Collects finished jobs, ends timed out ones and starts queued ones on free generators."""
+        with self.lock:
+            self._update()
+
+    def _update(self) -> None:
+        now = time.monotonic()
+        for worker in self.workers:
+            if not worker.job:
+                continue
+            job = worker.job
+            # poll first, so a job that finished just before its time ran out keeps its result
+            result = worker.poll()
+            if result is not None:
+                self._finish(job, "success" if result else "error")
+            elif self.job_time is not None and now - job.started_at > self.job_time:
+                worker.terminate()
+                set_generation_error(job.id, "Allowed time for Generation exceeded, "
+                                             "please consider generating locally instead.")
+                self._finish(job, "timeout")
+
+        running_large_jobs = sum(1 for worker in self.workers if worker.job and worker.job.cost >= self.large_job_cost)
+        for worker in self.workers:
+            if worker.job:
+                continue
+            if self.large_jobs and running_large_jobs < self.large_job_generators:
+                running_large_jobs += 1
+                job = self.large_jobs.popleft()
+            elif self.small_jobs:
+                job = self.small_jobs.popleft()
+            else:
+                break
+            logging.info(f"Generating {job.id} for {len(job.options)} players, estimated cost {job.cost}")
+            worker.run(job)
+
+    def _finish(self, job: GenerationJob, result: str) -> None:
+        timing = {"cost": job.cost, "result": result, "wait": job.started_at - job.queued_at,
+                  "run": time.monotonic() - job.started_at}
+        self.timings.append(timing)
+        logging.info(f"Generation {job.id} ended with {result} after waiting {timing['wait']:.1f}s "
+                     f"and running {timing['run']:.1f}s")
+
+    def get_status(self) -> typing.Dict[str, Any]:
+        """Queue depths, running jobs and timings of recently finished jobs, for monitoring."""
+        now = time.monotonic()
+        with self.lock:
+            return {
+                "queued_small": len(self.small_jobs),
+                "queued_large": len(self.large_jobs),
+                "running": [{"cost": worker.job.cost, "wait": worker.job.started_at - worker.job.queued_at,
+                             "run": now - worker.job.started_at} for worker in self.workers if worker.job],
+                "finished": list(self.timings),
+            }
+
+    def stop(self) -> None:
+        for worker in self.workers:
+            if worker.job:
+                worker.terminate()
+            else:
+                worker.stop()
 
 
 def init_generator(config: dict[str, Any]) -> None:
@@ -90,7 +282,7 @@ def autohost(config: dict):
     def keep_running():
         stop_event = _stop_event
         try:
-            with Locker("autohost"):
+            with Locker("autohost"), NotificationListener() as listener:
                 cleanup()
                 hosters = []
                 for x in range(config["HOSTERS"]):
@@ -98,15 +290,26 @@ def autohost(config: dict):
                     hosters.append(hoster)
                     hoster.start()
 
-                while not stop_event.wait(0.1):
+                next_full_scan = 0.0
+                while not stop_event.is_set():
+                    # rooms only have to be looked up when something notified about them, polling all rooms
+                    # is only a fallback for changes that were not notified about
+                    activity = listener.receive(0.1)
+                    if time.monotonic() >= next_full_scan:
+                        next_full_scan = time.monotonic() + FALLBACK_POLL_INTERVAL
+                        with db_session:
+                            rooms = select(
+                                room for room in Room if
+                                room.last_activity >= datetime.utcnow() - timedelta(days=3))
+                            start_active_rooms(hosters, rooms)
+                    if not activity:
+                        continue
+
+                    room_ids = {room_id for kind, room_id in activity}
+                    for room_id in {room_id for kind, room_id in activity if kind == ROOM_COMMAND}:
+                        hosters[room_id.int % len(hosters)].notify_command(room_id)
                     with db_session:
-                        rooms = select(
-                            room for room in Room if
-                            room.last_activity >= datetime.utcnow() - timedelta(days=3))
-                        for room in rooms:
-                            # we have to filter twice, as the per-room timeout can't currently be PonyORM transpiled.
-                            if room.last_activity >= datetime.utcnow() - timedelta(seconds=room.timeout + 5):
-                                hosters[room.id.int % len(hosters)].start_room(room.id)
+                        start_active_rooms(hosters, filter(None, (Room.get(id=room_id) for room_id in room_ids)))
 
         except AlreadyRunningException:
             logging.info("Autohost reports as already running, not starting another.")
@@ -114,14 +317,21 @@ def autohost(config: dict):
     Thread(target=keep_running, name="AP_Autohost").start()
 
 
+def start_active_rooms(hosters: typing.List[MultiworldInstance], rooms: typing.Iterable[Room]) -> None:
+    for room in rooms:
+        # we have to filter twice, as the per-room timeout can't currently be PonyORM transpiled.
+        if room.last_activity >= datetime.utcnow() - timedelta(seconds=room.timeout + 5):
+            hosters[room.id.int % len(hosters)].start_room(room.id)
+
+
 def autogen(config: dict):
     def keep_running():
+        global generation_scheduler
         stop_event = _stop_event
         try:
             with Locker("autogen"):
-
-                with multiprocessing.Pool(config["GENERATORS"], initializer=init_generator,
-                                          initargs=(config,), maxtasksperchild=10) as generator_pool:
+                scheduler = generation_scheduler = GenerationScheduler(config)
+                try:
                     with db_session:
                         to_start = select(generation for generation in Generation if generation.state == STATE_STARTED)
 
@@ -132,7 +342,7 @@ def autogen(config: dict):
                                 if sid:
                                     generation.delete()
                                 else:
-                                    launch_generator(generator_pool, generation)
+                                    scheduler.submit(generation)
 
                             commit()
                         select(generation for generation in Generation if generation.state == STATE_ERROR).delete()
@@ -144,13 +354,20 @@ def autogen(config: dict):
                                 generation for generation in Generation
                                 if generation.state == STATE_QUEUED).for_update()
                             for generation in to_start:
-                                launch_generator(generator_pool, generation)
+                                scheduler.submit(generation)
+                        scheduler.update()
+                finally:
+                    generation_scheduler = None
+                    scheduler.stop()
         except AlreadyRunningException:
             logging.info("Autogen reports as already running, not starting another.")
 
     Thread(target=keep_running, name="AP_Autogen").start()
 
 
+generation_scheduler: typing.Optional[GenerationScheduler] = None
+"""The scheduler of autogen, if it runs in this process."""
+
 multiworlds: typing.Dict[type(Room.id), MultiworldInstance] = {}
 
 
@@ -164,6 +381,7 @@ class MultiworldInstance():
         self.host = config["HOST_ADDRESS"]
         self.rooms_to_start = multiprocessing.Queue()
         self.rooms_shutting_down = multiprocessing.Queue()
+        self.rooms_with_commands = multiprocessing.Queue()
         self.name = f"MultiHoster{id}"
 
     def start(self):
@@ -173,7 +391,8 @@ class MultiworldInstance():
         process = multiprocessing.Process(group=None, target=run_server_process,
                                           args=(self.name, self.ponyconfig, get_static_server_data(),
                                                 self.cert, self.key, self.host,
-                                                self.rooms_to_start, self.rooms_shutting_down),
+                                                self.rooms_to_start, self.rooms_shutting_down,
+                                                self.rooms_with_commands),
                                           name=self.name)
         process.start()
         self.process = process
@@ -187,6 +406,10 @@ class MultiworldInstance():
             self.room_ids.add(room_id)
             self.rooms_to_start.put(room_id)
 
+    def notify_command(self, room_id):
+        if room_id in self.room_ids:
+            self.rooms_with_commands.put(room_id)
+
     def stop(self):
         if self.process:
             self.process.terminate()
@@ -202,4 +425,4 @@ class MultiworldInstance():
 
 from .models import Room, Generation, STATE_QUEUED, STATE_STARTED, STATE_ERROR, db, Seed, Slot
 from .customserver import run_server_process, get_static_server_data
-from .generate import gen_game
+from .generate import run_generation, set_generation_error
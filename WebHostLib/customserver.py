@@ -10,7 +10,6 @@ import pickle
 import random
 import socket
 import threading
-import time
 import typing
 import sys
 
@@ -22,7 +21,8 @@ import Utils
 from MultiServer import Context, server, auto_shutdown, ServerCommandProcessor, ClientMessageProcessor, load_server_cert
 from Utils import restricted_loads, cache_argsless
 from .locker import Locker
-from .models import Command, GameDataPackage, Room, db
+from .nametable import NameTable, write_name_table
+from .models import Command, GameDataPackage, Room, SaveJournalEntry, db
 
 
 class CustomClientMessageProcessor(ClientMessageProcessor):
@@ -57,6 +57,10 @@ class DBCommandProcessor(ServerCommandProcessor):
         self.ctx.logger.info(text)
 
 
+COMMAND_POLL_INTERVAL = 30
+"""Seconds between database checks for new commands of a room, in case the hoster was not notified of them."""
+
+
 class WebHostContext(Context):
     room_id: int
 
@@ -69,6 +73,7 @@ class WebHostContext(Context):
                                              "enabled", 0, 2, logger=logger)
         del self.static_server_data
         self.main_loop = asyncio.get_running_loop()
+        self.command_event = threading.Event()
         self.video = {}
         self.tags = ["AP", "WebHost"]
 
@@ -85,11 +90,39 @@ class WebHostContext(Context):
             # NOTE: attributes are mutable and shared, so they will have to be copied before being modified
             setattr(self, key, value)
         self.non_hintable_names = collections.defaultdict(frozenset, self.non_hintable_names)
+        self.gamespackage = self.name_table.gamespackage
+        self.item_name_groups = self.name_table.item_name_groups
+        self.location_name_groups = self.name_table.location_name_groups
+
+    def _init_game_data(self):
+        name_table: NameTable = self.name_table
+        static_games = [game for game, game_package in self.gamespackage.items()
+                        if game_package is name_table.gamespackage.get(game)]
+        # custom data packages are still read into dicts of this room, which include the static Archipelago names
+        self.item_names["Archipelago"] = name_table.item_names["Archipelago"]
+        self.location_names["Archipelago"] = name_table.location_names["Archipelago"]
+        gamespackage = self.gamespackage
+        self.gamespackage = {game: game_package for game, game_package in gamespackage.items()
+                             if game not in static_games}
+        super(WebHostContext, self)._init_game_data()
+        self.gamespackage = gamespackage
+
+        # static games only reference the name table, which is shared by all rooms
+        for game in static_games:
+            if game in name_table.checksums:
+                self.checksums[game] = name_table.checksums[game]
+            self.item_names[game] = name_table.item_names[game]
+            self.location_names[game] = name_table.location_names[game]
+        self.all_item_and_group_names = collections.ChainMap(self.all_item_and_group_names,
+                                                             name_table.all_item_and_group_names)
+        self.all_location_and_group_names = collections.ChainMap(self.all_location_and_group_names,
+                                                                 name_table.all_location_and_group_names)
 
     def listen_to_db_commands(self):
         cmdprocessor = DBCommandProcessor(self)
 
         while not self.exit_event.is_set():
+            self.command_event.clear()
             with db_session:
                 commands = select(command for command in Command if command.room.id == self.room_id)
                 if commands:
@@ -97,7 +130,8 @@ class WebHostContext(Context):
                         self.main_loop.call_soon_threadsafe(cmdprocessor, command.commandtext)
                         command.delete()
                     commit()
-            time.sleep(5)
+            # set by the hoster when the autohost was notified of a new command, polling is only a fallback
+            self.command_event.wait(COMMAND_POLL_INTERVAL)
 
     @db_session
     def load(self, room_id: int):
@@ -147,23 +181,33 @@ class WebHostContext(Context):
     def init_save(self, enabled: bool = True):
         self.saving = enabled
         if self.saving:
-            savegame_data = Room.get(id=self.room_id).multisave
-            if savegame_data:
-                self.set_save(restricted_loads(Room.get(id=self.room_id).multisave))
+            room = Room.get(id=self.room_id)
+            if room.multisave:
+                self.save_snapshot_due = False
+                journal = [restricted_loads(entry.data) for entry in room.save_journal.order_by(SaveJournalEntry.id)]
+                self.set_save(restricted_loads(room.multisave), journal)
             self._start_async_saving(atexit_save=False)
         threading.Thread(target=self.listen_to_db_commands, daemon=True).start()
 
     @db_session
     def _save(self, exit_save: bool = False) -> bool:
         room = Room.get(id=self.room_id)
-        room.multisave = pickle.dumps(self.get_save())
+        self._write_save(exit_save)
         # saving only occurs on activity, so we can "abuse" this information to mark this as last_activity
         if not exit_save:  # we don't want to count a shutdown as activity, which would restart the server again
             room.last_activity = datetime.datetime.utcnow()
         return True
 
-    def get_save(self) -> dict:
-        d = super(WebHostContext, self).get_save()
+    def _write_save_snapshot(self, save: dict):
+        room = Room.get(id=self.room_id)
+        room.multisave = pickle.dumps(save)
+        room.save_journal.select().delete(bulk=True)
+
+    def _append_save_journal(self, record: dict):
+        SaveJournalEntry(room=Room.get(id=self.room_id), data=pickle.dumps(record))
+
+    def get_save_state(self) -> dict:
+        d = super(WebHostContext, self).get_save_state()
         d["video"] = [(tuple(playerslot), videodata) for playerslot, videodata in self.video.items()]
         return d
 
@@ -174,28 +218,27 @@ def get_random_port():
 
 @cache_argsless
 def get_static_server_data() -> dict:
+    """Writes the static data package as a name table, which the hoster processes map instead of each holding a copy.
+    Returns the data to pass to run_server_process, where the name table path is replaced by the mapped NameTable."""
+    import hashlib
+    import os
     import worlds
+    games = worlds.network_data_package["games"]
+    # named by content, so another WebHost with different worlds on the same machine doesn't replace it
+    digest = hashlib.sha1(repr(sorted((game, game_package.get("checksum")) for game, game_package in games.items()))
+                          .encode()).hexdigest()
+    name_table_path = Utils.cache_path("webhost", f"static_data_package_{digest}.apnt")
+    os.makedirs(os.path.dirname(name_table_path), exist_ok=True)
+    write_name_table(
+        name_table_path, games,
+        {world_name: world.item_name_groups for world_name, world in worlds.AutoWorldRegister.world_types.items()},
+        {world_name: world.location_name_groups for world_name, world in worlds.AutoWorldRegister.world_types.items()})
     data = {
         "non_hintable_names": {
             world_name: world.hint_blacklist
             for world_name, world in worlds.AutoWorldRegister.world_types.items()
         },
-        "gamespackage": {
-            world_name: {
-                key: value
-                for key, value in game_package.items()
-                if key not in ("item_name_groups", "location_name_groups")
-            }
-            for world_name, game_package in worlds.network_data_package["games"].items()
-        },
-        "item_name_groups": {
-            world_name: world.item_name_groups
-            for world_name, world in worlds.AutoWorldRegister.world_types.items()
-        },
-        "location_name_groups": {
-            world_name: world.location_name_groups
-            for world_name, world in worlds.AutoWorldRegister.world_types.items()
-        },
+        "name_table": name_table_path,
     }
 
     return data
@@ -223,7 +266,8 @@ def set_up_logging(room_id) -> logging.Logger:
 
 def run_server_process(name: str, ponyconfig: dict, static_server_data: dict,
                        cert_file: typing.Optional[str], cert_key_file: typing.Optional[str],
-                       host: str, rooms_to_run: multiprocessing.Queue, rooms_shutting_down: multiprocessing.Queue):
+                       host: str, rooms_to_run: multiprocessing.Queue, rooms_shutting_down: multiprocessing.Queue,
+                       rooms_with_commands: multiprocessing.Queue):
     Utils.init_logging(name)
     try:
         import resource
@@ -236,6 +280,8 @@ def run_server_process(name: str, ponyconfig: dict, static_server_data: dict,
         resource.setrlimit(resource.RLIMIT_NOFILE, (file_limit, file_limit))
         del resource, file_limit
 
+    static_server_data = {**static_server_data, "name_table": NameTable(static_server_data["name_table"])}
+
     # establish DB connection for multidata and multisave
     db.bind(**ponyconfig)
     db.generate_mapping(check_tables=False)
@@ -249,6 +295,7 @@ def run_server_process(name: str, ponyconfig: dict, static_server_data: dict,
     gc.collect()  # free intermediate objects used during setup
 
     loop = asyncio.get_event_loop()
+    running_rooms: typing.Dict[typing.Any, WebHostContext] = {}
 
     async def start_room(room_id):
         with Locker(f"RoomLocker {room_id}"):
@@ -257,6 +304,7 @@ def run_server_process(name: str, ponyconfig: dict, static_server_data: dict,
                 ctx = WebHostContext(static_server_data, logger)
                 ctx.load(room_id)
                 ctx.init_save()
+                running_rooms[room_id] = ctx
                 assert ctx.server is None
                 try:
                     ctx.server = websockets.serve(
@@ -310,6 +358,8 @@ def run_server_process(name: str, ponyconfig: dict, static_server_data: dict,
                 try:
                     ctx.save_dirty = False  # make sure the saving thread does not write to DB after final wakeup
                     ctx.exit_event.set()  # make sure the saving thread stops at some point
+                    ctx.command_event.set()  # and the command thread
+                    running_rooms.pop(room_id, None)
                     # NOTE: async saving should probably be an async task and could be merged with shutdown_task
                     with (db_session):
                         # ensure the Room does not spin up again on its own, minute of safety buffer
@@ -345,6 +395,14 @@ def run_server_process(name: str, ponyconfig: dict, static_server_data: dict,
     starter = Starter()
     starter.daemon = True
     starter.start()
+
+    def wake_rooms_with_commands():
+        while 1:
+            ctx = running_rooms.get(rooms_with_commands.get(block=True, timeout=None), None)
+            if ctx:
+                ctx.command_event.set()
+
+    threading.Thread(target=wake_rooms_with_commands, name="CommandNotifier", daemon=True).start()
     try:
         loop.run_forever()
     finally:
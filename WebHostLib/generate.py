@@ -105,85 +105,86 @@ def start_generation(options: Dict[str, Union[dict, str]], meta: Dict[str, Any])
 
 
 def gen_game(gen_options: dict, meta: Optional[Dict[str, Any]] = None, owner=None, sid=None):
-    if not meta:
-        meta: Dict[str, Any] = {}
-
-    meta.setdefault("server_options", {}).setdefault("hint_cost", 10)
-    race = meta.setdefault("generator_options", {}).setdefault("race", False)
-
-    def task():
-        target = tempfile.TemporaryDirectory()
-        playercount = len(gen_options)
-        seed = get_seed()
-
-        if race:
-            random.seed()  # use time-based random source
-        else:
-            random.seed(seed)
-
-        seedname = "W" + (f"{random.randint(0, pow(10, seeddigits) - 1)}".zfill(seeddigits))
-
-        erargs = parse_arguments(['--multi', str(playercount)])
-        erargs.seed = seed
-        erargs.name = {x: "" for x in range(1, playercount + 1)}  # only so it can be overwritten in mystery
-        erargs.spoiler = meta["generator_options"].get("spoiler", 0)
-        erargs.race = race
-        erargs.outputname = seedname
-        erargs.outputpath = target.name
-        erargs.teams = 1
-        erargs.plando_options = PlandoOptions.from_set(meta.setdefault("plando_options",
-                                                                       {"bosses", "items", "connections", "texts"}))
-        erargs.skip_prog_balancing = False
-        erargs.skip_output = False
-        erargs.csv_output = False
-
-        name_counter = Counter()
-        for player, (playerfile, settings) in enumerate(gen_options.items(), 1):
-            for k, v in settings.items():
-                if v is not None:
-                    if hasattr(erargs, k):
-                        getattr(erargs, k)[player] = v
-                    else:
-                        setattr(erargs, k, {player: v})
-
-            if not erargs.name[player]:
-                erargs.name[player] = os.path.splitext(os.path.split(playerfile)[-1])[0]
-            erargs.name[player] = handle_name(erargs.name[player], player, name_counter)
-        if len(set(erargs.name.values())) != len(erargs.name):
-            raise Exception(f"Names have to be unique. Names: {Counter(erargs.name.values())}")
-        ERmain(erargs, seed, baked_server_options=meta["server_options"])
-
-        return upload_to_db(target.name, sid, owner, race)
     thread_pool = concurrent.futures.ThreadPoolExecutor(max_workers=1)
-    thread = thread_pool.submit(task)
+    thread = thread_pool.submit(run_generation, gen_options, meta, owner, sid)
 
     try:
         return thread.result(app.config["JOB_TIME"])
     except concurrent.futures.TimeoutError as e:
-        if sid:
-            with db_session:
-                gen = Generation.get(id=sid)
-                if gen is not None:
-                    gen.state = STATE_ERROR
-                    meta = json.loads(gen.meta)
-                    meta["error"] = (
-                            "Allowed time for Generation exceeded, please consider generating locally instead. " +
-                            e.__class__.__name__ + ": " + str(e))
-                    gen.meta = json.dumps(meta)
-                    commit()
+        set_generation_error(sid, "Allowed time for Generation exceeded, please consider generating locally instead. " +
+                             e.__class__.__name__ + ": " + str(e))
     except BaseException as e:
-        if sid:
-            with db_session:
-                gen = Generation.get(id=sid)
-                if gen is not None:
-                    gen.state = STATE_ERROR
-                    meta = json.loads(gen.meta)
-                    meta["error"] = (e.__class__.__name__ + ": " + str(e))
-                    gen.meta = json.dumps(meta)
-                    commit()
+        set_generation_error(sid, e.__class__.__name__ + ": " + str(e))
         raise
 
 
+def run_generation(gen_options: dict, meta: Optional[Dict[str, Any]] = None, owner=None, sid=None):
+    """Generates and uploads the multiworld in the calling thread, without a time limit."""
+    if not meta:
+        meta: Dict[str, Any] = {}
+
+    meta.setdefault("server_options", {}).setdefault("hint_cost", 10)
+    race = meta.setdefault("generator_options", {}).setdefault("race", False)
+
+    target = tempfile.TemporaryDirectory()
+    playercount = len(gen_options)
+    seed = get_seed()
+
+    if race:
+        random.seed()  # use time-based random source
+    else:
+        random.seed(seed)
+
+    seedname = "W" + (f"{random.randint(0, pow(10, seeddigits) - 1)}".zfill(seeddigits))
+
+    erargs = parse_arguments(['--multi', str(playercount)])
+    erargs.seed = seed
+    erargs.name = {x: "" for x in range(1, playercount + 1)}  # only so it can be overwritten in mystery
+    erargs.spoiler = meta["generator_options"].get("spoiler", 0)
+    erargs.race = race
+    erargs.outputname = seedname
+    erargs.outputpath = target.name
+    erargs.teams = 1
+    erargs.plando_options = PlandoOptions.from_set(meta.setdefault("plando_options",
+                                                                   {"bosses", "items", "connections", "texts"}))
+    erargs.skip_prog_balancing = False
+    erargs.skip_output = False
+    erargs.csv_output = False
+    erargs.stage_processes = 0
+    erargs.output_processes = 0
+
+    name_counter = Counter()
+    for player, (playerfile, settings) in enumerate(gen_options.items(), 1):
+        for k, v in settings.items():
+            if v is not None:
+                if hasattr(erargs, k):
+                    getattr(erargs, k)[player] = v
+                else:
+                    setattr(erargs, k, {player: v})
+
+        if not erargs.name[player]:
+            erargs.name[player] = os.path.splitext(os.path.split(playerfile)[-1])[0]
+        erargs.name[player] = handle_name(erargs.name[player], player, name_counter)
+    if len(set(erargs.name.values())) != len(erargs.name):
+        raise Exception(f"Names have to be unique. Names: {Counter(erargs.name.values())}")
+    ERmain(erargs, seed, baked_server_options=meta["server_options"])
+
+    return upload_to_db(target.name, sid, owner, race)
+
+
+def set_generation_error(sid, error: str) -> None:
+    """Marks the Generation as failed with the error, if it was queued."""
+    if sid:
+        with db_session:
+            gen = Generation.get(id=sid)
+            if gen is not None:
+                gen.state = STATE_ERROR
+                meta = json.loads(gen.meta)
+                meta["error"] = error
+                gen.meta = json.dumps(meta)
+                commit()
+
+
 @app.route('/wait/<suuid:seed>')
 def wait_seed(seed: UUID):
     seed_id = seed
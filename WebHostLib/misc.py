@@ -10,6 +10,8 @@ from werkzeug.utils import secure_filename
 from worlds.AutoWorld import AutoWorldRegister
 from . import app, cache
 from .models import Seed, Room, Command, UUID, uuid4
+from .notify import notify_room, ROOM_COMMAND
+from .stats import record_games_played
 
 
 def get_world_theme(game_name: str):
@@ -114,7 +116,9 @@ def new_room(seed: UUID):
         abort(404)
     room = Room(seed=seed, owner=session["_id"], tracker=uuid4())
     commit()
-    return redirect(url_for("host_room", room=room.id))
+    room_id = room.id
+    record_games_played(room)
+    return redirect(url_for("host_room", room=room_id))
 
 
 def _read_log(log: IO[Any], offset: int = 0) -> Iterator[bytes]:
@@ -163,6 +167,7 @@ def host_room_command(room: UUID):
         if cmd:
             Command(room=room, commandtext=cmd)
             commit()
+            notify_room(room.id, ROOM_COMMAND)
     return redirect(url_for("host_room", room=room.id))
 
 
@@ -178,6 +183,8 @@ def host_room(room: UUID):
                       or room.last_activity < now - datetime.timedelta(seconds=room.timeout))
     with db_session:
         room.last_activity = now  # will trigger a spinup, if it's not already running
+        commit()  # the autohost looks the room up when notified
+    notify_room(room.id)
 
     browser_tokens = "Mozilla", "Chrome", "Safari"
     automated = ("update" in request.args
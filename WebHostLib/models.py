@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import date, datetime
 from uuid import UUID, uuid4
 from pony.orm import Database, PrimaryKey, Required, Set, Optional, buffer, LongStr
 
@@ -26,6 +26,7 @@ class Room(db.Entity):
     commands = Set('Command')
     seed = Required('Seed', index=True)
     multisave = Optional(buffer, lazy=True)
+    save_journal = Set('SaveJournalEntry')  # changes since multisave was written, replayed in order of id
     show_spoiler = Required(int, default=0)  # 0 -> never, 1 -> after completion, -> 2 always
     timeout = Required(int, default=lambda: 2 * 60 * 60)  # seconds since last activity to shutdown
     tracker = Optional(UUID, index=True)
@@ -50,6 +51,12 @@ class Command(db.Entity):
     commandtext = Required(str)
 
 
+class SaveJournalEntry(db.Entity):
+    id = PrimaryKey(int, auto=True)
+    room = Required(Room)
+    data = Required(buffer, lazy=True)
+
+
 class Generation(db.Entity):
     id = PrimaryKey(UUID, default=uuid4)
     owner = Required(UUID)
@@ -58,6 +65,14 @@ class Generation(db.Entity):
     state = Required(int, default=0, index=True)
 
 
+class GamesPlayed(db.Entity):
+    """Slots of rooms created per day and game, counted as rooms get created. Read by the stats page."""
+    day = Required(date)
+    game = Required(str)
+    count = Required(int, default=0)
+    PrimaryKey(day, game)
+
+
 class GameDataPackage(db.Entity):
     checksum = PrimaryKey(str)
     data = Required(bytes)
@@ -0,0 +1,276 @@
+"""
+Read-only name tables of the static data package, shared by all room hosting processes through a memory mapped file.
+
+The autolauncher writes the file once with write_name_table, every hoster process maps it with NameTable.
+Lookups read the mapped pages directly, so the id <-> name tables exist once in memory, instead of once per
+process and room. The file uses native byte order, it is only meant to be shared between processes of one machine.
+"""
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import typing
+from array import array
+from bisect import bisect_left
+from functools import cached_property
+
+name_table_magic = b"APNT"
+name_table_version = 1
+
+T = typing.TypeVar("T")
+
+
+def _write_section(out: bytearray, names_to_ids: typing.Mapping[str, int]) -> typing.List[int]:
+    """Appends one id <-> name table and returns its [offset, count, size of names]. A table consists of the ids
+    in ascending order, the end of each name in the names blob in id order, the id order positions sorted by name
+    and the blob of utf-8 encoded names."""
+    by_id = sorted((item_id, name.encode("utf-8")) for name, item_id in names_to_ids.items())
+    names = bytearray()
+    name_ends = array("I")
+    for _, name in by_id:
+        names += name
+        name_ends.append(len(names))
+    by_name = array("I", sorted(range(len(by_id)), key=lambda position: by_id[position][1]))
+
+    offset = len(out)
+    out += array("q", (item_id for item_id, _ in by_id)).tobytes()
+    out += name_ends.tobytes()
+    out += by_name.tobytes()
+    out += names
+    out += bytes(-len(out) % 8)  # keep the next table's ids aligned
+    return [offset, len(by_id), len(names)]
+
+
+def write_name_table(path: str, gamespackage: typing.Mapping[str, typing.Mapping[str, typing.Any]],
+                     item_name_groups: typing.Mapping[str, typing.Mapping[str, typing.AbstractSet[str]]],
+                     location_name_groups: typing.Mapping[str, typing.Mapping[str, typing.AbstractSet[str]]]) -> None:
+    """
+    Writes the name table file: magic, format version byte, the size of the index as 4 bytes little endian, the JSON
+    index of game -> checksum and offsets of its tables, padding to 8 bytes, then the tables.
+    Replaces an existing file atomically, so processes that still map the previous file are unaffected.
+    """
+    data = bytearray()
+    index: typing.Dict[str, typing.Dict[str, typing.Any]] = {}
+    for game, game_package in gamespackage.items():
+        entry = index[game] = {
+            "checksum": game_package.get("checksum"),
+            "items": _write_section(data, game_package["item_name_to_id"]),
+            "locations": _write_section(data, game_package["location_name_to_id"]),
+        }
+        for key, groups in (("item_name_groups", item_name_groups.get(game, {})),
+                            ("location_name_groups", location_name_groups.get(game, {}))):
+            encoded_groups = json.dumps({name: sorted(group) for name, group in groups.items()}).encode("utf-8")
+            entry[key] = [len(data), len(encoded_groups)]
+            data += encoded_groups
+        data += bytes(-len(data) % 8)
+
+    encoded_index = json.dumps(index).encode("utf-8")
+    header = name_table_magic + bytes([name_table_version]) + len(encoded_index).to_bytes(4, "little") + encoded_index
+    header += bytes(-len(header) % 8)
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(header)
+        f.write(data)
+    os.replace(temp_path, path)
+
+
+class _NameTableSection:
+    __slots__ = ("ids", "name_ends", "by_name", "names")
+
+    def __init__(self, data: memoryview, offset: int, count: int, names_size: int):
+        self.ids = data[offset:offset + 8 * count].cast("q")
+        offset += 8 * count
+        self.name_ends = data[offset:offset + 4 * count].cast("I")
+        offset += 4 * count
+        self.by_name = data[offset:offset + 4 * count].cast("I")
+        offset += 4 * count
+        self.names = data[offset:offset + names_size]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def name_at(self, position: int) -> str:
+        start = self.name_ends[position - 1] if position else 0
+        return str(self.names[start:self.name_ends[position]], "utf-8")
+
+    def position_of_id(self, item_id: int) -> int:
+        """Position of the id in the table, -1 if it isn't in it."""
+        if type(item_id) is not int:
+            return -1
+        position = bisect_left(self.ids, item_id)
+        if position < len(self.ids) and self.ids[position] == item_id:
+            return position
+        return -1
+
+    def position_of_name(self, name: str) -> int:
+        """Position of the id of the name in the table, -1 if it isn't in it."""
+        if type(name) is not str:
+            return -1
+        encoded = name.encode("utf-8")
+        low, high = 0, len(self.by_name)
+        while low < high:
+            middle = (low + high) // 2
+            position = self.by_name[middle]
+            start = self.name_ends[position - 1] if position else 0
+            candidate = self.names[start:self.name_ends[position]]
+            if candidate == encoded:
+                return position
+            if bytes(candidate) < encoded:
+                low = middle + 1
+            else:
+                high = middle
+        return -1
+
+
+class IdToName(typing.Mapping[int, str]):
+    """Id -> name of one game. Ids of the fallback section, the Archipelago game, are included, like the name dicts
+    of MultiServer.Context. Unknown ids are named with the missing format, like its KeyedDefaultDicts do."""
+
+    def __init__(self, section: _NameTableSection, fallback: typing.Optional[_NameTableSection], missing: str):
+        self._section = section
+        self._fallback = fallback
+        self._missing = missing
+
+    def __getitem__(self, item_id: int) -> str:
+        for section in (self._section, self._fallback):
+            if section:
+                position = section.position_of_id(item_id)
+                if position >= 0:
+                    return section.name_at(position)
+        return self._missing.format(item_id)
+
+    def get(self, item_id: int, default: typing.Any = None) -> typing.Any:
+        return self[item_id] if item_id in self else default
+
+    def __contains__(self, item_id: object) -> bool:
+        return any(section.position_of_id(item_id) >= 0 for section in (self._section, self._fallback) if section)
+
+    def __iter__(self) -> typing.Iterator[int]:
+        yield from self._section.ids
+        if self._fallback:
+            yield from (item_id for item_id in self._fallback.ids if self._section.position_of_id(item_id) < 0)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+
+class NameToId(typing.Mapping[str, int]):
+    """Name -> id of one game, the item_name_to_id and location_name_to_id of its data package."""
+
+    def __init__(self, section: _NameTableSection):
+        self._section = section
+
+    def __getitem__(self, name: str) -> int:
+        position = self._section.position_of_name(name)
+        if position < 0:
+            raise KeyError(name)
+        return self._section.ids[position]
+
+    def __contains__(self, name: object) -> bool:
+        return self._section.position_of_name(name) >= 0
+
+    def __iter__(self) -> typing.Iterator[str]:
+        return (self._section.name_at(position) for position in range(len(self._section)))
+
+    def __len__(self) -> int:
+        return len(self._section)
+
+
+class LazyGameMapping(typing.Mapping[str, T]):
+    """Game -> value, which is created on first access and then kept for the lifetime of the process."""
+
+    def __init__(self, games: typing.Collection[str], factory: typing.Callable[[str], T]):
+        self._games = games
+        self._factory = factory
+        self._values: typing.Dict[str, T] = {}
+
+    def __getitem__(self, game: str) -> T:
+        try:
+            return self._values[game]
+        except KeyError:
+            if game not in self._games:
+                raise
+        value = self._values[game] = self._factory(game)
+        return value
+
+    def __contains__(self, game: object) -> bool:
+        return game in self._games
+
+    def __iter__(self) -> typing.Iterator[str]:
+        return iter(self._games)
+
+    def __len__(self) -> int:
+        return len(self._games)
+
+
+class NameTable:
+    """A mapped name table file, providing the static data package in the shapes MultiServer.Context uses."""
+    checksums: typing.Dict[str, str]
+    gamespackage: typing.Dict[str, typing.Dict[str, typing.Any]]
+    """game -> {"item_name_to_id", "location_name_to_id", "checksum"}, like network_data_package["games"]"""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            # the mapping is never closed, as it backs the lookups for the lifetime of the process
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        data = memoryview(self._mmap)
+        if bytes(data[:4]) != name_table_magic:
+            raise ValueError(f"{path} is not a name table.")
+        if data[4] != name_table_version:
+            raise ValueError(f"Name table {path} is of version {data[4]}, expected {name_table_version}.")
+        index_size = int.from_bytes(data[5:9], "little")
+        self._index: typing.Dict[str, typing.Dict[str, typing.Any]] = json.loads(bytes(data[9:9 + index_size]))
+        start = 9 + index_size
+        self._data = data[start + -start % 8:]
+
+        self._sections: typing.Dict[typing.Tuple[str, str], _NameTableSection] = {
+            (game, kind): _NameTableSection(self._data, *entry[kind])
+            for game, entry in self._index.items() for kind in ("items", "locations")
+        }
+        self.checksums = {game: entry["checksum"] for game, entry in self._index.items() if entry["checksum"]}
+        self.gamespackage = {}
+        for game, entry in self._index.items():
+            game_package = self.gamespackage[game] = {
+                "item_name_to_id": NameToId(self._sections[game, "items"]),
+                "location_name_to_id": NameToId(self._sections[game, "locations"]),
+            }
+            if entry["checksum"]:
+                game_package["checksum"] = entry["checksum"]
+
+    def _names(self, kind: str, missing: str) -> LazyGameMapping[IdToName]:
+        archipelago = self._sections.get(("Archipelago", kind), None)
+        return LazyGameMapping(self._index, lambda game: IdToName(
+            self._sections[game, kind], archipelago if game != "Archipelago" else None, missing))
+
+    def _groups(self, key: str) -> LazyGameMapping[typing.Dict[str, typing.Set[str]]]:
+        def decode(game: str) -> typing.Dict[str, typing.Set[str]]:
+            offset, size = self._index[game][key]
+            return {name: set(group) for name, group in json.loads(bytes(self._data[offset:offset + size])).items()}
+        return LazyGameMapping(self._index, decode)
+
+    @cached_property
+    def item_names(self) -> LazyGameMapping[IdToName]:
+        return self._names("items", "Unknown item (ID:{})")
+
+    @cached_property
+    def location_names(self) -> LazyGameMapping[IdToName]:
+        return self._names("locations", "Unknown location (ID:{})")
+
+    @cached_property
+    def item_name_groups(self) -> LazyGameMapping[typing.Dict[str, typing.Set[str]]]:
+        return self._groups("item_name_groups")
+
+    @cached_property
+    def location_name_groups(self) -> LazyGameMapping[typing.Dict[str, typing.Set[str]]]:
+        return self._groups("location_name_groups")
+
+    @cached_property
+    def all_item_and_group_names(self) -> LazyGameMapping[typing.Set[str]]:
+        return LazyGameMapping(self._index, lambda game: set(self.gamespackage[game]["item_name_to_id"]) |
+                               set(self.item_name_groups[game]))
+
+    @cached_property
+    def all_location_and_group_names(self) -> LazyGameMapping[typing.Set[str]]:
+        return LazyGameMapping(self._index, lambda game: set(self.gamespackage[game]["location_name_to_id"]) |
+                               set(self.location_name_groups[game]))
@@ -0,0 +1,76 @@
+"""
+Wakes the autohost when a room has work, instead of it polling the database for it.
+
+The autohost listens on a local UDP socket, the port of which it writes next to its lock file. Web views send the id of
+a room to it, after they changed that room in the database. Notifications are best effort: when one can't be sent or is
+lost, the autohost still picks the change up with its slow fallback polling of the database.
+"""
+from __future__ import annotations
+
+import os
+import socket
+import typing
+from uuid import UUID
+
+from .locker import CommonLocker
+
+ROOM_ACTIVITY = b"a"
+"""The room's last_activity was updated, so it may have to be started."""
+ROOM_COMMAND = b"c"
+"""A Command was added for the room."""
+
+port_file = os.path.join(CommonLocker.lock_folder, "autohost.port")
+_message_size = 17  # kind + room id
+
+
+def notify_room(room_id: UUID, kind: bytes = ROOM_ACTIVITY) -> None:
+    """Tells a running autohost about a change to the room. Does nothing if no autohost is running."""
+    try:
+        with open(port_file) as f:
+            port = int(f.read())
+    except (OSError, ValueError):
+        return
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        try:
+            sock.sendto(kind + room_id.bytes, ("127.0.0.1", port))
+        except OSError:
+            pass
+
+
+class NotificationListener:
+    """Receives the notifications of notify_room, in the process holding the autohost lock."""
+
+    def __init__(self):
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.bind(("127.0.0.1", 0))
+        os.makedirs(os.path.dirname(port_file), exist_ok=True)
+        with open(port_file, "w") as f:
+            f.write(str(self.socket.getsockname()[1]))
+
+    def receive(self, timeout: float) -> typing.List[typing.Tuple[bytes, UUID]]:
+        """Waits up to timeout seconds for a notification, then returns all notifications that have arrived."""
+        notifications: typing.List[typing.Tuple[bytes, UUID]] = []
+        self.socket.settimeout(timeout)
+        while True:
+            try:
+                message = self.socket.recv(_message_size + 1)
+            except (socket.timeout, BlockingIOError):
+                return notifications
+            except ConnectionResetError:
+                continue  # windows reports an earlier failed send to this socket
+            if len(message) == _message_size and message[:1] in (ROOM_ACTIVITY, ROOM_COMMAND):
+                notifications.append((message[:1], UUID(bytes=message[1:])))
+            self.socket.setblocking(False)  # collect what else is already queued
+
+    def close(self) -> None:
+        self.socket.close()
+        try:
+            os.unlink(port_file)
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self) -> NotificationListener:
+        return self
+
+    def __exit__(self, _type, value, tb) -> None:
+        self.close()
@@ -1,3 +1,4 @@
+import logging
 import typing
 from collections import Counter, defaultdict
 from colorsys import hsv_to_rgb
@@ -10,25 +11,70 @@ from bokeh.models import HoverTool
 from bokeh.plotting import figure, ColumnDataSource
 from bokeh.resources import INLINE
 from flask import render_template
-from pony.orm import select
+from pony.orm import TransactionError, commit, db_session, rollback, select
 
 from . import app, cache
-from .models import Room
+from .models import GamesPlayed, Room
 
 PLOT_WIDTH = 600
 
 
+def record_games_played(room: Room, attempts: int = 3) -> None:
+    """
+    Counts the slots of a newly created room in the GamesPlayed aggregate. The room has to be committed already,
+    as rooms created at the same time can conflict on the same counters, which gets retried and rolled back here.
+    """
+    room_id = room.id
+    day = room.creation_time.date()
+    games = Counter(slot.game for slot in room.seed.slots)
+    for _ in range(attempts):
+        try:
+            for game, slots in games.items():
+                games_played = GamesPlayed.get(day=day, game=game)
+                if games_played:
+                    games_played.count += slots
+                else:
+                    GamesPlayed(day=day, game=game, count=slots)
+            commit()
+            return
+        except TransactionError:
+            rollback()
+    logging.warning(f"Could not count the games of room {room_id} for the stats.")
+
+
+@db_session
+def backfill_games_played() -> None:
+    """
+    Counts the rooms created before GamesPlayed existed, so the stats don't start out empty.
+    Called on startup, before any room got counted by this instance.
+    """
+    if GamesPlayed.select().exists():
+        return
+    cutoff = date.today() - timedelta(days=30)
+    counts: typing.Counter[typing.Tuple[date, str]] = Counter()
+    room: Room
+    for room in select(room for room in Room if room.creation_time >= cutoff):
+        for slot in room.seed.slots:
+            counts[room.creation_time.date(), slot.game] += 1
+    for (day, game), count in counts.items():
+        GamesPlayed(day=day, game=game, count=count)
+    try:
+        commit()
+    except TransactionError:
+        # another process starting up at the same time backfilled already
+        rollback()
+
+
 def get_db_data(known_games: typing.Set[str]) -> typing.Tuple[typing.Counter[str],
                                                               typing.DefaultDict[datetime.date, typing.Dict[str, int]]]:
     games_played = defaultdict(Counter)
     total_games = Counter()
     cutoff = date.today() - timedelta(days=30)
-    room: Room
-    for room in select(room for room in Room if room.creation_time >= cutoff):
-        for slot in room.seed.slots:
-            if slot.game in known_games:
-                total_games[slot.game] += 1
-                games_played[room.creation_time.date()][slot.game] += 1
+    day_games: GamesPlayed
+    for day_games in select(day_games for day_games in GamesPlayed if day_games.day >= cutoff):
+        if day_games.game in known_games:
+            total_games[day_games.game] += day_games.count
+            games_played[day_games.day][day_games.game] += day_games.count
     return total_games, games_played
 
 
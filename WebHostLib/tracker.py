@@ -1,5 +1,6 @@
 import datetime
 import collections
+import functools
 from dataclasses import dataclass
 from typing import Any, Callable, Dict, List, Optional, Set, Tuple, NamedTuple, Counter
 from uuid import UUID
@@ -8,16 +9,18 @@ from email.utils import parsedate_to_datetime
 from flask import make_response, render_template, request, Request, Response
 from werkzeug.exceptions import abort
 
-from MultiServer import Context, get_saving_second
-from NetUtils import ClientStatus, Hint, NetworkItem, NetworkSlot, SlotType
+from MultiServer import apply_save_journal, get_saving_second
+from NetUtils import ClientStatus, Hint, NetworkItem, NetworkSlot, SlotType, decode_multidata
 from Utils import restricted_loads, KeyedDefaultDict
 from . import app, cache
-from .models import GameDataPackage, Room
+from .models import GameDataPackage, Room, SaveJournalEntry, Seed
 
 # Multisave is currently updated, at most, every minute.
 TRACKER_CACHE_TIMEOUT_IN_SECONDS = 60
+# Seeds and data packages don't change, so their parsed data is kept for the most recently tracked ones.
+TRACKER_SEED_CACHE_SIZE = 32
+TRACKER_DATA_PACKAGE_CACHE_SIZE = 256
 
-_multidata_cache = {}
 _multiworld_trackers: Dict[str, Callable] = {}
 _player_trackers: Dict[str, Callable] = {}
 
@@ -41,12 +44,42 @@ def _cache_results(func: Callable) -> Callable:
     return method_wrapper
 
 
+@functools.lru_cache(maxsize=TRACKER_SEED_CACHE_SIZE)
+def _get_seed_multidata(seed_id: UUID) -> Dict[str, Any]:
+    """Retrieves the multidata sections trackers need of a seed, shared by all TrackerData of its rooms.
+    Must not be modified, other than adding further sections of the same multidata."""
+    # spheres are only read by few trackers and hints come from the multisave, so skip those sections
+    return decode_multidata(Seed.get(id=seed_id).multidata, ("main", "locations", "slot_data", "datapackage"))
+
+
+class _DataPackageNames(NamedTuple):
+    item_id_to_name: Dict[int, str]
+    location_id_to_name: Dict[int, str]
+    item_name_to_id: Dict[str, int]
+    location_name_to_id: Dict[str, int]
+
+
+@functools.lru_cache(maxsize=TRACKER_DATA_PACKAGE_CACHE_SIZE)
+def _get_data_package_names(checksum: str) -> _DataPackageNames:
+    """Retrieves the lookup tables of a data package, shared by all seeds using it."""
+    game_package = restricted_loads(GameDataPackage.get(checksum=checksum).data)
+    return _DataPackageNames(
+        KeyedDefaultDict(lambda code: f"Unknown Item (ID: {code})", {
+            id: name for name, id in game_package["item_name_to_id"].items()}),
+        KeyedDefaultDict(lambda code: f"Unknown Location (ID: {code})", {
+            id: name for name, id in game_package["location_name_to_id"].items()}),
+        game_package["item_name_to_id"],
+        game_package["location_name_to_id"],
+    )
+
+
 @dataclass
 class TrackerData:
     """A helper dataclass that is instantiated each time an HTTP request comes in for tracker data.
 
     Provides helper methods to lazily load necessary data that each tracker require and caches any results so any
     subsequent helper method calls do not need to recompute results during the lifetime of this instance.
+    Only the multisave is read for each instance, the static data of the seed is shared between instances.
     """
     room: Room
     _multidata: Dict[str, Any]
@@ -56,14 +89,17 @@ class TrackerData:
     def __init__(self, room: Room):
         """Initialize a new RoomMultidata object for the current room."""
         self.room = room
-        self._multidata = Context.decompress(room.seed.multidata)
+        self._multidata = _get_seed_multidata(room.seed.id)
         self._multisave = restricted_loads(room.multisave) if room.multisave else {}
+        if self._multisave:
+            apply_save_journal(self._multisave, (restricted_loads(entry.data)
+                                                 for entry in room.save_journal.order_by(SaveJournalEntry.id)))
         self._tracker_cache = {}
 
         self.item_name_to_id: Dict[str, Dict[str, int]] = {}
         self.location_name_to_id: Dict[str, Dict[str, int]] = {}
 
-        # Generate inverse lookup tables from data package, useful for trackers.
+        # Inverse lookup tables from data package, useful for trackers.
         self.item_id_to_name: Dict[str, Dict[int, str]] = KeyedDefaultDict(lambda game_name: {
             game_name: KeyedDefaultDict(lambda code: f"Unknown Game {game_name} - Item (ID: {code})")
         })
@@ -71,15 +107,13 @@ class TrackerData:
             game_name: KeyedDefaultDict(lambda code: f"Unknown Game {game_name} - Location (ID: {code})")
         })
         for game, game_package in self._multidata["datapackage"].items():
-            game_package = restricted_loads(GameDataPackage.get(checksum=game_package["checksum"]).data)
-            self.item_id_to_name[game] = KeyedDefaultDict(lambda code: f"Unknown Item (ID: {code})", {
-                id: name for name, id in game_package["item_name_to_id"].items()})
-            self.location_id_to_name[game] = KeyedDefaultDict(lambda code: f"Unknown Location (ID: {code})", {
-                id: name for name, id in game_package["location_name_to_id"].items()})
+            names = _get_data_package_names(game_package["checksum"])
+            self.item_id_to_name[game] = names.item_id_to_name
+            self.location_id_to_name[game] = names.location_id_to_name
 
             # Normal lookup tables as well.
-            self.item_name_to_id[game] = game_package["item_name_to_id"]
-            self.location_name_to_id[game] = game_package["location_name_to_id"]
+            self.item_name_to_id[game] = names.item_name_to_id
+            self.location_name_to_id[game] = names.location_name_to_id
 
     def get_seed_name(self) -> str:
         """Retrieves the seed name."""
@@ -295,6 +329,8 @@ class TrackerData:
     @_cache_results
     def get_spheres(self) -> List[List[int]]:
         """ each sphere is { player: { location_id, ... } } """
+        if "spheres" not in self._multidata:
+            self._multidata.update(decode_multidata(self.room.seed.multidata, ("spheres",)))
         return self._multidata.get("spheres", [])
 
 
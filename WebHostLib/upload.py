@@ -4,7 +4,6 @@ import pickle
 import typing
 import uuid
 import zipfile
-import zlib
 
 from io import BytesIO
 from flask import request, flash, redirect, url_for, session, render_template, abort
@@ -14,7 +13,8 @@ from pony.orm.core import TransactionIntegrityError
 import schema
 
 import MultiServer
-from NetUtils import SlotType
+from NetUtils import (SlotType, decode_multidata, encode_multidata, multidata_format_version,
+                      replace_multidata_sections)
 from Utils import VersionException, __version__
 from worlds import GamesPackage
 from worlds.Files import AutoPatchRegister
@@ -51,7 +51,11 @@ def banned_file(filename: str) -> bool:
 def process_multidata(compressed_multidata, files={}):
     game_data: GamesPackage
 
-    decompressed_multidata = MultiServer.Context.decompress(compressed_multidata)
+    if compressed_multidata[0] < multidata_format_version:
+        # older formats are a single blob, which is converted once, so it can be read by section from then on
+        compressed_multidata = encode_multidata(MultiServer.Context.decompress(compressed_multidata))
+    # the location and slot data sections are stored as uploaded, only the small sections are read
+    decompressed_multidata = decode_multidata(compressed_multidata, ("main", "datapackage"))
 
     slots: typing.Set[Slot] = set()
     if "datapackage" in decompressed_multidata:
@@ -59,6 +63,13 @@ def process_multidata(compressed_multidata, files={}):
         game_data_packages: typing.List[GameDataPackage] = []
         for game, game_data in decompressed_multidata["datapackage"].items():
             if game_data.get("checksum"):
+                if GameDataPackage.get(checksum=game_data["checksum"]):
+                    # already validated on an earlier upload, so the embedded copy can be dropped as is
+                    decompressed_multidata["datapackage"][game] = {
+                        "version": game_data.get("version", 0),
+                        "checksum": game_data["checksum"],
+                    }
+                    continue
                 original_checksum = game_data.pop("checksum")
                 game_data = games_package_schema.validate(game_data)
                 game_data = {key: value for key, value in sorted(game_data.items())}
@@ -80,6 +91,8 @@ def process_multidata(compressed_multidata, files={}):
                 except TransactionIntegrityError:
                     del game_data_package
                     rollback()
+        compressed_multidata = replace_multidata_sections(
+            compressed_multidata, {"datapackage": {"datapackage": decompressed_multidata["datapackage"]}})
 
     if "slot_info" in decompressed_multidata:
         for slot, slot_info in decompressed_multidata["slot_info"].items():
@@ -92,7 +105,6 @@ def process_multidata(compressed_multidata, files={}):
                            game=slot_info.game))
         flush()  # commit slots
 
-    compressed_multidata = compressed_multidata[0:1] + zlib.compress(pickle.dumps(decompressed_multidata), 9)
     return slots, compressed_multidata
 
 
@@ -5,7 +5,7 @@ import time
 from collections import deque
 from collections.abc import Callable, Iterable
 
-from BaseClasses import CollectionState, Entrance, Region, EntranceType
+from BaseClasses import CollectionState, Entrance, Location, Region, EntranceType, mutable_container
 from Options import Accessibility
 from worlds.AutoWorld import World
 
@@ -145,6 +145,8 @@ class ERPlacementState:
     """The CollectionState backing the entrance randomization logic"""
     coupled: bool
     """Whether entrance randomization is operating in coupled mode"""
+    _unswept_advancements: list[Location] | None
+    """The advancement locations not collected by the collection state yet, or None if they have to be gathered again"""
 
     def __init__(self, world: World, coupled: bool):
         self.placements = []
@@ -152,6 +154,7 @@ class ERPlacementState:
         self.world = world
         self.coupled = coupled
         self.collection_state = world.multiworld.get_all_state(False, True)
+        self._unswept_advancements = None
 
     @property
     def placed_regions(self) -> set[Region]:
@@ -160,10 +163,11 @@ class ERPlacementState:
     def find_placeable_exits(self, check_validity: bool) -> list[Entrance]:
         if check_validity:
             blocked_connections = self.collection_state.blocked_connections[self.world.player]
-            blocked_connections = sorted(blocked_connections, key=lambda x: x.name)
-            placeable_randomized_exits = [connection for connection in blocked_connections
-                                          if not connection.connected_region
-                                          and connection.is_valid_source_transition(self)]
+            # only sort what is left after filtering, most blocked connections are already connected
+            placeable_randomized_exits = sorted([connection for connection in blocked_connections
+                                                 if not connection.connected_region
+                                                 and connection.is_valid_source_transition(self)],
+                                                key=lambda x: x.name)
         else:
             # this is on a beaten minimal attempt, so any exit anywhere is fair game
             placeable_randomized_exits = [ex for region in self.world.multiworld.get_regions(self.world.player)
@@ -181,29 +185,49 @@ class ERPlacementState:
         self.placements.append(source_exit)
         self.pairings.append((source_exit.name, target_entrance.name))
 
+    def sweep_for_advancements(self) -> None:
+        """
+        Collects the advancements made reachable by the latest placements. Unlike a sweep over all locations of the
+        multiworld, this only looks at the advancement locations the collection state hasn't collected yet.
+        """
+        unswept_advancements = self._get_unswept_advancements()
+        self.collection_state.sweep_for_advancements(unswept_advancements)
+        self._unswept_advancements = [location for location in unswept_advancements
+                                      if location not in self.collection_state.advancements]
+
+    def _get_unswept_advancements(self) -> list[Location]:
+        if self._unswept_advancements is None:
+            self._unswept_advancements = [location for location in self.world.multiworld.get_locations()
+                                          if location.advancement
+                                          and location not in self.collection_state.advancements]
+        return self._unswept_advancements
+
     def test_speculative_connection(self, source_exit: Entrance, target_entrance: Entrance) -> bool:
-        copied_state = self.collection_state.copy()
-        # simulated connection. A real connection is unsafe because the region graph is shallow-copied and would
-        # propagate back to the real multiworld.
-        copied_state.reachable_regions[self.world.player].add(target_entrance.connected_region)
-        copied_state.blocked_connections[self.world.player].remove(source_exit)
-        copied_state.blocked_connections[self.world.player].update(target_entrance.connected_region.exits)
-        copied_state.update_reachable_regions(self.world.player)
-        copied_state.sweep_for_advancements()
-        # test that at there are newly reachable randomized exits that are ACTUALLY reachable
-        available_randomized_exits = copied_state.blocked_connections[self.world.player]
-        for _exit in available_randomized_exits:
-            if _exit.connected_region:
-                continue
-            # ignore the source exit, and, if coupled, the reverse exit. They're not actually new
-            if _exit.name == source_exit.name or (self.coupled and _exit.name == target_entrance.name):
-                continue
-            # technically this should be is_valid_source_transition, but that may rely on side effects from
-            # on_connect, which have not happened here (because we didn't do a real connection, and if we did, we would
-            # not want them to persist). can_reach is a close enough approximation most of the time.
-            if _exit.can_reach(copied_state):
-                return True
-        return False
+        unswept_advancements = self._get_unswept_advancements()
+        # simulated connection, which is rolled back afterward. A real connection is unsafe because it would have to be
+        # undone in the region graph as well. Only the containers of the players touched by the test get copied.
+        with self.collection_state.rollback(unswept_advancements) as speculative_state:
+            mutable_container(speculative_state.reachable_regions, self.world.player).add(
+                target_entrance.connected_region)
+            blocked_connections = mutable_container(speculative_state.blocked_connections, self.world.player)
+            blocked_connections.remove(source_exit)
+            blocked_connections.update(target_entrance.connected_region.exits)
+            speculative_state.update_reachable_regions(self.world.player)
+            speculative_state.sweep_for_advancements(unswept_advancements)
+            # test that at there are newly reachable randomized exits that are ACTUALLY reachable
+            available_randomized_exits = speculative_state.blocked_connections[self.world.player]
+            for _exit in available_randomized_exits:
+                if _exit.connected_region:
+                    continue
+                # ignore the source exit, and, if coupled, the reverse exit. They're not actually new
+                if _exit.name == source_exit.name or (self.coupled and _exit.name == target_entrance.name):
+                    continue
+                # technically this should be is_valid_source_transition, but that may rely on side effects from
+                # on_connect, which have not happened here (because we didn't do a real connection, and if we did, we
+                # would not want them to persist). can_reach is a close enough approximation most of the time.
+                if _exit.can_reach(speculative_state):
+                    return True
+            return False
 
     def connect(
             self,
@@ -333,9 +357,11 @@ def randomize_entrances(
             entrance_lookup.remove(entrance)
         # propagate new connections
         er_state.collection_state.update_reachable_regions(world.player)
-        er_state.collection_state.sweep_for_advancements()
+        er_state.sweep_for_advancements()
         if on_connect:
             on_connect(er_state, placed_exits)
+            # the callback may have placed new advancements
+            er_state._unswept_advancements = None
 
     def find_pairing(dead_end: bool, require_new_exits: bool) -> bool:
         nonlocal perform_validity_check
@@ -0,0 +1,140 @@
+def run_generation_benchmark():
+    """Generate large multiworlds with fixed seeds and time each phase of generation.
+    Results are written as JSON, so they can be compared between commits."""
+    import argparse
+    import collections
+    import contextlib
+    import json
+    import logging
+    import os
+    import platform
+    import sys
+    import tempfile
+    import time
+    import typing
+    from unittest import mock
+
+    from time_it import TimeIt
+
+    from Utils import __version__, dump, init_logging
+
+    init_logging("Benchmark Runner")
+    logger = logging.getLogger("Benchmark")
+
+    parser = argparse.ArgumentParser(description="Times the phases of generating a multiworld.")
+    parser.add_argument("--players", type=int, default=100,
+                        help="Number of players, not counting SlotLock players.")
+    parser.add_argument("--games", default="Clique,ChecksFinder,Hollow Knight,Timespinner,Rogue Legacy",
+                        help="Comma separated games, assigned to the players in turn.")
+    parser.add_argument("--slotlock", type=int, default=0,
+                        help="Number of SlotLock players, which together lock a share of the other players.")
+    parser.add_argument("--locked_share", type=float, default=0.8,
+                        help="Share of the other players locked by the SlotLock players.")
+    parser.add_argument("--item_links", action="store_true",
+                        help="Link the whole item pool of all players of each game.")
+    parser.add_argument("--seeds", default="1",
+                        help="Comma separated seeds, each is generated once.")
+    parser.add_argument("--spoiler", type=int, default=1)
+    parser.add_argument("--stage_processes", type=int, default=0,
+                        help="Number of processes for the generation stages of worlds that support it.")
+    parser.add_argument("--output", default="",
+                        help="File to write the JSON results to, prints them if empty.")
+    args = parser.parse_args()
+
+    games = args.games.split(",")
+
+    def player_files() -> typing.List[typing.Dict[str, typing.Any]]:
+        players = [{"name": f"Player{player}", "game": games[player % len(games)]}
+                   for player in range(args.players)]
+        for player in players:
+            player[player["game"]] = {}
+            if args.item_links and sum(other["game"] == player["game"] for other in players) > 1:
+                player[player["game"]]["item_links"] = [{"name": f"{player['game']} Link",
+                                                         "item_pool": ["Everything"],
+                                                         "replacement_item": None}]
+
+        locked = [player["name"] for player in players[:int(len(players) * args.locked_share)]]
+        for slotlock_player in range(args.slotlock):
+            players.append({"name": f"Locker{slotlock_player}", "game": "SlotLock", "SlotLock": {
+                "slots_whitelist": True,
+                "slots_to_lock": locked[slotlock_player::args.slotlock],
+            }})
+        return players
+
+    class PhaseTimer:
+        # everything after these phases is output, during which spheres and accessibility are calculated in threads
+        last_phases_before_output = ("stage post_fill", "progression balancing")
+
+        def __init__(self):
+            self.times: typing.Dict[str, float] = collections.Counter()
+            self.output_start: float = 0
+
+        def wrap(self, phase: str, function: typing.Callable) -> typing.Callable:
+            def timed(*func_args, **func_kwargs):
+                start = time.perf_counter()
+                try:
+                    return function(*func_args, **func_kwargs)
+                finally:
+                    end = time.perf_counter()
+                    self.times[phase] += end - start
+                    if phase in self.last_phases_before_output:
+                        self.output_start = end
+            return timed
+
+        def wrap_call_all(self, call_all: typing.Callable) -> typing.Callable:
+            def timed(multiworld, method_name: str, *func_args, **func_kwargs):
+                return self.wrap(f"stage {method_name}", call_all)(multiworld, method_name, *func_args,
+                                                                   **func_kwargs)
+            return timed
+
+    def generate(seed: int, player_files_path: str, output_path: str) -> typing.Dict[str, float]:
+        import Generate
+        import Main
+        from worlds import AutoWorld
+
+        timer = PhaseTimer()
+        sys.argv = [sys.argv[0], "--seed", str(seed), "--player_files_path", player_files_path,
+                    "--outputpath", output_path, "--spoiler", str(args.spoiler),
+                    "--stage_processes", str(args.stage_processes)]
+        with TimeIt("option rolling", logger) as rolling:
+            erargs, seed = Generate.main()
+
+        with contextlib.ExitStack() as patches:
+            patches.enter_context(mock.patch.object(AutoWorld, "call_all", timer.wrap_call_all(AutoWorld.call_all)))
+            patches.enter_context(mock.patch.object(Main, "distribute_items_restrictive",
+                                                    timer.wrap("fill", Main.distribute_items_restrictive)))
+            patches.enter_context(mock.patch.object(Main, "balance_multiworld_progression",
+                                                    timer.wrap("progression balancing",
+                                                               Main.balance_multiworld_progression)))
+            patches.enter_context(mock.patch.object(Main, "SphereSweep", timer.wrap("spheres", Main.SphereSweep)))
+            with TimeIt("generation", logger) as generation:
+                Main.main(erargs, seed)
+
+        return {"option rolling": rolling.dif, **timer.times, "output": generation.end_timer - timer.output_start,
+                "total": rolling.dif + generation.dif}
+
+    results = []
+    for seed in (int(seed) for seed in args.seeds.split(",")):
+        with tempfile.TemporaryDirectory() as player_files_path, tempfile.TemporaryDirectory() as output_path:
+            for index, player_file in enumerate(player_files()):
+                with open(os.path.join(player_files_path, f"{index:05}.yaml"), "w") as f:
+                    f.write(dump(player_file))
+            results.append({"seed": seed, "phases": generate(seed, player_files_path, output_path)})
+
+    report = json.dumps({
+        "version": __version__,
+        "python": platform.python_version(),
+        "config": vars(args),
+        "results": results,
+    }, indent=4)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report)
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    from path_change import change_home
+    change_home()
+    run_generation_benchmark()
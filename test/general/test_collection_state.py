@@ -0,0 +1,202 @@
+import typing
+import unittest
+
+from BaseClasses import CollectionState, Item, ItemClassification, Location, Region, mutable_container
+from . import generate_items, generate_locations, generate_test_multiworld
+
+
+class TestSweep(unittest.TestCase):
+    def test_sweep_chains_across_players(self) -> None:
+        """Tests that a sweep follows advancements that are only unlocked by other players' items"""
+        multiworld = generate_test_multiworld(3)
+        locations = [generate_locations(2, player, multiworld.get_region("Menu", player))
+                     for player in multiworld.player_ids]
+        items = [generate_items(2, player, True) for player in multiworld.player_ids]
+        for player_locations, player_items in zip(locations, items):
+            for location, item in zip(player_locations, player_items):
+                multiworld.push_item(location, item, False)
+        # player 1 -> player 2 -> player 3 -> player 1, every step gated behind the previous step's item
+        chain = [(2, 0), (3, 0), (1, 1), (2, 1), (3, 1)]
+        previous_player, previous_index = 1, 0
+        for player, index in chain:
+            previous_item = items[previous_player - 1][previous_index]
+            locations[player - 1][index].access_rule = \
+                lambda state, item=previous_item: state.has(item.name, item.player)
+            previous_player, previous_index = player, index
+
+        state = CollectionState(multiworld)
+        state.sweep_for_advancements()
+        self.assertEqual(state.advancements, {location for player_locations in locations
+                                              for location in player_locations})
+        for player, player_items in enumerate(items, 1):
+            for item in player_items:
+                self.assertTrue(state.has(item.name, player))
+
+    def test_sweep_rule_without_stale(self) -> None:
+        """Tests that a rule depending on another player's items is re-checked even if nothing marks it stale"""
+        multiworld = generate_test_multiworld(2)
+        location_1, = generate_locations(1, 1, multiworld.get_region("Menu", 1))
+        location_2, = generate_locations(1, 2, multiworld.get_region("Menu", 2))
+        item_1, = generate_items(1, 1, True)
+        item_2, = generate_items(1, 2, True)
+        multiworld.push_item(location_1, item_1, False)
+        multiworld.push_item(location_2, item_2, False)
+        # player 2's location is checked first and is only reachable after player 1's item is collected
+        location_2.access_rule = lambda state: state.has(item_1.name, 1)
+        location_1.access_rule = lambda state: state.can_reach(multiworld.get_region("Menu", 2))
+
+        state = CollectionState(multiworld)
+        state.sweep_for_advancements([location_2, location_1])
+        self.assertEqual(state.advancements, {location_1, location_2})
+
+    def test_sweep_ignores_duplicates(self) -> None:
+        """Tests that passing the same location twice only collects its item once"""
+        multiworld = generate_test_multiworld()
+        location, = generate_locations(1, 1, multiworld.get_region("Menu", 1))
+        item, = generate_items(1, 1, True)
+        multiworld.push_item(location, item, False)
+
+        state = CollectionState(multiworld)
+        state.sweep_for_advancements([location, location])
+        self.assertEqual(state.count(item.name, 1), 1)
+        self.assertEqual(state.advancements, {location})
+
+
+class TestCopy(unittest.TestCase):
+    def test_copy_is_independent(self) -> None:
+        """Tests that changes to a copy and to its source don't leak into each other"""
+        multiworld = generate_test_multiworld(2)
+        item_1, item_2 = generate_items(2, 1, True)
+        state = CollectionState(multiworld)
+        state.collect(item_1, True)
+        state.update_reachable_regions(1)
+
+        copy = state.copy()
+        copy.collect(item_2, True)
+        self.assertFalse(state.has(item_2.name, 1))
+        state.remove(item_1)
+        self.assertTrue(copy.has(item_1.name, 1))
+        self.assertFalse(state.has(item_1.name, 1))
+
+        second_copy = copy.copy()
+        mutable_container(second_copy.reachable_regions, 1).clear()
+        self.assertEqual(copy.reachable_regions[1], {multiworld.get_region("Menu", 1)})
+        self.assertEqual(set(second_copy.prog_items), set(multiworld.get_all_ids()))
+        self.assertEqual(second_copy.prog_items, copy.prog_items)
+
+    def test_read_only_copy(self) -> None:
+        """Tests that reading from a copy doesn't copy any containers, and that changing it copies only the changed"""
+        multiworld = generate_test_multiworld(3)
+        location, = generate_locations(1, 1, multiworld.get_region("Menu", 1))
+        item_1, item_2 = generate_items(2, 1, True)
+        state = CollectionState(multiworld)
+        state.collect(item_1, True)
+        for player in multiworld.player_ids:
+            state.update_reachable_regions(player)
+
+        def shared_players(copy: CollectionState) -> typing.Dict[str, typing.Set[int]]:
+            return {attribute: {player for player in multiworld.player_ids
+                                if getattr(copy, attribute)[player] is getattr(state, attribute)[player]}
+                    for attribute in ("prog_items", "reachable_regions", "blocked_connections")}
+
+        copy = state.copy()
+        self.assertTrue(copy.has(item_1.name, 1))
+        self.assertTrue(location.can_reach(copy))
+        for player in multiworld.player_ids:
+            self.assertTrue(copy.can_reach("Menu", "Region", player))
+        self.assertEqual(shared_players(copy), dict.fromkeys(("prog_items", "reachable_regions",
+                                                              "blocked_connections"), {1, 2, 3}))
+
+        copy.collect(item_2, True)
+        self.assertEqual(shared_players(copy)["prog_items"], {2, 3})
+        self.assertFalse(state.has(item_2.name, 1))
+
+    def test_copy_generations(self) -> None:
+        """Tests that each of many successive copies keeps the items collected up to it"""
+        multiworld = generate_test_multiworld(4)
+        items = [item for player in multiworld.player_ids for item in generate_items(10, player, True)]
+        states = [CollectionState(multiworld)]
+        for item in items:
+            state = states[-1].copy()
+            state.collect(item, True)
+            states.append(state)
+        for collected, state in enumerate(states):
+            for index, item in enumerate(items):
+                self.assertEqual(state.count(item.name, item.player), index < collected)
+
+    def test_copy_replaced_container(self) -> None:
+        """Tests that a copy of a state whose per-player dict was replaced doesn't share its containers"""
+        multiworld = generate_test_multiworld()
+        state = CollectionState(multiworld)
+        state.reachable_regions = {player: set() for player in multiworld.get_all_ids()}
+        copy = state.copy()
+        mutable_container(state.reachable_regions, 1).add(multiworld.get_region("Menu", 1))
+        self.assertEqual(copy.reachable_regions[1], set())
+
+
+class TestRollback(unittest.TestCase):
+    def test_rollback(self) -> None:
+        """Tests that everything collected and reached within a rollback is undone afterward"""
+        multiworld = generate_test_multiworld(2)
+        locked_region = Region("Locked", 1, multiworld)
+        multiworld.regions.append(locked_region)
+        key = Item("Key", ItemClassification.progression, None, 1)
+        multiworld.get_region("Menu", 1).connect(locked_region, rule=lambda state: state.has("Key", 1))
+        locations = generate_locations(2, 1, locked_region)
+        for location, item in zip(locations, generate_items(2, 1, True)):
+            multiworld.push_item(location, item, False)
+
+        state = CollectionState(multiworld)
+        state.update_reachable_regions(1)
+        state.update_reachable_regions(2)
+        expected = state.copy()
+        with state.rollback(locations) as speculative_state:
+            self.assertIs(speculative_state, state)
+            state.collect(key, True)
+            state.sweep_for_advancements(locations)
+            self.assertEqual(state.advancements, set(locations))
+            self.assertIn(locked_region, state.path)
+
+        for attribute in ("prog_items", "reachable_regions", "blocked_connections",
+                          "advancements", "locations_checked", "path"):
+            self.assertEqual(getattr(state, attribute), getattr(expected, attribute), attribute)
+        self.assertFalse(locked_region.can_reach(state))
+        state.collect(key, True)
+        self.assertTrue(locked_region.can_reach(state))
+
+
+class TestWorldGate(unittest.TestCase):
+    def test_gate_opens_and_closes(self) -> None:
+        """Tests that a gated world has no reachable regions until the unlock is collected, and loses them on remove"""
+        multiworld = generate_test_multiworld(2)
+        unlock, = generate_items(1, 1, True, 1)
+        multiworld.worlds[1].item_name_to_id = {unlock.name: unlock.code}
+        multiworld.add_world_gate(2, unlock.name, 1)
+        gated_region = multiworld.get_region("Menu", 2)
+
+        state = CollectionState(multiworld)
+        self.assertFalse(gated_region.can_reach(state))
+        self.assertTrue(multiworld.get_region("Menu", 1).can_reach(state))
+        state.collect(unlock, True)
+        self.assertTrue(gated_region.can_reach(state))
+        state.remove(unlock)
+        self.assertFalse(gated_region.can_reach(state))
+        self.assertEqual(state.reachable_regions[2], set())
+
+    def test_sweep_through_gate(self) -> None:
+        """Tests that a sweep reaches a gated world's advancements once the unlock is found in another world"""
+        multiworld = generate_test_multiworld(2)
+        unlock, = generate_items(1, 1, True, 1)
+        multiworld.worlds[1].item_name_to_id = {unlock.name: unlock.code}
+        multiworld.add_world_gate(2, unlock.name, 1)
+        gated_location, = generate_locations(1, 2, multiworld.get_region("Menu", 2))
+        unlock_location, = generate_locations(1, 1, multiworld.get_region("Menu", 1))
+        gated_item, = generate_items(1, 2, True)
+        multiworld.push_item(gated_location, gated_item, False)
+        multiworld.push_item(unlock_location, unlock, False)
+
+        state = CollectionState(multiworld)
+        state.sweep_for_advancements([gated_location])
+        self.assertEqual(state.advancements, set())
+        state.sweep_for_advancements()
+        self.assertEqual(state.advancements, {gated_location, unlock_location})
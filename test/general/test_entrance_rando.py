@@ -385,3 +385,24 @@ class TestRandomizeEntrances(unittest.TestCase):
 
         self.assertRaises(EntranceRandomizationError, randomize_entrances, multiworld.worlds[1], False,
                           directionally_matched_group_lookup)
+
+    def test_speculative_connection_is_rolled_back(self):
+        """tests that testing a connection reaches past it without changing the real collection state"""
+        multiworld = generate_test_multiworld()
+        generate_disconnected_region_grid(multiworld, 3, 1)
+        event_location = multiworld.get_region("region4", 1).locations[0]
+        event, = generate_items(1, 1, True)
+        multiworld.push_item(event_location, event, False)
+        er_state = ERPlacementState(multiworld.worlds[1], False)
+        er_state.collection_state.update_reachable_regions(1)
+        expected = er_state.collection_state.copy()
+
+        source_exit = multiworld.get_entrance("region0_right", 1)
+        target_entrance = next(entrance for entrance in multiworld.get_region("region4", 1).entrances
+                               if entrance.name == "region4_left")
+        self.assertTrue(er_state.test_speculative_connection(source_exit, target_entrance))
+
+        for attribute in ("prog_items", "reachable_regions", "blocked_connections",
+                          "advancements", "locations_checked", "path"):
+            self.assertEqual(getattr(er_state.collection_state, attribute), getattr(expected, attribute), attribute)
+        self.assertFalse(er_state.collection_state.has(event.name, 1))
@@ -4,7 +4,7 @@ import unittest
 from Options import Accessibility
 from test.general import generate_items, generate_locations, generate_test_multiworld
 from Fill import FillError, balance_multiworld_progression, fill_restrictive, \
-    distribute_early_items, distribute_items_restrictive
+    distribute_early_items, distribute_items_restrictive, swap_location_item
 from BaseClasses import Entrance, LocationProgressType, MultiWorld, Region, Item, Location, \
     ItemClassification
 from worlds.generic.Rules import CollectionRule, add_item_rule, locality_rules, set_rule
@@ -66,6 +66,17 @@ def region_contains(region: Region, item: Item) -> bool:
     return False
 
 
+def assert_item_index_consistent(test: unittest.TestCase, multiworld: MultiWorld) -> None:
+    """Compares the multiworld's item lookups against a scan of all locations"""
+    for item in {(location.item.name, location.item.player) for location in multiworld.get_filled_locations()}:
+        expected = [location for location in multiworld.get_locations()
+                    if location.item and (location.item.name, location.item.player) == item]
+        test.assertEqual(multiworld.find_item_locations(*item), expected)
+        test.assertIs(multiworld.find_item(*item), expected[0])
+    test.assertFalse([location for locations in multiworld.regions.item_location_cache.values()
+                      for location in locations if not location.item])
+
+
 def generate_player_data(multiworld: MultiWorld, player_id: int, location_count: int = 0, prog_item_count: int = 0, basic_item_count: int = 0) -> PlayerDefinition:
     menu = multiworld.get_region("Menu", player_id)
     locations = generate_locations(location_count, player_id, menu, None)
@@ -391,6 +402,7 @@ class TestFillRestrictive(unittest.TestCase):
         # assert swap happened
         self.assertTrue(sphere1_loc.item, "Did not swap required item into Sphere 1")
         self.assertEqual(sphere1_loc.item, allowed_item, "Wrong item in Sphere 1")
+        assert_item_index_consistent(self, multiworld)
 
     def test_swap_to_earlier_location_with_item_rule2(self):
         """Test that swap works before all items are placed"""
@@ -433,6 +445,30 @@ class TestFillRestrictive(unittest.TestCase):
         self.assertTrue(sphere1_loc1.item.name == one_to_two1 or
                         sphere1_loc2.item.name == one_to_two1, "Wrong item in Sphere 1")
 
+    def test_item_index(self):
+        """Tests that the item lookups follow placements, swaps and removals"""
+        multiworld = generate_test_multiworld(2)
+        player1 = generate_player_data(multiworld, 1, 3, 2, 1)
+        player2 = generate_player_data(multiworld, 2, 2, 1, 1)
+        locations = player1.locations + player2.locations
+        fill_restrictive(multiworld, multiworld.state, locations[:], multiworld.itempool[:])
+        assert_item_index_consistent(self, multiworld)
+
+        swap_location_item(locations[0], locations[4])
+        assert_item_index_consistent(self, multiworld)
+        item = locations[1].item
+        locations[1].item = None
+        self.assertEqual(multiworld.find_item_locations(item.name, item.player), [])
+        with self.assertRaises(StopIteration):
+            multiworld.find_item(item.name, item.player)
+        locations[1].item = item
+        self.assertEqual(multiworld.find_item_locations(item.name, item.player), [locations[1]])
+
+        player1.menu.locations.remove(locations[1])
+        self.assertEqual(multiworld.find_item_locations(item.name, item.player), [])
+        player1.menu.locations.append(locations[1])
+        assert_item_index_consistent(self, multiworld)
+
     def test_double_sweep(self):
         """Test that sweep doesn't duplicate Event items when sweeping"""
         # test for PR1114
@@ -805,6 +841,7 @@ class TestBalanceMultiworldProgression(unittest.TestCase):
 
         self.assertRegionContains(
             self.player1.regions[1], self.player2.prog_items[0])
+        assert_item_index_consistent(self, self.multiworld)
 
     def test_balances_progression_light(self) -> None:
         """Test that progression balancing still moves items earlier on minimum value"""
@@ -0,0 +1,94 @@
+import os
+import tempfile
+import unittest
+from typing import ClassVar
+
+import bsdiff4
+
+from worlds.Files import APPatchExtension, APProcedurePatch, APTokenMixin, APTokenTypes, InvalidDataError
+
+
+class TokenPatch(APProcedurePatch, APTokenMixin):
+    hash = None
+    procedure = [("apply_tokens", ["token_data.bin"]), ("calc_snes_crc", [])]
+    source: ClassVar[bytearray] = bytearray(range(256)) * 0x100
+
+    @classmethod
+    def get_source_data(cls) -> bytearray:
+        return cls.source
+
+
+class TokenDeltaPatch(TokenPatch):
+    procedure = [("apply_tokens", ["token_data.bin"]), ("apply_bsdiff4", ["delta.bsdiff4"])]
+
+
+class OutdatedTokenPatch(TokenPatch):
+    version = 5
+
+
+class TestProcedurePatch(unittest.TestCase):
+    def setUp(self) -> None:
+        self.patch = TokenPatch(player=1, player_name="Tester1")
+        self.patch.write_token(APTokenTypes.WRITE, 0x10, b"\x01\x02\x03")
+        self.patch.write_token(APTokenTypes.COPY, 0x20, (4, 0x10))
+        self.patch.write_token(APTokenTypes.RLE, 0x30, (5, 0xAA))
+        self.patch.write_token(APTokenTypes.AND_8, 0x40, 0x0F)
+        self.patch.write_token(APTokenTypes.OR_8, 0x41, 0xF0)
+        self.patch.write_token(APTokenTypes.XOR_8, 0x42, 0xFF)
+        self.patch.write_file("token_data.bin", self.patch.get_token_binary())
+
+        self.expected = bytearray(TokenPatch.source)
+        self.expected[0x10:0x13] = b"\x01\x02\x03"
+        self.expected[0x20:0x24] = self.expected[0x10:0x14]
+        self.expected[0x30:0x35] = b"\xAA" * 5
+        self.expected[0x40] &= 0x0F
+        self.expected[0x41] |= 0xF0
+        self.expected[0x42] ^= 0xFF
+
+    def test_apply_tokens(self) -> None:
+        """Tests that tokens are applied in order, changing a bytearray in place"""
+        self.assertEqual(APPatchExtension.apply_tokens(self.patch, bytes(TokenPatch.source), "token_data.bin"),
+                         self.expected)
+        rom = bytearray(TokenPatch.source)
+        self.assertIs(APPatchExtension.apply_tokens(self.patch, rom, "token_data.bin"), rom)
+        self.assertEqual(rom, self.expected)
+
+    def test_calc_snes_crc(self) -> None:
+        """Tests that the header checksum and its complement add up"""
+        rom = APPatchExtension.calc_snes_crc(self.patch, bytes(self.expected))
+        inv = int.from_bytes(rom[0x7FDC:0x7FDE], "little")
+        crc = int.from_bytes(rom[0x7FDE:0x7FE0], "little")
+        self.assertEqual(inv ^ crc, 0xFFFF)
+        self.assertEqual(crc, sum(rom) & 0xFFFF)
+
+    def test_patch(self) -> None:
+        """Tests that patching a written container produces the result without changing the cached source data"""
+        source = bytes(TokenPatch.source)
+        with tempfile.TemporaryDirectory() as tempdir:
+            self.patch.write(os.path.join(tempdir, "patch.zip"))
+            read_patch = TokenPatch(os.path.join(tempdir, "patch.zip"))
+            read_patch.patch(os.path.join(tempdir, "result.sfc"))
+            with open(os.path.join(tempdir, "result.sfc"), "rb") as f:
+                result = f.read()
+
+            unread_patch = TokenPatch(os.path.join(tempdir, "patch.zip"))
+            self.assertEqual(unread_patch.get_file("token_data.bin"), self.patch.get_token_binary())
+            with self.assertRaises(KeyError):
+                unread_patch.get_file("missing.bin")
+            with self.assertRaises(InvalidDataError):
+                OutdatedTokenPatch(os.path.join(tempdir, "patch.zip")).get_file("token_data.bin")
+
+        self.assertEqual(result, APPatchExtension.calc_snes_crc(self.patch, self.expected))
+        self.assertEqual(TokenPatch.source, source)
+
+    def test_tokens_then_bsdiff4(self) -> None:
+        """Tests that a bsdiff4 can be applied after a step that returned a bytearray"""
+        target = bytes(reversed(self.expected))
+        delta_patch = TokenDeltaPatch(player=1, player_name="Tester1")
+        delta_patch.write_file("token_data.bin", self.patch.get_token_binary())
+        delta_patch.write_file("delta.bsdiff4", bsdiff4.diff(bytes(self.expected), target))
+        with tempfile.TemporaryDirectory() as tempdir:
+            delta_patch.write(os.path.join(tempdir, "patch.zip"))
+            TokenDeltaPatch(os.path.join(tempdir, "patch.zip")).patch(os.path.join(tempdir, "result.sfc"))
+            with open(os.path.join(tempdir, "result.sfc"), "rb") as f:
+                self.assertEqual(f.read(), target)
@@ -0,0 +1,54 @@
+import unittest
+from unittest import mock
+
+from BaseClasses import Item, ItemClassification, MultiWorld, Spoiler
+from . import generate_locations, generate_test_multiworld
+
+
+class TestPlaythrough(unittest.TestCase):
+    multiworld: MultiWorld
+
+    def setUp(self) -> None:
+        self.multiworld = generate_test_multiworld()
+        self.locations = generate_locations(8, 1, self.multiworld.get_region("Menu", 1), 1)
+        self.items = {name: Item(name, ItemClassification.progression, 1, 1)
+                      for name in ("Key", "Sword", "Bow", "Shield", "Lamp", "Boots", "Map", "Goal")}
+        for location, item in zip(self.locations, self.items.values()):
+            self.multiworld.push_item(location, item, False)
+        self.multiworld.push_precollected(Item("Start", ItemClassification.progression, 1, 1))
+        self.multiworld.push_precollected(Item("Spare", ItemClassification.progression, 1, 1))
+        # Bow and Map are not required, Sword opens the way to the Goal both directly and through the Shield
+        key, sword, bow, shield, lamp, boots, map_, goal = self.locations
+        key.access_rule = lambda state: state.has("Start", 1)
+        sword.access_rule = lambda state: state.has("Key", 1)
+        bow.access_rule = lambda state: state.has("Key", 1)
+        shield.access_rule = lambda state: state.has("Sword", 1)
+        lamp.access_rule = lambda state: state.has("Shield", 1)
+        boots.access_rule = lambda state: state.has("Lamp", 1)
+        goal.access_rule = lambda state: state.has_any(("Sword", "Bow"), 1) and state.has("Boots", 1)
+        self.multiworld.completion_condition[1] = lambda state: state.has("Goal", 1)
+
+    def test_playthrough(self) -> None:
+        """Tests that the playthrough only keeps what's required, and the multiworld is restored afterwards"""
+        spoiler = Spoiler(self.multiworld)
+        spoiler.create_playthrough(create_paths=False)
+
+        self.assertEqual(spoiler.playthrough["0"], [self.multiworld.get_name_string_for_object(
+            self.multiworld.precollected_items[1][0])])
+        playthrough_items = [list(sphere.values()) for num, sphere in spoiler.playthrough.items() if num != "0"]
+        self.assertEqual(playthrough_items, [[str(self.items[name])]
+                                             for name in ("Key", "Sword", "Shield", "Lamp", "Boots", "Goal")])
+
+        self.assertEqual([location.item for location in self.locations], list(self.items.values()))
+        self.assertEqual({item.name for item in self.multiworld.precollected_items[1]}, {"Start", "Spare"})
+
+    def test_state_checkpoints(self) -> None:
+        """Tests that states rebuilt from fewer checkpoints give the same playthrough"""
+        spoiler = Spoiler(self.multiworld)
+        spoiler.create_playthrough(create_paths=False)
+        for max_state_checkpoints in (0, 1, 2):
+            with self.subTest(max_state_checkpoints=max_state_checkpoints), \
+                    mock.patch.object(Spoiler, "max_state_checkpoints", max_state_checkpoints):
+                checkpoint_spoiler = Spoiler(self.multiworld)
+                checkpoint_spoiler.create_playthrough(create_paths=False)
+                self.assertEqual(checkpoint_spoiler.playthrough, spoiler.playthrough)
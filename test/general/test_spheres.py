@@ -0,0 +1,59 @@
+import unittest
+
+from BaseClasses import Item, ItemClassification, MultiWorld, SphereSweep
+from . import generate_items, generate_locations, generate_test_multiworld
+
+
+class TestSphereSweep(unittest.TestCase):
+    multiworld: MultiWorld
+
+    def setUp(self) -> None:
+        self.multiworld = generate_test_multiworld(2)
+        menu_1 = self.multiworld.get_region("Menu", 1)
+        menu_2 = self.multiworld.get_region("Menu", 2)
+        self.locations = generate_locations(3, 1, menu_1, 1) + generate_locations(2, 2, menu_2, 1)
+        items = generate_items(3, 2, True, 1) + generate_items(2, 1, True, 1)
+        for location, item in zip(self.locations, items):
+            self.multiworld.push_item(location, item, False)
+        # an event of player 2 unlocks its second location, behind the first item of player 2
+        event_location, = generate_locations(1, 2, menu_2, tag="_event")
+        self.multiworld.push_item(event_location, Item("Event", ItemClassification.progression, None, 2), False)
+        event_location.access_rule = lambda state: state.has(items[0].name, 2)
+        self.locations[4].access_rule = lambda state: state.has("Event", 2)
+        self.locations[1].access_rule = lambda state: state.has(items[4].name, 1)
+        for player in self.multiworld.player_ids:
+            self.multiworld.completion_condition[player] = lambda state, player=player: state.has("Event", 2)
+
+    def assert_matches_multiworld(self) -> None:
+        sweep = SphereSweep(self.multiworld)
+        self.assertEqual(sweep.sendable_spheres, list(self.multiworld.get_sendable_spheres()))
+        self.assertEqual(sweep.fulfills_accessibility(), self.multiworld.fulfills_accessibility())
+        self.assertEqual(sweep.can_beat_game(), self.multiworld.can_beat_game())
+
+    def test_reachable(self) -> None:
+        """Tests that the sweep collects everything and agrees with the multiworld's own checks"""
+        sweep = SphereSweep(self.multiworld)
+        self.assertEqual(sweep.sendable_spheres, [{self.locations[0], self.locations[2], self.locations[3]},
+                                                  {self.locations[4]}, {self.locations[1]}])
+        self.assertFalse(sweep.unreachable)
+        self.assertTrue(sweep.fulfills_accessibility())
+        self.assertTrue(sweep.can_beat_game())
+        self.assert_matches_multiworld()
+
+    def test_unreachable(self) -> None:
+        """Tests that unreachable locations are reported and fail the accessibility check"""
+        self.locations[1].access_rule = lambda state: False
+        sweep = SphereSweep(self.multiworld)
+        self.assertEqual(sweep.sendable_spheres[-2:], [set(), {self.locations[1]}])
+        self.assertEqual(sweep.unreachable, {self.locations[1]})
+        with self.assertLogs(level="WARNING"):
+            self.assertFalse(sweep.fulfills_accessibility())
+        self.assertTrue(sweep.can_beat_game())
+        with self.assertLogs(level="WARNING"):
+            self.assert_matches_multiworld()
+
+    def test_unbeatable(self) -> None:
+        """Tests that the sweep can't beat the game when its completion condition is unreachable"""
+        self.multiworld.completion_condition[1] = lambda state: False
+        self.assertFalse(SphereSweep(self.multiworld).can_beat_game())
+        self.assert_matches_multiworld()
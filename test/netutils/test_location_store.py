@@ -111,6 +111,9 @@ class Base:
                              [(4, 9, 99, 3, 0), (5, 9, 99, 5, 0)])
             self.assertEqual(sorted(self.store.find_item(set(range(2048)), 13)),
                              [(1, 13, 13, 1, 0)])
+            # receiver with several different items
+            self.assertEqual(sorted(self.store.find_item({1}, 12)), [(2, 22, 12, 1, 0)])
+            self.assertEqual(sorted(self.store.find_item({1}, 11)), [(2, 23, 11, 1, 0)])
 
         def test_get_for_player(self) -> None:
             self.assertEqual(self.store.get_for_player(3), {4: {9}})
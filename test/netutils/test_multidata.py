@@ -0,0 +1,69 @@
+# Tests for the multidata container format in NetUtils
+import mmap
+import pickle
+import tempfile
+import unittest
+import zlib
+
+from NetUtils import NetworkSlot, SlotType, decode_multidata, encode_multidata, replace_multidata_sections
+from Utils import VersionException
+
+sample_multidata = {
+    "slot_data": {1: {"option": 1}},
+    "slot_info": {1: NetworkSlot("Player1", "Archipelago", SlotType.player)},
+    "locations": {1: {100: (200, 1, 0)}},
+    "checks_in_area": {},
+    "er_hint_data": {1: {100: "Entrance"}},
+    "precollected_hints": {1: set()},
+    "spheres": [{1: {100}}],
+    "datapackage": {"Archipelago": {"checksum": "abc"}},
+    "seed_name": "12345",
+    "custom_key": [1, 2, 3],
+}
+
+
+class TestMultidataFormat(unittest.TestCase):
+    def test_round_trip(self) -> None:
+        """Tests that decoding everything returns the encoded multidata"""
+        self.assertEqual(decode_multidata(encode_multidata(sample_multidata)), sample_multidata)
+
+    def test_sections(self) -> None:
+        """Tests that only requested sections are decoded, and unknown keys end up in main"""
+        data = encode_multidata(sample_multidata)
+        self.assertEqual(decode_multidata(data, ("main",)).keys(), {"slot_info", "seed_name", "custom_key"})
+        self.assertEqual(decode_multidata(data, ("spheres",)), {"spheres": sample_multidata["spheres"]})
+        self.assertEqual(decode_multidata(data, ("locations", "hints")).keys(),
+                         {"locations", "checks_in_area", "er_hint_data", "precollected_hints"})
+
+    def test_mmap(self) -> None:
+        """Tests that a mapped multidata file can be decoded"""
+        with tempfile.TemporaryFile() as f:
+            f.write(encode_multidata(sample_multidata))
+            f.flush()
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                self.assertEqual(decode_multidata(data, ("main", "slot_data"))["slot_data"],
+                                 sample_multidata["slot_data"])
+
+    def test_replace_sections(self) -> None:
+        """Tests that replacing a section keeps the other sections as they were encoded"""
+        data = encode_multidata(sample_multidata)
+        replaced = replace_multidata_sections(data, {"datapackage": {"datapackage": {"Archipelago": {"checksum": "d"}}}})
+        self.assertEqual(decode_multidata(replaced),
+                         {**sample_multidata, "datapackage": {"Archipelago": {"checksum": "d"}}})
+        self.assertIn(zlib.compress(pickle.dumps({"slot_data": sample_multidata["slot_data"]}), 9), replaced)
+
+    def test_replace_sections_version_3(self) -> None:
+        data = bytes([3]) + zlib.compress(pickle.dumps(sample_multidata), 9)
+        with self.assertRaises(VersionException):
+            replace_multidata_sections(data, {"datapackage": {"datapackage": {}}})
+
+    def test_version_3(self) -> None:
+        """Tests that the single blob format is still loaded completely, regardless of requested sections"""
+        data = bytes([3]) + zlib.compress(pickle.dumps(sample_multidata), 9)
+        self.assertEqual(decode_multidata(data, ("main",)), sample_multidata)
+
+    def test_newer_version(self) -> None:
+        data = bytearray(encode_multidata(sample_multidata))
+        data[0] += 1
+        with self.assertRaises(VersionException):
+            decode_multidata(data)
@@ -1,15 +1,20 @@
 # Tests for Generate.py (ArchipelagoGenerate.exe)
 
+import multiprocessing
 import unittest
 import os
 import os.path
 import sys
+import zipfile
 
 from pathlib import Path
 from tempfile import TemporaryDirectory
+from typing import Dict
+from unittest import mock
 
 import Generate
 import Main
+from worlds import AutoWorld
 
 
 class TestGenerateMain(unittest.TestCase):
@@ -137,3 +142,44 @@ class TestGenerateWeights(TestGenerateMain):
                     result, getattr(namespace, option_name)[player].value,
                     "Generated results from weights file did not match expected value."
                 )
+
+
+@unittest.skipUnless("fork" in multiprocessing.get_all_start_methods(), "stage processes are forked")
+class TestGenerateStageProcesses(unittest.TestCase):
+    """Tests that generating with stage processes gives the same output as generating in one process."""
+
+    # with worlds that don't run in stage processes in between, which have to keep their place in the item pool
+    games = ("Clique", "Hollow Knight", "Bumper Stickers", "Starcraft 2", "Timespinner", "Clique", "Timespinner")
+
+    def setUp(self):
+        self.original_argv = sys.argv.copy()
+
+    def tearDown(self):
+        sys.argv = self.original_argv
+
+    def generate(self, stage_processes: int) -> Dict[str, bytes]:
+        with TemporaryDirectory(prefix="AP_players_") as player_files_path, \
+                TemporaryDirectory(prefix="AP_out_") as output_path:
+            for player, game in enumerate(self.games, 1):
+                with open(os.path.join(player_files_path, f"{player}.yaml"), "w") as player_file:
+                    player_file.write(f"name: Player{player}\ngame: {game}\n{game}: {{}}\n")
+            # with this seed, both Timespinner players pick some of the same gates, whose strings the multidata shares
+            sys.argv = [sys.argv[0], "--seed", "3", "--player_files_path", player_files_path,
+                        "--outputpath", output_path, "--spoiler", "2", "--stage_processes", str(stage_processes)]
+            Main.main(*Generate.main())
+            output_file, = Path(output_path).glob("*.zip")
+            with zipfile.ZipFile(output_file) as output_zip:
+                return {name: output_zip.read(name) for name in output_zip.namelist()}
+
+    def test_same_output(self):
+        with mock.patch.object(AutoWorld, "_load_forked_changes", wraps=AutoWorld._load_forked_changes) as load:
+            forked_output = self.generate(2)
+        forked_players = sum(AutoWorld.AutoWorldRegister.world_types[game].generate_stages_in_process
+                             for game in self.games)
+        self.assertTrue(forked_players, "none of the games run in stage processes")
+        self.assertEqual(load.call_count, 5 * forked_players)
+        serial_output = self.generate(0)
+        self.assertEqual(serial_output.keys(), forked_output.keys())
+        for name, content in serial_output.items():
+            # comparing the bytes directly, as a diff of the whole output would take ages
+            self.assertTrue(content == forked_output[name], f"{name} differs when generating with stage processes")
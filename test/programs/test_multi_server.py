@@ -1,5 +1,15 @@
+import os
+import tempfile
+import typing
 import unittest
-from MultiServer import Context, ServerCommandProcessor
+import zlib
+
+import websockets
+from typing_extensions import override
+
+from MultiServer import Client, Context, ServerCommandProcessor, send_items_to
+from NetUtils import Hint, HintStatus, NetworkItem
+from Utils import restricted_loads
 
 
 class TestResolvePlayerName(unittest.TestCase):
@@ -38,3 +48,178 @@ class TestResolvePlayerName(unittest.TestCase):
         assert p.resolve_player("ABC") == (1, 2, "abc"), "case insensitive resolves when 1 match"
         assert p.resolve_player("abcd") == (1, 3, "abCD"), "case insensitive resolves when 1 match"
         assert not p.resolve_player("aB"), "partial name shouldn't resolve to player"
+
+
+class NoGameDataContext(Context):
+    @override
+    def _load_game_data(self) -> None:
+        pass  # not needed here, and game data can only be loaded into one Context per process
+
+
+class TestClientIndex(unittest.TestCase):
+    def test_bounce_targets(self) -> None:
+        """Tests that bounce targets are found through the slot, game and tag indexes, limited to the team"""
+        ctx = NoGameDataContext("", 0, "", "", 0, 0, False)
+        ctx.games = {1: "Game A", 2: "Game B", 3: "Game B"}
+        ctx.game_slots = {"Game A": {1}, "Game B": {2, 3}}
+        ctx.clients = {0: {1: [], 2: [], 3: []}, 1: {1: [], 2: [], 3: []}}
+
+        def connect(team: int, slot: int, tags: typing.List[str]) -> Client:
+            # no messages are sent, so the client doesn't need a socket
+            client = Client(typing.cast(websockets.WebSocketServerProtocol, None), ctx)
+            client.team, client.slot, client.tags = team, slot, tags
+            ctx.add_client(client)
+            return client
+
+        player_1 = connect(0, 1, ["AP"])
+        player_2 = connect(0, 2, ["AP", "DeathLink"])
+        tracker_3 = connect(0, 3, ["Tracker"])
+        other_team = connect(1, 1, ["DeathLink"])
+
+        self.assertEqual(ctx.get_bounce_targets(0, set(), {"DeathLink"}, set()), {player_2})
+        self.assertEqual(ctx.get_bounce_targets(0, {"Game B"}, set(), set()), {player_2, tracker_3})
+        self.assertEqual(ctx.get_bounce_targets(0, {"Game A"}, {"Tracker"}, {2}), {player_1, player_2, tracker_3})
+        self.assertEqual(ctx.get_bounce_targets(1, set(), {"DeathLink"}, set()), {other_team})
+
+        ctx.set_client_tags(player_1, ["AP", "DeathLink"])
+        ctx.remove_client(player_2)
+        self.assertEqual(ctx.get_bounce_targets(0, set(), {"DeathLink"}, set()), {player_1})
+
+
+class TestHintIndex(unittest.TestCase):
+    def test_recheck_location_hints(self) -> None:
+        """Tests that checking a location updates its hints in every concerned slot, and only those"""
+        ctx = NoGameDataContext("", 0, "", "", 0, 0, False)
+        ctx.groups = {3: {1, 2}}
+        group_hint = Hint(3, 1, 100, 5, False)
+        other_hint = Hint(1, 2, 100, 6, False)
+        for slot in (1, 2):
+            ctx.add_hint(0, slot, group_hint)
+            ctx.add_hint(0, slot, other_hint)
+        self.assertEqual(ctx.get_hint(0, 1, 100), group_hint)
+        self.assertIsNone(ctx.get_hint(0, 1, 101))
+
+        ctx.location_checks[0, 1] = {100}
+        changed: typing.Set[typing.Tuple[int, int]] = set()
+        ctx.recheck_location_hints(0, 1, {100}, changed)
+        found_hint = group_hint._replace(found=True, status=HintStatus.HINT_FOUND)
+        self.assertEqual(changed, {(0, 1), (0, 2)})
+        self.assertEqual(ctx.hints[0, 1], {found_hint, other_hint})
+        self.assertEqual(ctx.hints[0, 2], {found_hint, other_hint})
+        self.assertIn(ctx.get_hint(0, 2, 100), (found_hint, other_hint))
+        self.assertEqual(ctx.location_hints[0, 1, 100], {found_hint, other_hint})
+
+
+class TestSaveJournal(unittest.TestCase):
+    @override
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.save_filename = os.path.join(self.directory.name, "test.apsave")
+
+    @override
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def new_context(self) -> NoGameDataContext:
+        ctx = NoGameDataContext("", 0, "", "", 0, 0, False)
+        ctx.save_filename = self.save_filename
+        ctx.saving = True
+        return ctx
+
+    def load_context(self) -> NoGameDataContext:
+        ctx = self.new_context()
+        with open(self.save_filename, "rb") as f:
+            save = restricted_loads(zlib.decompress(f.read()))
+        ctx.save_snapshot_due = False
+        ctx.set_save(save, ctx.read_save_journal())
+        return ctx
+
+    @staticmethod
+    def check(ctx: Context, location: int) -> None:
+        ctx.location_checks[0, 1].add(location)
+        ctx.unsaved_location_checks[0, 1].add(location)
+        send_items_to(ctx, 0, 2, NetworkItem(location, location, 1, 0))
+
+    def assertSameSave(self, first: Context, second: Context) -> None:
+        for attribute in ("location_checks", "received_items", "stored_data", "hints_used", "name_aliases",
+                          "client_game_state"):
+            self.assertEqual(getattr(first, attribute), getattr(second, attribute), attribute)
+
+    def test_journal_replay(self) -> None:
+        """Tests that changes after the snapshot are appended to the journal and restored from it"""
+        ctx = self.new_context()
+        self.check(ctx, 1)
+        self.assertTrue(ctx.save(now=True))
+        snapshot_size = os.path.getsize(self.save_filename)
+        self.assertEqual(os.path.getsize(ctx.save_journal_filename), 0)
+
+        self.check(ctx, 2)
+        self.assertTrue(ctx.save(now=True))
+        self.check(ctx, 3)
+        ctx.stored_data["key"] = 5
+        ctx.unsaved_stored_data.add("key")
+        ctx.hints_used[0, 1] += 1
+        ctx.name_aliases[0, 2] = "Alias"
+        ctx.unsaved_slot_states.update({(0, 1), (0, 2)})
+        self.assertTrue(ctx.save(now=True))
+
+        self.assertEqual(os.path.getsize(self.save_filename), snapshot_size, "snapshot was rewritten")
+        self.assertEqual(ctx.save_journal_records, 2)
+        loaded = self.load_context()
+        self.assertSameSave(ctx, loaded)
+        self.assertEqual(loaded.save_journal_records, 2)
+
+    def test_unchanged_save(self) -> None:
+        """Tests that a save without changes writes no record, and that records only contain the changed slots"""
+        ctx = self.new_context()
+        ctx.client_game_state.update({(0, 1): 5, (0, 2): 10})
+        self.assertTrue(ctx.save(now=True))
+        self.assertTrue(ctx.save(now=True))
+        self.assertEqual(os.path.getsize(ctx.save_journal_filename), 0)
+        self.assertEqual(ctx.save_journal_records, 0)
+
+        ctx.hints_used[0, 2] += 1
+        ctx.unsaved_slot_states.add((0, 2))
+        self.assertTrue(ctx.save(now=True))
+        record, = ctx.read_save_journal()
+        self.assertEqual(set(record["slot_states"]), {(0, 2)})
+        self.assertNotIn("random_state", record)
+        self.assertSameSave(ctx, self.load_context())
+
+    def test_compaction(self) -> None:
+        """Tests that the journal is folded into a new snapshot after save_journal_limit records"""
+        ctx = self.new_context()
+        ctx.save_journal_limit = 2
+        for location in range(5):
+            self.check(ctx, location)
+            self.assertTrue(ctx.save(now=True))
+        self.assertEqual(ctx.save_journal_records, 1)
+        self.assertSameSave(ctx, self.load_context())
+
+    def test_stale_journal(self) -> None:
+        """Tests that a journal left behind by a crash after writing a new snapshot is not replayed"""
+        ctx = self.new_context()
+        self.check(ctx, 1)
+        ctx.save(now=True)
+        self.check(ctx, 2)
+        ctx.save(now=True)
+        with open(ctx.save_journal_filename, "rb") as f:
+            journal = f.read()
+        ctx.save_snapshot_due = True
+        ctx.save(now=True)
+        with open(ctx.save_journal_filename, "wb") as f:
+            f.write(journal)
+        self.assertSameSave(ctx, self.load_context())
+
+    def test_incomplete_record(self) -> None:
+        """Tests that a partially written record is ignored and the next save rewrites the journal"""
+        ctx = self.new_context()
+        self.check(ctx, 1)
+        ctx.save(now=True)
+        self.check(ctx, 2)
+        ctx.save(now=True)
+        with open(ctx.save_journal_filename, "ab") as f:
+            f.write(b"\xff\x00\x00\x00partial")
+        loaded = self.load_context()
+        self.assertSameSave(ctx, loaded)
+        self.assertTrue(loaded.save_snapshot_due)
@@ -0,0 +1,111 @@
+import json
+import pickle
+import typing
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+from uuid import uuid4
+
+
+class TestGenerationScheduler(unittest.TestCase):
+    def setUp(self) -> None:
+        from WebHostLib.autolauncher import GenerationJob, GenerationScheduler
+
+        self.scheduler = GenerationScheduler({"GENERATORS": 3, "LARGE_JOB_COST": 5, "LARGE_JOB_GENERATORS": 1,
+                                              "JOB_TIME": None})
+        self.results: typing.Dict[GenerationJob, typing.Optional[bool]] = {}
+        for worker in self.scheduler.workers:
+            # run jobs in place, instead of starting processes
+            def run(job: GenerationJob, worker=worker) -> None:
+                job.started_at = job.queued_at
+                worker.job = job
+
+            def poll(worker=worker) -> typing.Optional[bool]:
+                result = self.results.get(worker.job.id, None)
+                if result is not None:
+                    worker.job = None
+                return result
+
+            worker.run = run
+            worker.poll = poll
+
+    def submit(self, players: int) -> SimpleNamespace:
+        generation = SimpleNamespace(
+            id=uuid4(), owner=uuid4(), meta=json.dumps({}), state=0,
+            options=pickle.dumps({f"Player{player}.yaml": {"game": "Archipelago"} for player in range(players)}))
+        self.scheduler.submit(generation)
+        return generation
+
+    def running(self) -> typing.Set[typing.Any]:
+        return {worker.job.id for worker in self.scheduler.workers if worker.job}
+
+    def test_small_jobs_pass_large_jobs(self) -> None:
+        """Tests that large jobs only take some of the generators, leaving the others for small jobs"""
+        from WebHostLib.models import STATE_STARTED
+
+        large = [self.submit(10), self.submit(10)]
+        small = [self.submit(1) for _ in range(3)]
+        self.scheduler.update()
+        self.assertEqual(self.running(), {large[0].id, small[0].id, small[1].id})
+        self.assertTrue(all(generation.state == STATE_STARTED for generation in large + small))
+        status = self.scheduler.get_status()
+        self.assertEqual((status["queued_small"], status["queued_large"]), (1, 1))
+
+        self.results[large[0].id] = True
+        self.scheduler.update()
+        self.assertEqual(self.running(), {large[1].id, small[0].id, small[1].id})
+        self.assertEqual(self.scheduler.get_status()["finished"][0]["result"], "success")
+
+        self.results[small[0].id] = False
+        self.scheduler.update()
+        self.assertEqual(self.running(), {large[1].id, small[2].id, small[1].id})
+        self.assertEqual(self.scheduler.get_status()["queued_small"], 0)
+
+    def test_timeout(self) -> None:
+        """Tests that a job over its time is terminated, unless it already finished"""
+        self.scheduler.job_time = 10
+        finished, unfinished = self.submit(1), self.submit(1)
+        self.scheduler.update()
+        terminated: typing.List[typing.Any] = []
+        for worker in self.scheduler.workers:
+            if worker.job:
+                worker.job.started_at -= 20
+
+                def terminate(worker=worker) -> None:
+                    terminated.append(worker.job.id)
+                    worker.job = None
+
+                worker.terminate = terminate
+        self.results[finished.id] = True
+
+        with mock.patch("WebHostLib.autolauncher.set_generation_error") as set_generation_error:
+            self.scheduler.update()
+        self.assertEqual(terminated, [unfinished.id])
+        set_generation_error.assert_called_once_with(unfinished.id, mock.ANY)
+        self.assertEqual({timing["result"] for timing in self.scheduler.get_status()["finished"]},
+                         {"success", "timeout"})
+
+    def test_cost(self) -> None:
+        from WebHostLib.autolauncher import estimate_generation_cost
+
+        self.assertEqual(estimate_generation_cost({"A": {"game": "A"}, "B": {"game": "A"}, "C": {"game": "B"}}), 5)
+
+
+class TestGenerationWorker(unittest.TestCase):
+    def test_pipe_closed(self) -> None:
+        """Tests that ending the process of a worker in any way also closes its pipe"""
+        import multiprocessing
+
+        from WebHostLib.autolauncher import GenerationWorker
+
+        worker = GenerationWorker({}, "Generator")
+        for end in (worker.terminate, worker.stop):
+            connection, worker_connection = multiprocessing.Pipe()
+            worker.connection = connection
+            worker.process = typing.cast(multiprocessing.Process, SimpleNamespace(
+                terminate=lambda: None, join=lambda timeout=None: None, is_alive=lambda: False))
+            end()
+            self.assertIsNone(worker.process)
+            self.assertIsNone(worker.connection)
+            self.assertTrue(connection.closed)
+            worker_connection.close()
@@ -0,0 +1,59 @@
+import os
+import tempfile
+import unittest
+
+from NetUtils import encode
+from WebHostLib.nametable import NameTable, write_name_table
+
+
+class TestNameTable(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        import worlds
+        cls.games = worlds.network_data_package["games"]
+        cls.item_name_groups = {game: world.item_name_groups
+                                for game, world in worlds.AutoWorldRegister.world_types.items()}
+        cls.location_name_groups = {game: world.location_name_groups
+                                    for game, world in worlds.AutoWorldRegister.world_types.items()}
+        cls.directory = tempfile.TemporaryDirectory()
+        path = os.path.join(cls.directory.name, "static.apnt")
+        write_name_table(path, cls.games, cls.item_name_groups, cls.location_name_groups)
+        cls.name_table = NameTable(path)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        del cls.name_table  # release the mapping before removing the file
+        cls.directory.cleanup()
+
+    def test_data_package(self) -> None:
+        """Tests that the name table reproduces the data package of every game"""
+        for game, game_package in self.games.items():
+            with self.subTest(game=game):
+                table_package = self.name_table.gamespackage[game]
+                self.assertEqual(dict(table_package["item_name_to_id"]), game_package["item_name_to_id"])
+                self.assertEqual(dict(table_package["location_name_to_id"]), game_package["location_name_to_id"])
+                self.assertEqual(table_package["checksum"], game_package["checksum"])
+                self.assertEqual(self.name_table.item_name_groups[game],
+                                 {name: set(group) for name, group in self.item_name_groups.get(game, {}).items()})
+
+    def test_names(self) -> None:
+        """Tests id -> name lookups, including the Archipelago names and the fallback for unknown ids"""
+        archipelago = self.games["Archipelago"]["item_name_to_id"]
+        for game, game_package in self.games.items():
+            with self.subTest(game=game):
+                item_names = self.name_table.item_names[game]
+                for name, item_id in game_package["item_name_to_id"].items():
+                    self.assertEqual(item_names[item_id], name)
+                for name, item_id in archipelago.items():
+                    self.assertIn(item_id, item_names)
+                self.assertNotIn(-1000, item_names)
+                self.assertEqual(item_names[-1000], "Unknown item (ID:-1000)")
+                self.assertNotIn("Not a name", self.name_table.gamespackage[game]["item_name_to_id"])
+                with self.assertRaises(KeyError):
+                    _ = self.name_table.gamespackage[game]["location_name_to_id"]["Not a name"]
+
+    def test_encode(self) -> None:
+        """Tests that the mapped data package can be sent to clients like the dicts"""
+        package = self.name_table.gamespackage["Archipelago"]
+        self.assertEqual(encode(package), encode({key: dict(value) if key != "checksum" else value
+                                                  for key, value in package.items()}))
@@ -0,0 +1,23 @@
+import unittest
+from uuid import uuid4
+
+from WebHostLib.notify import NotificationListener, ROOM_ACTIVITY, ROOM_COMMAND, notify_room
+
+
+class TestNotify(unittest.TestCase):
+    def test_notify_room(self) -> None:
+        """Tests that notifications of rooms reach the listener, and are dropped without one"""
+        room_id = uuid4()
+        notify_room(room_id)  # no listener, nothing should happen
+        with NotificationListener() as listener:
+            notify_room(room_id)
+            notify_room(room_id, ROOM_COMMAND)
+            notifications = listener.receive(1)
+            while len(notifications) < 2:
+                received = listener.receive(1)
+                if not received:
+                    break
+                notifications += received
+            self.assertEqual(notifications, [(ROOM_ACTIVITY, room_id), (ROOM_COMMAND, room_id)])
+            self.assertEqual(listener.receive(0), [])
+        notify_room(room_id)
@@ -0,0 +1,97 @@
+from unittest import mock
+from uuid import uuid4
+
+from flask import url_for
+
+from . import TestBase
+
+
+class TestStats(TestBase):
+    def test_room_creation_counts_games(self) -> None:
+        """
+        Verify that creating rooms updates the daily games played, which the stats page reads
+        """
+        from pony.orm import db_session, select
+        from WebHostLib.models import GamesPlayed, Room, Seed, Slot
+        from WebHostLib.stats import get_db_data
+
+        with db_session:
+            counts_before = {(games_played.day, games_played.game): games_played.count
+                             for games_played in select(games_played for games_played in GamesPlayed)}
+        with self.client.session_transaction() as session:
+            session["_id"] = uuid4()
+            with db_session:
+                seed = Seed(multidata=b"", owner=session["_id"],
+                            slots=[Slot(player_id=1, player_name="A", game="Test Game"),
+                                   Slot(player_id=2, player_name="B", game="Test Game"),
+                                   Slot(player_id=3, player_name="C", game="Other Game")])
+                seed_id = seed.id
+
+        with self.app.app_context(), self.app.test_request_context():
+            for _ in range(2):
+                response = self.client.get(url_for("new_room", seed=seed_id))
+                self.assertEqual(response.status_code, 302)
+
+        with db_session:
+            day = Room.select(lambda room: room.seed.id == seed_id).first().creation_time.date()
+            for game, count in (("Test Game", 4), ("Other Game", 2)):
+                self.assertEqual(GamesPlayed[day, game].count - counts_before.get((day, game), 0), count)
+            total_games, games_played = get_db_data({"Test Game"})
+            self.assertEqual(total_games["Test Game"], GamesPlayed[day, "Test Game"].count)
+            self.assertNotIn("Other Game", total_games)
+            self.assertEqual(games_played[day]["Test Game"], GamesPlayed[day, "Test Game"].count)
+
+            for room in Room.select(lambda room: room.seed.id == seed_id):
+                room.delete()
+            Seed[seed_id].delete()
+
+    def test_conflicting_count_is_retried(self) -> None:
+        """
+        Verify that a room still gets counted when counting its games conflicts with another room at first
+        """
+        from pony.orm import TransactionIntegrityError, commit, db_session
+        from WebHostLib.models import GamesPlayed, Room, Seed, Slot
+        from WebHostLib.stats import record_games_played
+
+        conflicts = [TransactionIntegrityError("conflict", None)]
+
+        def conflicting_commit() -> None:
+            if conflicts:
+                raise conflicts.pop()
+            commit()
+
+        with db_session:
+            seed = Seed(multidata=b"", owner=uuid4(), slots=[Slot(player_id=1, player_name="A", game="Retry Game")])
+            room = Room(seed=seed, owner=seed.owner)
+            commit()
+            seed_id, room_id = seed.id, room.id
+            with mock.patch("WebHostLib.stats.commit", conflicting_commit):
+                record_games_played(room)
+            self.assertFalse(conflicts)
+        with db_session:
+            self.assertEqual(GamesPlayed[Room[room_id].creation_time.date(), "Retry Game"].count, 1)
+            Room[room_id].delete()
+            Seed[seed_id].delete()
+
+    def test_backfill(self) -> None:
+        """
+        Verify that rooms created before the daily games played existed get counted once
+        """
+        from pony.orm import commit, db_session
+        from WebHostLib.models import GamesPlayed, Room, Seed, Slot
+        from WebHostLib.stats import backfill_games_played
+
+        with db_session:
+            GamesPlayed.select().delete(bulk=True)
+            seed = Seed(multidata=b"", owner=uuid4(), slots=[Slot(player_id=1, player_name="A", game="Old Game"),
+                                                            Slot(player_id=2, player_name="B", game="Old Game")])
+            rooms = [Room(seed=seed, owner=seed.owner) for _ in range(2)]
+            commit()
+            seed_id, room_ids = seed.id, [room.id for room in rooms]
+        for _ in range(2):
+            backfill_games_played()
+        with db_session:
+            self.assertEqual(GamesPlayed[Room[room_ids[0]].creation_time.date(), "Old Game"].count, 4)
+            for room_id in room_ids:
+                Room[room_id].delete()
+            Seed[seed_id].delete()
@@ -93,3 +93,19 @@ class TestTracker(TestBase):
                 headers={"If-Modified-Since": "Wed, 21 Oct 2015 07:28:00"},  # missing timezone
             )
             self.assertEqual(response.status_code, 400)
+
+    def test_shared_seed_data(self) -> None:
+        """
+        Verify that TrackerData of a room shares the static data of its seed, but reads the save each time
+        """
+        from pony.orm import db_session
+        from WebHostLib.models import Room
+        from WebHostLib.tracker import TrackerData
+
+        with db_session:
+            room: Room = Room.get(id=self.room_id)
+            first, second = TrackerData(room), TrackerData(room)
+            self.assertIs(first._multidata, second._multidata)
+            self.assertIs(first.item_id_to_name["Archipelago"], second.item_id_to_name["Archipelago"])
+            self.assertIsNot(first._multisave, second._multisave)
+            self.assertEqual(first.get_player_name(0, 1), second.get_player_name(0, 1))
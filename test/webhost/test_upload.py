@@ -0,0 +1,36 @@
+from pathlib import Path
+from typing import ClassVar
+
+from . import TestBase
+
+
+class TestUpload(TestBase):
+    data: ClassVar[bytes]
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        with (Path(__file__).parent / "data" / "One_Archipelago.archipelago").open("rb") as f:
+            cls.data = f.read()
+
+    def test_process_multidata(self) -> None:
+        """
+        Verify that uploaded multidata has its data packages stored separately, and keeps all other data
+        """
+        from pony.orm import db_session, rollback
+        from NetUtils import decode_multidata, encode_multidata
+        from WebHostLib.models import GameDataPackage
+        from WebHostLib.upload import process_multidata
+
+        multidata = decode_multidata(self.data)
+        for data in (self.data, encode_multidata(multidata)):
+            with self.subTest(format_version=data[0]), db_session:
+                slots, processed = process_multidata(data)
+                processed_multidata = decode_multidata(processed)
+                for game, game_data in processed_multidata["datapackage"].items():
+                    self.assertEqual(game_data.keys(), {"version", "checksum"})
+                    self.assertTrue(GameDataPackage.get(checksum=game_data["checksum"]))
+                self.assertEqual({key: value for key, value in processed_multidata.items() if key != "datapackage"},
+                                 {key: value for key, value in multidata.items() if key != "datapackage"})
+                self.assertEqual({slot.player_id for slot in slots}, set(multidata["slot_info"]))
+                rollback()
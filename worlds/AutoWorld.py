@@ -1,20 +1,26 @@
 from __future__ import annotations
 
+import concurrent.futures
+import contextlib
 import hashlib
+import io
 import logging
+import multiprocessing
 import pathlib
+import pickle
 import sys
 import time
 from random import Random
+from types import CodeType, FunctionType, ModuleType
 from dataclasses import make_dataclass
 from typing import (Any, Callable, ClassVar, Dict, FrozenSet, Iterable, List, Mapping, Optional, Set, TextIO, Tuple,
                     TYPE_CHECKING, Type, Union)
 
 from Options import item_and_loc_options, ItemsAccessibility, OptionGroup, PerGameCommonOptions
-from BaseClasses import CollectionState
+from BaseClasses import CollectionState, CopyOnWriteDict, Item, Location, mutable_container
 
 if TYPE_CHECKING:
-    from BaseClasses import MultiWorld, Item, Location, Tutorial, Region, Entrance
+    from BaseClasses import MultiWorld, Tutorial, Region, Entrance
     from . import GamesPackage
     from settings import Group
 
@@ -176,23 +182,220 @@ def call_single(multiworld: "MultiWorld", method_name: str, player: int, *args:
         return ret
 
 
-def call_all(multiworld: "MultiWorld", method_name: str, *args: Any) -> None:
+def call_all(multiworld: "MultiWorld", method_name: str, *args: Any, processes: int = 0) -> None:
+    """
+    Calls the method of every world in player order, then the stage method of every world type.
+
+    :param processes: If set, the method of worlds marked generate_stages_in_process is called in up to this many
+                      forked processes, and their changes are merged back at their turn in player order.
+    """
     world_types: Set[AutoWorldRegister] = set()
-    for player in multiworld.player_ids:
-        prev_item_count = len(multiworld.itempool)
-        world_types.add(multiworld.worlds[player].__class__)
-        call_single(multiworld, method_name, player, *args)
-        if __debug__:
-            new_items = multiworld.itempool[prev_item_count:]
-            for i, item in enumerate(new_items):
-                for other in new_items[i+1:]:
-                    assert item is not other, (
-                        f"Duplicate item reference of \"{item.name}\" in \"{multiworld.worlds[player].game}\" "
-                        f"of player \"{multiworld.player_name[player]}\". Please make a copy instead.")
+    process_players: List[int] = []
+    if processes and "fork" in multiprocessing.get_all_start_methods():
+        process_players = [player for player in multiworld.player_ids
+                           if multiworld.worlds[player].generate_stages_in_process]
+    with contextlib.ExitStack() as stack:
+        forked_calls: Dict[int, concurrent.futures.Future[bytes]] = {}
+        shared_objects: Dict[int, Any] = {}
+        if process_players:
+            shared_objects = _shared_objects(multiworld, {multiworld.worlds[player].__class__
+                                                          for player in process_players})
+            pool = stack.enter_context(concurrent.futures.ProcessPoolExecutor(
+                min(processes, len(process_players)), multiprocessing.get_context("fork"),
+                _set_forked_multiworld, (multiworld, shared_objects)))
+            # the processes fork on the first submit, so they all start from the multiworld before this stage
+            forked_calls = {player: pool.submit(_call_forked, method_name, player, *args)
+                            for player in process_players}
+        for player in multiworld.player_ids:
+            prev_item_count = len(multiworld.itempool)
+            world_types.add(multiworld.worlds[player].__class__)
+            if player in forked_calls:
+                _load_forked_changes(multiworld, player, forked_calls[player].result(), shared_objects)
+            else:
+                call_single(multiworld, method_name, player, *args)
+            if __debug__:
+                new_items = multiworld.itempool[prev_item_count:]
+                for i, item in enumerate(new_items):
+                    for other in new_items[i+1:]:
+                        assert item is not other, (
+                            f"Duplicate item reference of \"{item.name}\" in \"{multiworld.worlds[player].game}\" "
+                            f"of player \"{multiworld.player_name[player]}\". Please make a copy instead.")
 
     call_stage(multiworld, method_name, *args)
 
 
+_forked_multiworld: Optional["MultiWorld"] = None
+_forked_shared_objects: Dict[int, Any] = {}
+
+
+def _set_forked_multiworld(multiworld: "MultiWorld", shared_objects: Dict[int, Any]) -> None:
+    # with fork, the multiworld is inherited by the stage process instead of being pickled
+    global _forked_multiworld, _forked_shared_objects
+    _forked_multiworld = multiworld
+    _forked_shared_objects = shared_objects
+
+
+def _call_forked(method_name: str, player: int, *args: Any) -> bytes:
+    assert _forked_multiworld is not None, "stage process was not forked from the generating process"
+    random_state = _forked_multiworld.random.getstate()
+    # values that can't change in place are only sent back if the stage replaced them
+    unchanged_values = {id(value): value for container in _player_containers(_forked_multiworld)
+                        for value in _player_entries(container, player).values()
+                        if isinstance(value, (str, bytes, int, float, type(None)))}
+    call_single(_forked_multiworld, method_name, player, *args)
+    if _forked_multiworld.random.getstate() != random_state:
+        raise RuntimeError(f"{method_name} of {_forked_multiworld.worlds[player].game} used the random of the "
+                           f"multiworld, so it can't run in a stage process. Please use self.random instead.")
+    return _dump_forked_changes(_forked_multiworld, player, _forked_shared_objects, unchanged_values)
+
+
+def _shared_objects(multiworld: "MultiWorld", world_types: Iterable[AutoWorldRegister]) -> Dict[int, Any]:
+    """
+    Returns the objects a forked stage refers to instead of sending them back, by their id, which is the same in the
+    forked process: the multiworld, what it holds, the worlds, and the objects of the core modules and of the modules
+    of the world types.
+    """
+    shared_objects: Dict[int, Any] = {id(multiworld): multiworld}
+    shared_objects.update((id(world), world) for world in multiworld.worlds.values())
+    shared_objects.update((id(value), value) for value in vars(multiworld).values())
+
+    packages = {".".join(world_type.__module__.split(".")[:2]) for world_type in world_types}
+    worlds_path = pathlib.Path(__file__).parent
+    core_path = worlds_path.parent
+
+    def is_shared(module_name: str) -> bool:
+        module = sys.modules.get(module_name)
+        if not module or not getattr(module, "__file__", None):
+            return False
+        path = pathlib.Path(module.__file__)
+        if worlds_path in path.parents and path.parent != worlds_path:
+            return ".".join(module_name.split(".")[:2]) in packages or module_name.startswith("worlds.generic")
+        return core_path in path.parents and "site-packages" not in path.parts
+
+    shared_modules = {name for name in list(sys.modules) if is_shared(name)}
+    pending: List[Any] = [sys.modules[name] for name in shared_modules]
+    while pending:
+        obj = pending.pop()
+        # strings are kept too, as the pickle of the multidata shares their objects
+        if id(obj) in shared_objects or isinstance(obj, (int, float, type(None))):
+            continue
+        shared_objects[id(obj)] = obj
+        if isinstance(obj, dict):
+            pending.extend(obj)
+            pending.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            pending.extend(obj)
+        elif isinstance(obj, (staticmethod, classmethod)):
+            pending.append(obj.__func__)
+        elif isinstance(obj, FunctionType):
+            if obj.__module__ in shared_modules:
+                pending.extend((obj.__code__, obj.__defaults__, obj.__kwdefaults__))
+        elif isinstance(obj, CodeType):
+            pending.extend(obj.co_consts)
+        elif isinstance(obj, ModuleType):
+            if obj.__name__ in shared_modules:
+                pending.extend(vars(obj).values())
+        elif getattr(type(obj) if not isinstance(obj, type) else obj, "__module__", None) in shared_modules:
+            pending.extend(vars(obj).values() if hasattr(obj, "__dict__") else ())
+    return shared_objects
+
+
+def _new_hashed_object(cls: type, name: str, player: int) -> Any:
+    # locations and items hash by name and player, which have to be there before they are put in a set or dict
+    obj = cls.__new__(cls)
+    obj.name = name
+    obj.player = player
+    return obj
+
+
+def _player_containers(multiworld: "MultiWorld") -> Tuple[Any, ...]:
+    return multiworld, multiworld.state, multiworld.spoiler
+
+
+def _player_entries(container: Any, player: int) -> Dict[str, Any]:
+    """Returns the per-player dicts of the object by attribute name, with the entry of the player."""
+    # dict.__getitem__ skips the warning of deprecated option dicts, while copy-on-write dicts need their own lookup
+    return {name: value[player] if isinstance(value, CopyOnWriteDict) else dict.__getitem__(value, player)
+            for name, value in vars(container).items()
+            if isinstance(value, dict) and name != "worlds" and player in value}
+
+
+def _dump_forked_changes(multiworld: "MultiWorld", player: int, shared_objects: Dict[int, Any],
+                         unchanged_values: Dict[int, Any]) -> bytes:
+    """Pickles everything of the player that a stage may change, with rules and other closures by value."""
+    from cloudpickle import CloudPickler
+
+    class ForkedChangesPickler(CloudPickler):
+        def persistent_id(self, obj: Any) -> Optional[int]:
+            return id(obj) if id(obj) in shared_objects else None
+
+        def reducer_override(self, obj: Any) -> Any:
+            if isinstance(obj, (Location, Item)):
+                return (_new_hashed_object, (type(obj), obj.name, obj.player),
+                        *obj.__reduce_ex__(pickle.HIGHEST_PROTOCOL)[2:])
+            return super().reducer_override(obj)
+
+    regions = multiworld.regions
+    file = io.BytesIO()
+    ForkedChangesPickler(file, pickle.HIGHEST_PROTOCOL).dump((
+        vars(multiworld.worlds[player]),
+        [{name: value for name, value in _player_entries(container, player).items()
+          if unchanged_values.get(id(value)) is not value}
+         for container in _player_containers(multiworld)],
+        [item for item in multiworld.itempool if item.player == player],
+        regions.region_cache[player],
+        regions.entrance_cache[player],
+        [location for location in regions.location_order if location.player == player],
+        {region: entrances for region, entrances in multiworld.indirect_connections.items()
+         if region.player == player},
+        {key: entrance for key, entrance in multiworld.spoiler.entrances.items() if key[-1] == player},
+    ))
+    return file.getvalue()
+
+
+def _load_forked_changes(multiworld: "MultiWorld", player: int, changes: bytes,
+                         shared_objects: Dict[int, Any]) -> None:
+    """Replaces everything of the player with what a forked stage changed it to."""
+    class ForkedChangesUnpickler(pickle.Unpickler):
+        def persistent_load(self, pid: Any) -> Any:
+            return shared_objects[pid]
+
+    (world_vars, player_entries, items, region_cache, entrance_cache, locations, indirect_connections,
+     spoiler_entrances) = ForkedChangesUnpickler(io.BytesIO(changes)).load()
+
+    world = multiworld.worlds[player]
+    world.__dict__.clear()
+    world.__dict__.update(world_vars)
+    for container, entries in zip(_player_containers(multiworld), player_entries):
+        for name, value in entries.items():
+            if isinstance(getattr(container, name), CopyOnWriteDict):
+                getattr(container, name)[player] = value
+            else:
+                dict.__setitem__(getattr(container, name), player, value)
+
+    # the items of the player keep their place in the pool, the ones created in this stage are appended
+    new_items = iter(items)
+    for index, item in enumerate(multiworld.itempool):
+        if item.player == player:
+            multiworld.itempool[index] = next(new_items)
+    multiworld.itempool.extend(new_items)
+
+    regions = multiworld.regions
+    for location in list(regions.location_cache[player].values()):
+        regions.unregister_location(location)
+    regions.region_cache[player] = region_cache
+    regions.entrance_cache[player] = entrance_cache
+    for location in locations:
+        regions.register_location(location)
+    for region in [region for region in multiworld.indirect_connections if region.player == player]:
+        del multiworld.indirect_connections[region]
+    multiworld.indirect_connections.update(indirect_connections)
+    # like the item pool, the entrances set in earlier stages keep their place
+    for key in [key for key in multiworld.spoiler.entrances if key[-1] == player and key not in spoiler_entrances]:
+        del multiworld.spoiler.entrances[key]
+    multiworld.spoiler.entrances.update(spoiler_entrances)
+
+
 def call_stage(multiworld: "MultiWorld", method_name: str, *args: Any) -> None:
     world_types = {multiworld.worlds[player].__class__ for player in multiworld.player_ids}
     for world_type in sorted(world_types, key=lambda world: world.__name__):
@@ -303,6 +506,17 @@ class World(metaclass=AutoWorldRegister):
     If False, everything is rechecked at every step, which is slower computationally, 
     but may be desirable in complex/dynamic worlds."""
 
+    generate_stages_in_process: ClassVar[bool] = False
+    """If True, generate_early, create_regions, create_items, set_rules and generate_basic only change this world,
+    its regions, locations and items, and the entries of this player in the multiworld, its state and spoiler.
+    They don't remove items from the pool, only use self.random, read nothing other worlds change in the same stage,
+    and their result doesn't depend on the iteration order of sets, which isn't kept when the changes are pickled.
+    Then they may run in a forked process when generating with stage processes."""
+
+    generate_output_in_process: ClassVar[bool] = False
+    """If True, generate_output only writes files to the output directory and changes nothing that later stages read,
+    so it may run in a forked process when generating with output processes."""
+
     multiworld: "MultiWorld"
     """autoset on creation. The MultiWorld object for the currently generating multiworld."""
     player: int
@@ -516,7 +730,7 @@ class World(metaclass=AutoWorldRegister):
         """Called when an item is collected in to state. Useful for things such as progressive items or currency."""
         name = self.collect_item(state, item)
         if name:
-            state.prog_items[self.player][name] += 1
+            mutable_container(state.prog_items, self.player)[name] += 1
             return True
         return False
 
@@ -524,9 +738,10 @@ class World(metaclass=AutoWorldRegister):
         """Called when an item is removed from to state. Useful for things such as progressive items or currency."""
         name = self.collect_item(state, item, True)
         if name:
-            state.prog_items[self.player][name] -= 1
-            if state.prog_items[self.player][name] < 1:
-                del (state.prog_items[self.player][name])
+            prog_items = mutable_container(state.prog_items, self.player)
+            prog_items[name] -= 1
+            if prog_items[name] < 1:
+                del (prog_items[name])
             return True
         return False
 
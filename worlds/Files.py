@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import abc
 import json
+import struct
 import zipfile
 from enum import IntEnum
 import os
@@ -241,8 +242,15 @@ class APProcedurePatch(APAutoPatchInterface):
 
     def get_file(self, file: str) -> bytes:
         """ Retrieves a file from the patch container."""
-        if file not in self.files:
+        if not self.files:
+            # the first read goes through read(), which checks the version and manifest of the container
             self.read()
+        elif file not in self.files:
+            # the container was already checked, so only the missing file is read instead of all of it again
+            if not self.path:
+                raise FileNotFoundError(f"Cannot read {self.__class__.__name__} due to no path provided.")
+            with zipfile.ZipFile(self.path, "r") as zf:
+                self.files[file] = zf.read(file)
         return self.files[file]
 
     def write_file(self, file_name: str, file: bytes) -> None:
@@ -251,7 +259,10 @@ class APProcedurePatch(APAutoPatchInterface):
 
     def patch(self, target: str) -> None:
         self.read()
-        base_data = self.get_source_data_with_cache()
+        base_data: Union[bytes, bytearray] = self.get_source_data_with_cache()
+        if not isinstance(base_data, bytes):
+            # steps may change a bytearray in place, which must not reach the cached source data
+            base_data = bytearray(base_data)
         patch_extender = AutoPatchExtensionRegister.get_handler(self.game)
         assert not isinstance(self.procedure, str), f"{type(self)} must define procedures"
         for step, args in self.procedure:
@@ -374,7 +385,8 @@ class APPatchExtension(metaclass=AutoPatchExtensionRegister):
 
     Further arguments are passed in from the procedure as defined.
 
-    Patch extension functions must return the changed bytes.
+    Patch extension functions must return the changed bytes. rom may also be a bytearray owned by the procedure,
+    which can be changed in place and returned, so consecutive steps share a single buffer instead of copying the data.
     """
     game: str
     required_extensions: ClassVar[Tuple[str, ...]] = ()
@@ -382,47 +394,46 @@ class APPatchExtension(metaclass=AutoPatchExtensionRegister):
     @staticmethod
     def apply_bsdiff4(caller: APProcedurePatch, rom: bytes, patch: str) -> bytes:
         """Applies the given bsdiff4 from the patch onto the current file."""
-        return bsdiff4.patch(rom, caller.get_file(patch))
+        # bsdiff4 only accepts bytes, not the bytearray a previous step may have returned
+        return bsdiff4.patch(bytes(rom) if isinstance(rom, bytearray) else rom, caller.get_file(patch))
 
     @staticmethod
-    def apply_tokens(caller: APProcedurePatch, rom: bytes, token_file: str) -> bytes:
+    def apply_tokens(caller: APProcedurePatch, rom: bytes, token_file: str) -> bytearray:
         """Applies the given token file from the patch onto the current file."""
-        token_data = caller.get_file(token_file)
-        rom_data = bytearray(rom)
-        token_count = int.from_bytes(token_data[0:4], "little")
+        token_data = memoryview(caller.get_file(token_file))
+        rom_data = rom if isinstance(rom, bytearray) else bytearray(rom)
+        token_count, = struct.unpack_from("<I", token_data)
         bpr = 4
         for _ in range(token_count):
-            token_type = token_data[bpr:bpr + 1][0]
-            offset = int.from_bytes(token_data[bpr + 1:bpr + 5], "little")
-            size = int.from_bytes(token_data[bpr + 5:bpr + 9], "little")
-            data = token_data[bpr + 9:bpr + 9 + size]
+            token_type, offset, size = struct.unpack_from("<BII", token_data, bpr)
+            bpr += 9
             if token_type in [APTokenTypes.AND_8, APTokenTypes.OR_8, APTokenTypes.XOR_8]:
-                arg = data[0]
+                arg = token_data[bpr]
                 if token_type == APTokenTypes.AND_8:
-                    rom_data[offset] = rom_data[offset] & arg
+                    rom_data[offset] &= arg
                 elif token_type == APTokenTypes.OR_8:
-                    rom_data[offset] = rom_data[offset] | arg
+                    rom_data[offset] |= arg
                 else:
-                    rom_data[offset] = rom_data[offset] ^ arg
+                    rom_data[offset] ^= arg
             elif token_type in [APTokenTypes.COPY, APTokenTypes.RLE]:
-                length = int.from_bytes(data[:4], "little")
-                value = int.from_bytes(data[4:], "little")
+                length, value = struct.unpack_from("<II", token_data, bpr)
                 if token_type == APTokenTypes.COPY:
                     rom_data[offset: offset + length] = rom_data[value: value + length]
                 else:
-                    rom_data[offset: offset + length] = bytes([value] * length)
+                    rom_data[offset: offset + length] = bytes((value,)) * length
             else:
-                rom_data[offset:offset + len(data)] = data
-            bpr += 9 + size
-        return bytes(rom_data)
+                # a view of the token data, so it is copied straight into the rom
+                rom_data[offset:offset + size] = token_data[bpr:bpr + size]
+            bpr += size
+        return rom_data
 
     @staticmethod
-    def calc_snes_crc(caller: APProcedurePatch, rom: bytes) -> bytes:
+    def calc_snes_crc(caller: APProcedurePatch, rom: bytes) -> bytearray:
         """Calculates and applies a valid CRC for the SNES rom header."""
-        rom_data = bytearray(rom)
         if len(rom) < 0x8000:
             raise Exception("Tried to calculate SNES CRC on file too small to be a SNES ROM.")
-        crc = (sum(rom_data[:0x7FDC] + rom_data[0x7FE0:]) + 0x01FE) & 0xFFFF
+        rom_data = rom if isinstance(rom, bytearray) else bytearray(rom)
+        crc = (sum(rom_data) - sum(rom_data[0x7FDC:0x7FE0]) + 0x01FE) & 0xFFFF
         inv = crc ^ 0xFFFF
         rom_data[0x7FDC:0x7FE0] = [inv & 0xFF, (inv >> 8) & 0xFF, crc & 0xFF, (crc >> 8) & 0xFF]
-        return bytes(rom_data)
+        return rom_data
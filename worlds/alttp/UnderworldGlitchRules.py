@@ -1,4 +1,4 @@
-from BaseClasses import Entrance
+from BaseClasses import Entrance, mutable_container
 from worlds.generic.Rules import set_rule, add_rule
 from .StateHelpers import can_bomb_clip, has_sword, has_beam_sword, has_fire_source, can_melt_things, has_misery_mire_medallion
 
@@ -31,7 +31,7 @@ def fake_pearl_state(state, player):
     if state.has('Moon Pearl', player):
         return state
     fake_state = state.copy()
-    fake_state.prog_items[player]['Moon Pearl'] += 1
+    mutable_container(fake_state.prog_items, player)['Moon Pearl'] += 1
     return fake_state
 
 
@@ -27,6 +27,7 @@ class ChecksFinderWorld(World):
     game = "ChecksFinder"
     options_dataclass = PerGameCommonOptions
     web = ChecksFinderWeb()
+    generate_stages_in_process = True
 
     item_name_to_id = {name: data.code for name, data in item_table.items()}
     location_name_to_id = {name: data.id for name, data in advancement_table.items()}
@@ -38,6 +38,7 @@ class CliqueWorld(World):
 
     game = "Clique"
     web = CliqueWebWorld()
+    generate_stages_in_process = True
     options: CliqueOptions
     options_dataclass = CliqueOptions
     location_name_to_id = location_table
@@ -171,6 +171,7 @@ class HKWorld(World):
     settings: typing.ClassVar[HollowKnightSettings]
 
     web = HKWeb()
+    generate_stages_in_process = True
 
     item_name_to_id = {name: data.id for name, data in item_table.items()}
     location_name_to_id = {location_name: location_id for location_id, location_name in
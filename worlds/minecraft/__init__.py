@@ -89,6 +89,7 @@ class MinecraftWorld(World):
     settings: typing.ClassVar[MinecraftSettings]
     topology_present = True
     web = MinecraftWebWorld()
+    generate_stages_in_process = True
 
     item_name_to_id = Constants.item_name_to_id
     location_name_to_id = Constants.location_name_to_id
@@ -55,6 +55,7 @@ class MuseDashWorld(World):
 
     topology_present = False
     web = MuseDashWebWorld()
+    generate_stages_in_process = True
 
     # Necessary Data
     md_collection = MuseDashCollections()
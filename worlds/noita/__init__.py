@@ -36,6 +36,7 @@ class NoitaWorld(World):
     location_name_groups = locations.location_name_groups
 
     web = NoitaWeb()
+    generate_stages_in_process = True
 
     def generate_early(self) -> None:
         if not self.multiworld.get_player_name(self.player).isascii():
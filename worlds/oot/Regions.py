@@ -64,6 +64,9 @@ class OOTRegion(Region):
             return None
 
     def can_reach(self, state):
+        # the age caches below don't go through CollectionState.update_reachable_regions
+        if state.world_gate_closed(self.player):
+            return False
         if state._oot_stale[self.player]:
             stored_age = state.age[self.player]
             state._oot_update_age_reachable_regions(self.player)
@@ -31,7 +31,7 @@ from .N64Patch import create_patch_file
 from .Cosmetics import patch_cosmetics
 
 from settings import get_settings
-from BaseClasses import MultiWorld, CollectionState, Tutorial, LocationProgressType
+from BaseClasses import MultiWorld, CollectionState, Tutorial, LocationProgressType, mutable_container
 from Options import Range, Toggle, VerifyKeys, Accessibility, PlandoConnections
 from Fill import fill_restrictive, fast_fill, FillError
 from worlds.generic.Rules import exclusion_rules, add_item_rule
@@ -1309,16 +1309,17 @@ class OOTWorld(World):
         state._oot_stale[self.player] = True
         if item.advancement and item.special and item.special.get('alias', False):
             alt_item_name, count = item.special.get('alias')
-            state.prog_items[self.player][alt_item_name] += count
+            mutable_container(state.prog_items, self.player)[alt_item_name] += count
             return True
         return super().collect(state, item)
 
     def remove(self, state: CollectionState, item: OOTItem) -> bool:
         if item.advancement and item.special and item.special.get('alias', False):
             alt_item_name, count = item.special.get('alias')
-            state.prog_items[self.player][alt_item_name] -= count
-            if state.prog_items[self.player][alt_item_name] < 1:
-                del (state.prog_items[self.player][alt_item_name])
+            prog_items = mutable_container(state.prog_items, self.player)
+            prog_items[alt_item_name] -= count
+            if prog_items[alt_item_name] < 1:
+                del (prog_items[alt_item_name])
             state._oot_stale[self.player] = True
             return True
         changed = super().remove(state, item)
@@ -38,6 +38,7 @@ class RLWorld(World):
     topology_present = True
     required_client_version = (0, 3, 5)
     web = RLWeb()
+    generate_stages_in_process = True
 
     item_name_to_id = {name: data.code for name, data in item_table.items() if data.code is not None}
     location_name_to_id = {name: data.code for name, data in location_table.items() if data.code is not None}
@@ -18,11 +18,11 @@ class SlotLockCommandProcessor(ClientCommandProcessor):
         if item:
             self.ctx.auto_hint_queue.append(item)
         logger.info(f"Autohint queue: {self.ctx.auto_hint_queue}")
-        self.ctx.checking_hints = False
+        self.ctx.request_hint_check()
     def _cmd_toggle_autohint(self):
         logger.info(f"Toggling Locked Autohint to {not self.ctx.auto_hint_locked_items}")
         self.ctx.auto_hint_locked_items = not self.ctx.auto_hint_locked_items
-        self.ctx.checking_hints =  False
+        self.ctx.request_hint_check()
     @mark_raw
     def _cmd_admin(self, password=None):
         """Use admin rights for autohint. This automatically logs into the server. Password defaults to the one in host.yaml."""
@@ -42,118 +42,156 @@ class SlotLockContext(CommonContext):
     game = "SlotLock"  # empty matches any game since 0.3.2
     items_handling = 0b111  # receive all items for /received
     want_slot_data = True
-    checking_hints = False
     command_processor = SlotLockCommandProcessor
     auto_hint_queue = []
     locked_slots = []
+    locked_slots_nums = []
     unlocked_slots = []
     use_server_password = False
     connected = False
-    has_hinted = []
+    free_starting_items = False
+    auto_hint_locked_items = False
     def __init__(self, server_address=None, password=None):
         CommonContext.__init__(self, server_address, password)
+        self.has_hinted = set()
+        self.hint_task = None
+        self.hints_dirty = False
+        self.reset_indexes()
+
+    def reset_indexes(self):
+        # everything below is kept up to date from the packets as they come in, instead of rebuilt on a timer
+        self.received_count = 0
+        self.received_item_ids = set()
+        # missing locations by the id of the unlock item they wait on, which is location id // 10
+        self.locations_by_unlock = {}
+        # merged hints of this slot and the locked slots, by (finding player, location)
+        self.hints = {}
+        # ids of items for this slot that have a hint, and those hints by item id
+        self.hinted_item_ids = set()
+        self.hints_by_item = {}
+        # hints that may make this client hint an unlock item, they leave once found or deprioritized
+        self.auto_hint_candidates = {}
 
     async def server_auth(self, password_requested: bool = False):
         if password_requested and not self.password:
             await super(TextContext, self).server_auth(password_requested)
         await self.get_username()
         await self.send_connect()
+    def request_hint_check(self):
+        """Schedules a look at the hints, coalescing everything that happens while one is already running."""
+        self.hints_dirty = True
+        if self.connected and (self.hint_task is None or self.hint_task.done()):
+            self.hint_task = asyncio.create_task(self.run_checking_hints())
     async def run_checking_hints(self):
-        while True:
-            if not self.connected:
-                return
-            await self.check_hints()
-            await asyncio.sleep(1)
+        while self.hints_dirty and self.connected:
+            self.hints_dirty = False
+            if await self.check_hints():
+                # give the server time to answer with the new hint and hint points before hinting again
+                await asyncio.sleep(1)
+                self.hints_dirty = True
     def make_gui(self):
         ui = super().make_gui()
         ui.base_title = "Slotlock Client"
         return ui
+    def is_hint_key(self, key):
+        return key == f"_read_hints_{self.team}_{self.slot}" or \
+            any(key == f"_read_hints_{self.team}_{slot}" for slot in self.locked_slots_nums)
+    def update_hints(self, hints):
+        """Merges a hint list from data storage, only handling the hints that are new or changed."""
+        changed = False
+        for hint in hints:
+            key = (hint["finding_player"], hint["location"])
+            if self.hints.get(key) == hint:
+                continue
+            self.hints[key] = hint
+            changed = True
+            if self.slot_concerns_self(hint["receiving_player"]):
+                self.hinted_item_ids.add(hint["item"])
+                self.hints_by_item.setdefault(hint["item"], {})[key] = hint
+                self.deprioritize_received(hint)
+            if (self.slot_concerns_self(hint["finding_player"]) or hint["finding_player"] in self.locked_slots_nums) \
+                    and not hint["found"] and ("status" not in hint or hint["status"] == HintStatus.HINT_PRIORITY):
+                self.auto_hint_candidates[key] = hint
+            else:
+                self.auto_hint_candidates.pop(key, None)
+        if changed:
+            self.request_hint_check()
+    def deprioritize_received(self, hint):
+        if hint["item"] in self.received_item_ids and hasattr(self, "update_hint") \
+                and hint.get("status") == HintStatus.HINT_PRIORITY:
+            self.update_hint(hint["location"], hint["finding_player"], HintStatus.HINT_NO_PRIORITY)
     async def check_hints(self):
-        if f"_read_hints_{self.team}_{self.slot}" in self.stored_data:
-            hintdata = self.stored_data[f"_read_hints_{self.team}_{self.slot}"].copy()
-            for slot in self.player_names:
-                player_name = self.player_names[slot]
-                if player_name in self.locked_slots and f"_read_hints_{self.team}_{slot}" in self.stored_data:
-                    hintdata.extend(self.stored_data[f"_read_hints_{self.team}_{slot}"])
-                    #print(f"{player_name}: {self.stored_data[f"_read_hints_{self.team}_{slot}"]}")
-            hinted_count = {}
-            loc_count = {}
-            real_hint_cost = max(1, int(self.hint_cost * 0.01 * self.total_locations))
-            for location in self.server_locations:
-                if location // 10 in loc_count:
-                    loc_count[location // 10] += 1
-                else:
-                    loc_count[location // 10] = 1
-            for hint in hintdata:
-                if self.slot_concerns_self(hint["receiving_player"]):
-                    if hint["item"] not in hinted_count:
-                        hinted_count[hint["item"]] = 1
-                    else:
-                        hinted_count[hint["item"]] += 1
-                    if any(item.item == hint["item"] for item in self.items_received):
-                        if hasattr(self, "update_hint") and hint["status"] == HintStatus.HINT_PRIORITY:
-                            self.update_hint(hint["location"],hint["finding_player"], HintStatus.HINT_NO_PRIORITY)
-            if len(self.auto_hint_queue) > 0 and (self.hint_points >= real_hint_cost or self.use_server_password):
-                await self.send_hint(self.auto_hint_queue.pop(0))
-                await asyncio.sleep(1)
-                self.checking_hints = False
-                return
-            if self.auto_hint_locked_items:
-                for hint in hintdata:
-                    if self.slot_concerns_self(hint["finding_player"]):
-                        if hint["location"]//10 not in hinted_count:
-                            hinted_count[hint["location"]// 10] = 0
-                        if (not "status" in hint) or hint["status"] == HintStatus.HINT_PRIORITY:
-                            if not hint["found"] and hinted_count[hint["location"]//10] < 1:
-                                if self.hint_points >= real_hint_cost:
-                                    await self.send_hint(self.item_names.lookup_in_game(hint["location"]//10, "SlotLock"))
-                                    self.checking_hints = False
-                                    await asyncio.sleep(2)
-                                    return
-                    elif hint["finding_player"] in self.locked_slots_nums:
-                        if (not "status" in hint) or hint["status"] == HintStatus.HINT_PRIORITY:
-                            if (not hint["found"]) and (self.hint_points >= real_hint_cost or self.use_server_password):
-                                hinted = False
-                                for ahint in hintdata:
-                                    if self.slot_concerns_self(ahint["receiving_player"]) and ahint["item"] == hint["finding_player"]+1001:
-                                        hinted = True
-                                #print(f"Already hinted for {hint}: {hinted}")
-                                if not hinted:
-                                    await self.send_hint(f"Unlock {self.player_names[hint['finding_player']]}")
-                                    await asyncio.sleep(2)
-                                    return
-                            else:
-                                pass
-                                #print(f"Skipping hint: {hint} because not enough hint points or hint already found. ")
-                        else:
-                            pass
-                            #print(f"Skipping hint: {hint} because not priority.")
-        await asyncio.sleep(1)
+        """Sends at most one hint, returns whether it did."""
+        real_hint_cost = max(1, int(self.hint_cost * 0.01 * self.total_locations))
+        if len(self.auto_hint_queue) > 0 and (self.hint_points >= real_hint_cost or self.use_server_password):
+            return await self.send_hint(self.auto_hint_queue.pop(0))
+        if not self.auto_hint_locked_items:
+            return False
+        for hint in list(self.auto_hint_candidates.values()):
+            if self.slot_concerns_self(hint["finding_player"]):
+                if hint["location"] // 10 not in self.hinted_item_ids and self.hint_points >= real_hint_cost:
+                    if await self.send_hint(self.item_names.lookup_in_game(hint["location"] // 10, "SlotLock")):
+                        return True
+            elif self.hint_points >= real_hint_cost or self.use_server_password:
+                if hint["finding_player"] + 1001 not in self.hinted_item_ids:
+                    if await self.send_hint(f"Unlock {self.player_names[hint['finding_player']]}"):
+                        return True
+        return False
     async def send_hint(self, item_name):
         if item_name in self.has_hinted:
-            return
-        self.has_hinted.append(item_name)
+            return False
+        self.has_hinted.add(item_name)
         if self.use_server_password:
             await self.send_msgs([{"cmd": "Say", "text": f"!admin login {self.use_server_password}"}])
             await asyncio.sleep(1)
             await self.send_msgs([{"cmd": "Say", "text": f"!admin /hint {self.username} {item_name}"}])
         else:
             await self.send_msgs([{"cmd": "Say", "text": f"!hint {item_name}"}])
+        return True
     def update_auto_locations(self):
-        self.unlocked_slots = []
-        received_items = [*map(lambda item: self.item_names.lookup_in_game(item.item, "SlotLock"), self.items_received)]
-        print(received_items)
-        for slot in self.player_names.values():
-            if f"Unlock {slot}" in received_items:
-                self.unlocked_slots.append(slot)
-        self.locations_checked = set()
+        """Takes in the items received since the last call, returns the locations they newly unlock."""
+        if len(self.items_received) < self.received_count:
+            # the server resent everything from the start
+            self.received_count = 0
+            self.received_item_ids = set()
+            self.unlocked_slots = []
+        new_items = self.items_received[self.received_count:]
+        self.received_count = len(self.items_received)
+        unlocked = set()
+        for item in new_items:
+            if item.item in self.received_item_ids:
+                continue
+            self.received_item_ids.add(item.item)
+            if item.item - 1001 in self.player_names:
+                self.unlocked_slots.append(self.player_names[item.item - 1001])
+            unlocked |= self.locations_by_unlock.pop(item.item, set())
+            for hint in self.hints_by_item.get(item.item, {}).values():
+                self.deprioritize_received(hint)
+        return unlocked & self.missing_locations
+    def index_missing_locations(self):
+        """Indexes the missing locations by unlock item, returns the ones that are already unlocked."""
+        self.locations_by_unlock = {}
+        unlocked = set()
         for location in self.missing_locations:
-            if any(item.item == location // 10 for item in self.items_received) or (location >= 10000 and self.free_starting_items):
-                self.locations_checked.add(location)
+            if location // 10 in self.received_item_ids or (location >= 10000 and self.free_starting_items):
+                unlocked.add(location)
             else:
-                logger.debug(f"Don't yet have {self.location_names.lookup_in_game(location,"SlotLock")}, required item {self.item_names.lookup_in_game(location // 10)}")
-                pass
-
+                self.locations_by_unlock.setdefault(location // 10, set()).add(location)
+        return unlocked
+    def send_unlocked(self, locations):
+        if locations:
+            self.locations_checked |= locations
+            asyncio.create_task(self.send_msgs([{"cmd": "LocationChecks", "locations": list(locations)}]))
+    def check_victory(self):
+        if self.finished_game or len(self.missing_locations - self.locations_checked) > 0:
+            return
+        for i, name in self.player_names.items():
+            if i != 0 and i + 1001 not in self.received_item_ids:
+                logger.debug(f"No victory yet, {name} unlock required. Item ID {i + 1001}")
+                return
+        logger.info("Victory!")
+        self.finished_game = True
+        asyncio.create_task(self.send_msgs([{"cmd": "StatusUpdate", "status": ClientStatus.CLIENT_GOAL}]))
 
     def on_package(self, cmd: str, args: dict):
         if cmd == "Connected":
@@ -166,7 +204,6 @@ class SlotLockContext(CommonContext):
             self.bonus_item_copies = args["slot_data"]["bonus_item_copies"]
             self.bonus_item_filler = args["slot_data"]["bonus_item_filler"]
             self.connected = True
-            asyncio.create_task(self.run_checking_hints())
             try:
                 self.auto_hint_locked_items = args["slot_data"]["auto_hint_locked_items"]
                 if self.auto_hint_locked_items == 2:
@@ -183,37 +220,36 @@ class SlotLockContext(CommonContext):
             slots = [*map(lambda slot: f"_read_hints_{self.team}_{slot}",self.locked_slots_nums)]
             for slot in slots:
                 self.set_notify(slot)
-        if cmd == "ReceivedItems" or cmd == "Connected" or cmd == "RoomUpdate":
+            self.reset_indexes()
             self.update_auto_locations()
-            asyncio.create_task(self.send_msgs([{"cmd": "LocationChecks",
-                         "locations": list(self.locations_checked)}]))
-            victory = True
-            if len(self.missing_locations) > 0:
-                victory = False
-            else:
-                for i, name in self.player_names.items():
-                    success = False
-                    for item in self.items_received:
-                        print(item)
-                        if i == 0 or item.item == i + 1001:
-                            success = True
-                    if not success:
-                        print(f"No victory yet, {name} unlock required. Item ID {i + 1001}")
-                        victory = False
-            if victory:
-                print("Victory!")
-                self.finished_game = True
-                asyncio.create_task(self.send_msgs([{"cmd": "StatusUpdate", "status": ClientStatus.CLIENT_GOAL}]))
+            self.send_unlocked(self.index_missing_locations())
+            self.check_victory()
+        elif cmd == "ReceivedItems":
+            self.send_unlocked(self.update_auto_locations())
+            self.check_victory()
+        elif cmd == "RoomUpdate":
+            self.check_victory()
+            if "hint_points" in args:
+                self.request_hint_check()
+        elif cmd == "Retrieved":
+            for key, value in args["keys"].items():
+                if value and self.is_hint_key(key):
+                    self.update_hints(value)
+        elif cmd == "SetReply":
+            if self.is_hint_key(args["key"]):
+                self.update_hints(args["value"])
 
     async def disconnect(self, allow_autoreconnect: bool = False):
         await super().disconnect(allow_autoreconnect)
+        self.connected = False
         self.finished_game = False
         self.free_starting_items = False
         self.auto_hint_locked_items = False
         self.checked_locations = set()
         self.locations_checked = set()
         self.items_received = []
-        self.update_auto_locations()
+        self.unlocked_slots = []
+        self.reset_indexes()
 
 def launch(*args):
 
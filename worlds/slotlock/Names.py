@@ -0,0 +1,94 @@
+from typing import AbstractSet, Iterable, Iterator
+
+# Every unlock item owns the location ids item_id*10 to item_id*10+9, one per copy of its reward locations,
+# so the client can find the item a location is waiting on with location_id // 10.
+REWARD_COPIES = 10
+MAX_BONUS_SLOTS = 1000
+MAX_PLACEHOLDER_SLOTS = 5000
+NOTHING_ID = 6999
+
+
+def unlock_item_id(player: int) -> int:
+    return player + 1001
+
+
+def bonus_key_id(bonus_slot: int) -> int:
+    """Id of the key of a bonus slot, counting from 1."""
+    return bonus_slot
+
+
+def reward_location_id(item_id: int, copy: int) -> int:
+    """Id of a reward location of the slot unlocked by item_id, counting copies from 0."""
+    return item_id * REWARD_COPIES + copy
+
+
+def bonus_location_name(bonus_slot: int, copy: int) -> str:
+    return f"Bonus Slot {bonus_slot} {copy + 1}" if copy else f"Bonus Slot {bonus_slot}"
+
+
+class LazyNames(AbstractSet[str]):
+    """A set of names that are worked out on lookup, it only materializes when combined with other sets."""
+    __slots__ = ()
+
+    @classmethod
+    def _from_iterable(cls, names: Iterable[str]) -> AbstractSet[str]:
+        return frozenset(names)
+
+    def union(self, *others: Iterable[str]) -> AbstractSet[str]:
+        return frozenset(self).union(*others)
+
+
+class NumberedNames(LazyNames):
+    """
+    The names "{prefix}{number}" for a range of numbers, without storing them.
+    With copies, every number also has the names "{prefix}{number} {copy}" for copy 2 and up.
+    Only meant for option verification, which has to accept these names for any possible slot.
+    """
+    __slots__ = ("prefix", "numbers", "copies")
+
+    def __init__(self, prefix: str, numbers: range, copies: int = 1) -> None:
+        self.prefix = prefix
+        self.numbers = numbers
+        self.copies = copies
+
+    @staticmethod
+    def _parse(text: str) -> int:
+        # only canonical numbers, "Unlock_01" is not a name of this set
+        if text.isdecimal() and text.isascii() and (text == "0" or not text.startswith("0")):
+            return int(text)
+        return -1
+
+    def __contains__(self, name: object) -> bool:
+        if not isinstance(name, str) or not name.startswith(self.prefix):
+            return False
+        number, _, copy = name[len(self.prefix):].partition(" ")
+        if copy and not 2 <= self._parse(copy) <= self.copies:
+            return False
+        return self._parse(number) in self.numbers
+
+    def __iter__(self) -> Iterator[str]:
+        for number in self.numbers:
+            yield f"{self.prefix}{number}"
+            for copy in range(2, self.copies + 1):
+                yield f"{self.prefix}{number} {copy}"
+
+    def __len__(self) -> int:
+        return len(self.numbers) * self.copies
+
+
+class NameUnion(LazyNames):
+    """Several disjoint sets of names, looked up in order."""
+    __slots__ = ("parts",)
+
+    def __init__(self, *parts: AbstractSet[str]) -> None:
+        self.parts = parts
+
+    def __contains__(self, name: object) -> bool:
+        return any(name in part for part in self.parts)
+
+    def __iter__(self) -> Iterator[str]:
+        for part in self.parts:
+            yield from part
+
+    def __len__(self) -> int:
+        return sum(len(part) for part in self.parts)
@@ -3,11 +3,14 @@ from typing import Any, Dict
 from BaseClasses import CollectionState, Item, ItemClassification, Location, MultiWorld, Region
 from Options import OptionSet, PerGameCommonOptions, Range, StartInventoryPool, Toggle, Choice, OptionDict
 import worlds
-from worlds import AutoWorld
+from worlds import AutoWorld, GamesPackage
+from worlds.AutoWorld import data_package_checksum
 from worlds.generic import GenericWorld
 from worlds.LauncherComponents import Component, components, icon_paths, launch_subprocess, Type
 from NetUtils import Hint
 from settings import Group
+from .Names import LazyNames, MAX_BONUS_SLOTS, MAX_PLACEHOLDER_SLOTS, NOTHING_ID, REWARD_COPIES, NameUnion, NumberedNames, \
+    bonus_key_id, bonus_location_name, reward_location_id, unlock_item_id
 
 def launch_client(*args):
     from .Client import launch
@@ -22,7 +25,7 @@ components.append(Component("Slot Lock Client", "SlotLockClient", func=launch_cl
 class LockItem(Item):
     coin_suffix = ""
     def __init__(self, world: "SlotLockWorld", player: int):
-        Item.__init__(self,f"Unlock {world.multiworld.worlds[player].player_name}",ItemClassification.progression,player+1001,world.player)
+        Item.__init__(self,f"Unlock {world.multiworld.worlds[player].player_name}",ItemClassification.progression,unlock_item_id(player),world.player)
 class LockLocation(Location):
     pass
 
@@ -105,16 +108,10 @@ class SlotLockWorld(AutoWorld.World):
     game = "SlotLock"
     options: SlotLockOptions
     options_dataclass = SlotLockOptions
-    location_name_to_id = {f"Lock_{num+1}": num+10010 for num in range(50000)}
-    item_name_to_id = {f"Unlock_{num+1}": num+1001 for num in range(5000)}
-    item_name_to_id["Nothing"] = 6999
+    # the names and ids depend on the players of a seed, so they're only filled in by stage_generate_early
+    location_name_to_id = {}
+    item_name_to_id = {"Nothing": NOTHING_ID}
     multiworld : MultiWorld
-    for i in range(1000):
-        item_name_to_id[f"Unlock Bonus Slot {i+1}"] = i + 1
-        for j in range(10):
-            location_name_to_id[f"Bonus Slot {i+1}{" " + str(j+1) if j > 0 else ""}"] = i*10 + j + 10
-    item_name_groups = {"Slot Unlocks": set(f"Unlock_{num+1}" for num in range(5000)), "Bonus Slot Unlocks": set(f"Unlock Bonus Slot {num+1}" for num in range(1000))}
-    location_name_groups = {"Slot Rewards": set(f"Lock_{num+1}" for num in range(50000)), "Bonus Slot Rewards": set([f"Bonus Slot {(num+10)//10}{" " + str((num % 10)+1) if (num % 10) > 0 else ""}" for num in range(1000)])}
     slots_to_lock = []
     recursive_locks = []
     associated_worlds = set()
@@ -128,36 +125,54 @@ class SlotLockWorld(AutoWorld.World):
         elif "Unlock " in name:
             return self.create_slotlock_item(name.split("lock ")[1])
         elif name == "Nothing":
-            return Item(name,ItemClassification.filler,6999, self.player)
+            return Item(name,ItemClassification.filler,NOTHING_ID, self.player)
         raise Exception("Invalid item name")
     @classmethod
     def stage_generate_early(cls, multiworld: "MultiWorld"):
-        item_name_to_id = {}
+        # only the slots of this seed and the bonus slots any SlotLock world asked for get names,
+        # their ids are fixed by the player number or bonus slot, so they stay the same from seed to seed
+        bonus_slots = max(world.options.bonus_item_slots.value for world in multiworld.get_game_worlds(cls.game))
+        item_name_to_id = {"Nothing": NOTHING_ID}
         location_name_to_id = {}
-        world_unlock_items = set()
-        world_unlock_locations = set()
-        bonus_locations = set()
-        bonus_items = set()
-        for id, world in multiworld.worlds.items():
-            item_name_to_id[f"Unlock {world.player_name}"] = id + 1001
-            world_unlock_items.add(f"Unlock {world.player_name}")
-            for i in range(10):
-                location_name_to_id[f"Free Item {world.player_name} {i+1}"] = id*10 + i + 10010
-                world_unlock_locations.add(f"Free Item {world.player_name} {i+1}")
-        item_name_to_id["Nothing"] = 6999
-        for i in range(1000):
-            item_name_to_id[f"Unlock Bonus Slot {i+1}"] = i + 1
-            bonus_items.add(f"Unlock Bonus Slot {i+1}")
-            for j in range(10):
-                location_name_to_id[f"Bonus Slot {i+1}{" " + str(j+1) if j > 0 else ""}"] = i*10 + j + 10
-                bonus_locations.add(f"Bonus Slot {i+1}{" " + str(j+1) if j > 0 else ""}")
+        for player in multiworld.player_ids:
+            world = multiworld.worlds[player]
+            item_name_to_id[f"Unlock {world.player_name}"] = unlock_item_id(player)
+            for copy in range(REWARD_COPIES):
+                location_name_to_id[f"Free Item {world.player_name} {copy+1}"] = reward_location_id(unlock_item_id(player), copy)
+        for bonus_slot in range(1, bonus_slots + 1):
+            item_name_to_id[f"Unlock Bonus Slot {bonus_slot}"] = bonus_key_id(bonus_slot)
+            for copy in range(REWARD_COPIES):
+                location_name_to_id[bonus_location_name(bonus_slot, copy)] = reward_location_id(bonus_key_id(bonus_slot), copy)
         cls.item_name_to_id = item_name_to_id
         cls.location_name_to_id = location_name_to_id
-        cls.item_name_groups = {"Everything": set(world_unlock_items.union(bonus_items).union(set("Nothing"))), "Slot Unlocks": world_unlock_items, "Bonus Slot Unlocks": bonus_items}
-        cls.location_name_groups = {"Everywhere": set(world_unlock_locations.union(bonus_locations)), "Slot Rewards": world_unlock_locations, "Bonus Slot Rewards": bonus_locations}
+        cls.item_id_to_name = {code: name for name, code in item_name_to_id.items()}
+        cls.location_id_to_name = {code: name for name, code in location_name_to_id.items()}
+        item_name_groups = {"Everything": set(item_name_to_id), "Slot Unlocks": set(), "Bonus Slot Unlocks": set()}
+        for name, code in item_name_to_id.items():
+            if code != NOTHING_ID:
+                item_name_groups["Bonus Slot Unlocks" if code <= MAX_BONUS_SLOTS else "Slot Unlocks"].add(name)
+        location_name_groups = {"Everywhere": set(location_name_to_id), "Slot Rewards": set(), "Bonus Slot Rewards": set()}
+        for name, code in location_name_to_id.items():
+            location_name_groups["Bonus Slot Rewards" if code // REWARD_COPIES <= MAX_BONUS_SLOTS else "Slot Rewards"].add(name)
+        cls.item_name_groups = {name: frozenset(group) for name, group in item_name_groups.items() if group}
+        cls.location_name_groups = {name: frozenset(group) for name, group in location_name_groups.items() if group}
 
         # update datapackage checksum
         worlds.network_data_package["games"][cls.game] = cls.get_data_package_data()
+    @classmethod
+    def get_data_package_data(cls) -> "GamesPackage":
+        # the placeholder groups of every possible slot are only there for option verification,
+        # so they stay out of the data package, which only gets the groups of a seed's names
+        res: "GamesPackage" = {
+            "item_name_groups": {name: sorted(group) for name, group in sorted(cls.item_name_groups.items())
+                                 if not isinstance(group, LazyNames)},
+            "item_name_to_id": cls.item_name_to_id,
+            "location_name_groups": {name: sorted(group) for name, group in sorted(cls.location_name_groups.items())
+                                     if not isinstance(group, LazyNames)},
+            "location_name_to_id": cls.location_name_to_id,
+        }
+        res["checksum"] = data_package_checksum(res)
+        return res
     def create_slotlock_item(self, slotName: str) -> LockItem:
         return LockItem(self,self.multiworld.world_name_lookup[slotName])
     def create_bonus_key(self, bonusSlot: int) -> Item:
@@ -168,10 +183,12 @@ class SlotLockWorld(AutoWorld.World):
             return
 
         #print(self.location_name_to_id)
+        # item link groups are worlds too, but they can't be locked
+        player_worlds = [self.multiworld.worlds[player] for player in self.multiworld.player_ids]
         if self.options.slots_whitelist.value:
-            slots_to_lock = [slot for slot in self.options.slots_to_lock.value if any(slot == world.player_name for world in self.multiworld.worlds.values())]
+            slots_to_lock = [slot for slot in self.options.slots_to_lock.value if any(slot == world.player_name for world in player_worlds)]
         else:
-            slots_to_lock = [slot.player_name for slot in self.multiworld.worlds.values() if slot.player_name not in self.options.slots_to_lock.value and slot.player_name != self.player_name]
+            slots_to_lock = [slot.player_name for slot in player_worlds if slot.player_name not in self.options.slots_to_lock.value and slot.player_name != self.player_name]
         if self.options.random_unlocked_slots.value > len(slots_to_lock):
             raise RuntimeError("Too many random unlocked slots.")
         for i in range(self.options.random_unlocked_slots.value):
@@ -197,7 +214,7 @@ class SlotLockWorld(AutoWorld.World):
                     option.value[f"Free Item {slot} {i+1}"] = self.options.unlock_item_copies.value
                 elif (isinstance(option.value,list) or isinstance(option.value, set)) and (f"Lock_{world.player*10 + i}" in option.value):
                     option.value.add(f"Free Item {slot} {i+1}")
-        for world in self.multiworld.worlds.values():
+        for world in player_worlds:
             if world.player_name in slots_to_lock:
                 if isinstance(world, SlotLockWorld) and len(world.slots_to_lock) > 0:
                     raise Exception(f"Recursive slot lock: {self.player_name} locking {world.player_name} which locks other worlds, this is not allowed.")
@@ -243,7 +260,7 @@ class SlotLockWorld(AutoWorld.World):
                     self.multiworld.itempool.append(self.create_bonus_key(bonusSlot))
                 else:
                     self.multiworld.itempool.append(self.create_item("Nothing"))
-                locName = f"Bonus Slot {bonusSlot+1}{" " + str(bonusDupes+1) if bonusDupes > 0 else ""}"
+                locName = bonus_location_name(bonusSlot+1, bonusDupes)
                 bonusSlotRegion.add_locations({locName: self.location_name_to_id[locName]})
             self.multiworld.regions.append(bonusSlotRegion)
             def rule(state: CollectionState, bonusSlot=bonusSlot):
@@ -259,30 +276,14 @@ class SlotLockWorld(AutoWorld.World):
         for self in multiworld.get_game_worlds(cls.game): #workaround this being a classmethod lol
             for world in multiworld.worlds.values():
                 if world.player_name in self.slots_to_lock:
-                    currentOriginName = world.origin_region_name
-                    currentOrigin: Region
-                    currentOrigin = world.get_region(currentOriginName)
-                    #region = Region(f"Lock {self.player}", world.player, self.multiworld)
-                    #region.connect(currentOrigin,None,rule)
-                    #self.multiworld.regions.append(region)
-                    for exit in currentOrigin.get_exits():
-                        old_rule = exit.access_rule
-                        def rule(state: CollectionState, self=self, world=world, old_rule=old_rule):
-                            #print(f"Lock Rule Called for {world.player}, value {state.has(f"Unlock_{world.player}",self.player)}")
-                            return state.has(f"Unlock {world.player_name}",self.player) and old_rule(state)
-                        exit.access_rule = rule
-                    for location in currentOrigin.get_locations():
-                        old_rule = location.access_rule
-                        def rule(state: CollectionState, self=self, world=world, old_rule=old_rule):
-                            #print(f"Lock Rule Called for {world.player}, value {state.has(f"Unlock_{world.player}",self.player)}")
-                            return state.has(f"Unlock {world.player_name}",self.player) and old_rule(state)
-                        location.access_rule = rule
+                    # the locked world can't be entered at all before its unlock is found
+                    multiworld.add_world_gate(world.player, f"Unlock {world.player_name}", self.player)
                     multiworld.early_items[world.player] = {}
                     multiworld.local_early_items[world.player] = {}
                     world.options.progression_balancing.value = 0
 
     def set_rules(self) -> None:
-        self.multiworld.completion_condition[self.player] = lambda state: state.has_all([f"Unlock {i}" for i in self.multiworld.player_name.values()] + [f"Unlock Bonus Slot {i+1}" for i in range(self.options.bonus_item_slots.value)], self.player)
+        self.multiworld.completion_condition[self.player] = lambda state: state.has_all([f"Unlock {self.multiworld.player_name[i]}" for i in self.multiworld.player_ids] + [f"Unlock Bonus Slot {i+1}" for i in range(self.options.bonus_item_slots.value)], self.player)
         if not self.options.free_starting_items.value:
             for slot in self.slots_to_lock:
                 for i in range(min(self.options.unlock_item_copies+self.options.unlock_item_filler,10)):
@@ -302,22 +303,6 @@ class SlotLockWorld(AutoWorld.World):
         }
     def post_fill(self) -> None:
         pass
-    def collect(self,state: CollectionState, item: Item):
-        if "Unlock " in item.name and item.name.split("Unlock ")[1] in self.slots_to_lock:
-            player_name = item.name.split("Unlock ")[1]
-            for world in self.multiworld.worlds:
-                if self.multiworld.worlds[world].player_name == player_name:
-                    state.update_reachable_regions(world)
-                    # print(f"Marking {player_name} as stale due to collection of {item.name}")
-        return super().collect(state,item)
-    def remove(self,state: CollectionState, item: Item):
-        if "Unlock " in item.name and item.name.split("Unlock ")[1] in self.slots_to_lock:
-            player_name = item.name.split("Unlock ")[1]
-            for world in self.multiworld.worlds:
-                if world.player_name == player_name:
-                    state.update_reachable_regions(world)
-                    # print(f"Marking {player_name} as stale due to removal of {item.name}")
-        return super().collect(state,item)
     def modify_multidata(self, multidata: Dict[str, Any]):
         if len(self.slots_to_lock) == 0:
             return
@@ -339,3 +324,26 @@ class SlotLockWorld(AutoWorld.World):
            data[location.address] = str(self.multiworld.find_item_locations(self.item_id_to_name[location.address // 10],self.player, True)).removeprefix("[").removesuffix("]")
         hint_data[self.player] = data
 
+
+# Options are verified before stage_generate_early, against the placeholder names for every possible slot.
+# Those are recognized by pattern, instead of building tens of thousands of names at import.
+SlotLockWorld.item_names = NameUnion(
+    SlotLockWorld.item_names,
+    NumberedNames("Unlock_", range(1, MAX_PLACEHOLDER_SLOTS + 1)),
+    NumberedNames("Unlock Bonus Slot ", range(1, MAX_BONUS_SLOTS + 1)),
+)
+SlotLockWorld.location_names = NameUnion(
+    NumberedNames("Lock_", range(1, MAX_PLACEHOLDER_SLOTS * REWARD_COPIES + 1)),
+    NumberedNames("Bonus Slot ", range(1, MAX_BONUS_SLOTS + 1), REWARD_COPIES),
+)
+SlotLockWorld.item_name_groups = {
+    **SlotLockWorld.item_name_groups,
+    "Slot Unlocks": NumberedNames("Unlock_", range(1, MAX_PLACEHOLDER_SLOTS + 1)),
+    "Bonus Slot Unlocks": NumberedNames("Unlock Bonus Slot ", range(1, MAX_BONUS_SLOTS + 1)),
+}
+SlotLockWorld.location_name_groups = {
+    **SlotLockWorld.location_name_groups,
+    "Slot Rewards": NumberedNames("Lock_", range(1, MAX_PLACEHOLDER_SLOTS * REWARD_COPIES + 1)),
+    "Bonus Slot Rewards": NumberedNames("Bonus Slot ", range(1, MAX_BONUS_SLOTS + 1), REWARD_COPIES),
+}
+SlotLockWorld.all_item_and_group_names = NameUnion(SlotLockWorld.item_names, frozenset(SlotLockWorld.item_name_groups))
@@ -33,6 +33,7 @@ class SM64World(World):
     topology_present = False
 
     web = SM64Web()
+    generate_stages_in_process = True
 
     item_name_to_id = item_table
     location_name_to_id = location_table
@@ -80,11 +80,10 @@ class SubnauticaWorld(World):
         for event in locations.events:
             location = SubnauticaLocation(self.player, event, None, planet_region)
             planet_region.locations.append(location)
+            # make the goal event the victory "item"
+            item_name = "Victory" if event == goal_event_name else event
             location.place_locked_item(
-                SubnauticaItem(event, ItemClassification.progression, None, player=self.player))
-            if event == goal_event_name:
-                # make the goal event the victory "item"
-                location.item.name = "Victory"
+                SubnauticaItem(item_name, ItemClassification.progression, None, player=self.player))
 
         # Register region to multiworld
         self.multiworld.regions.append(planet_region)
@@ -41,6 +41,7 @@ class TimespinnerWorld(World):
     game = "Timespinner"
     topology_present = True
     web = TimespinnerWebWorld()
+    generate_stages_in_process = True
     required_client_version = (0, 4, 2)
 
     item_name_to_id = {name: data.code for name, data in item_table.items()}
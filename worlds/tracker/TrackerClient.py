@@ -651,6 +651,7 @@ class TrackerGameContext(CommonContext):
         for cls in AutoWorld.AutoWorldRegister.world_types.values():
             if cls.item_id_to_name:
                 max_item = max(max_item, max(cls.item_id_to_name))
+            if cls.location_id_to_name:
                 max_location = max(max_location, max(cls.location_id_to_name))
 
         item_digits = len(str(max_item))
@@ -665,8 +666,8 @@ class TrackerGameContext(CommonContext):
                             f"Items (IDs: {min(cls.item_id_to_name):{item_digits}} - "
                             f"{max(cls.item_id_to_name):{item_digits}}) | "
                             f"{len(cls.location_names):{location_count}} "
-                            f"Locations (IDs: {min(cls.location_id_to_name):{location_digits}} - "
-                            f"{max(cls.location_id_to_name):{location_digits}})")
+                            f"Locations (IDs: {min(cls.location_id_to_name, default=0):{location_digits}} - "
+                            f"{max(cls.location_id_to_name, default=0):{location_digits}})")
 
         del item_digits, location_digits, item_count, location_count
 
@@ -2,7 +2,7 @@ import math
 from collections import Counter, defaultdict
 from typing import List, Optional
 
-from BaseClasses import MultiWorld
+from BaseClasses import MultiWorld, mutable_container
 
 from worlds.generic.Rules import set_rule
 
@@ -206,11 +206,12 @@ def dice_simulation_state_change(state, player, frags_per_dice, frags_per_roll,
     """
 
     if state.prog_items[player]["state_is_fresh"] == 0:
-        state.prog_items[player]["state_is_fresh"] = 1
+        prog_items = mutable_container(state.prog_items, player)
+        prog_items["state_is_fresh"] = 1
         categories, num_dice, num_rolls, fixed_mult, step_mult, expoints = extract_progression(
             state, player, frags_per_dice, frags_per_roll, allowed_categories
         )
-        state.prog_items[player]["maximum_achievable_score"] = (
+        prog_items["maximum_achievable_score"] = (
             dice_simulation_strings(categories, num_dice, num_rolls, fixed_mult, step_mult, difficulty, player)
             + expoints
         )
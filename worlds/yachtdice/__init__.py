@@ -49,6 +49,7 @@ class YachtDiceWorld(World):
     options_dataclass = YachtDiceOptions
 
     web = YachtDiceWeb()
+    generate_stages_in_process = True
 
     item_name_to_id = {name: data.code for name, data in item_table.items()}
 